@@ -68,6 +68,8 @@ autodoc_mock_imports = [
     "gpiozero",
     "spidev",
     "evdev",
+    "gpiod",
+    "numpy",
 ]
 autodoc_default_options = {
     'member-order': 'bysource',
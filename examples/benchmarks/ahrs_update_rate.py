@@ -0,0 +1,33 @@
+""" Update rate of the AHRS filters
+
+Runs Madgwick and Mahony updates on a fixed synthetic sample, with and
+without magnetometer, no sensor needed. Compare the rates with the AHRS
+rate you need, the I2C reads come on top, see mpu6050_read_rate.py.
+
+    python3 ahrs_update_rate.py [count]
+"""
+import sys
+import time
+from fusion_hat.modules.ahrs import Madgwick, Mahony
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+GYRO = (0.01, -0.02, 0.03)        # rad/s
+ACCEL = (0.05, -0.02, 0.99)       # g
+MAG = (0.25, 0.03, -0.41)         # gauss
+
+def rate(update, *sample):
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        update(*sample, dt=0.005)
+    return COUNT / (time.perf_counter() - start)
+
+def main():
+    print(f"{COUNT} updates per test")
+    for name, filt in (("Madgwick", Madgwick()), ("Mahony", Mahony(ki=0.1))):
+        print(f"{name:<10}accel+gyro+mag {rate(filt.update, *GYRO, *ACCEL, *MAG) / 1000:>8.1f} k/s")
+        filt.reset()
+        print(f"{name:<10}accel+gyro     {rate(filt.update_imu, *GYRO, *ACCEL) / 1000:>8.1f} k/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+""" Toggle rate and read latency of the Pin GPIO backends
+
+Runs the same Pin calls on every backend that can be loaded here,
+RPi.GPIO ("rpi") and the GPIO character device ("gpiod"). Use a free pin,
+it is toggled as an output, then read as an input.
+
+    python3 gpio_backends.py [pin] [count]
+"""
+import sys
+import time
+from fusion_hat.pin import Pin
+from fusion_hat._gpio import BACKENDS, get_backend
+
+PIN = int(sys.argv[1]) if len(sys.argv) > 1 else 17
+COUNT = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+def bench_toggle(pin):
+    start = time.perf_counter()
+    for _ in range(COUNT // 2):
+        pin.high()
+        pin.low()
+    return COUNT / (time.perf_counter() - start)
+
+def bench_read(pin):
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        pin.value()
+    return (time.perf_counter() - start) / COUNT
+
+def main():
+    print(f"pin {PIN}, {COUNT} calls per test")
+    print(f"{'backend':<10}{'toggle rate':>16}{'read latency':>16}")
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+        except (ImportError, OSError) as err:
+            print(f"{name:<10}  unavailable: {err}")
+            continue
+        pin = Pin(PIN, mode=Pin.OUT, backend=name)
+        rate = bench_toggle(pin)
+        pin.close()
+        pin = Pin(PIN, mode=Pin.IN, backend=name)
+        latency = bench_read(pin)
+        pin.close()
+        print(f"{name:<10}{rate / 1000:>12.1f} k/s{latency * 1e6:>13.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+""" Per-call cost of debug logging in I2C, PWM and Servo hot paths, before and after
+
+With debug logging off, times each of the library's own methods as it is
+now (after: messages only built when debug is enabled) against the same
+method preceded by the unconditional f-string ``log.debug()`` calls it
+made before (before). I2C runs on a null bus backend, so no hardware is
+needed; PWM and Servo are only measured when the Fusion HAT driver is
+loaded.
+
+    python3 log_overhead.py
+"""
+import timeit
+import logging
+from fusion_hat._i2c import I2C
+from fusion_hat._i2c_bus import set_backend
+from fusion_hat.device import is_driver_loaded
+
+NUMBER = 20000
+BUS = 1
+
+class NullSMBus:
+    """ SMBus backend that accepts every transaction and reads zeros """
+    def __init__(self, bus):
+        pass
+
+    def close(self):
+        pass
+
+    def write_byte_data(self, i2c_addr, register, value, force=None):
+        pass
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        return [0] * length
+
+def ns_per_call(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=5)) / NUMBER * 1e9
+
+def cases(log):
+    """ Yield (name, before, after) per hot path """
+    i2c = I2C(address=0x68, bus=BUS, log=log)
+    reg, data, num = 0x3B, 0x55, 14
+
+    def write_byte_data_before():
+        log.debug(f"write_byte_data: 0x{reg:02x}({reg}), 0x{data:02x}({data})")
+        i2c.write_byte_data(reg, data)
+    yield "I2C.write_byte_data", write_byte_data_before, lambda: i2c.write_byte_data(reg, data)
+
+    def read_i2c_block_data_before():
+        msg = f"read_i2c_block_data: 0x{reg:02x}({reg}), {num} bytes"
+        result = i2c.read_i2c_block_data(reg, num)
+        msg += f", {result}"
+        log.debug(msg)
+    yield "I2C.read_i2c_block_data", read_i2c_block_data_before, lambda: i2c.read_i2c_block_data(reg, num)
+
+    if not is_driver_loaded():
+        print("Fusion HAT driver not loaded, skipping PWM and Servo")
+        return
+    from fusion_hat.pwm import PWM
+    from fusion_hat.servo import Servo
+    pwm = PWM(0, log=log)
+    duty_cycle = 1500
+
+    def duty_cycle_before():
+        # duty_cycle() and write_duty_cycle() each logged
+        log.debug(f"PWM channel {pwm.channel} duty cycle: {duty_cycle}")
+        log.debug(f"PWM channel {pwm.channel} duty cycle: {duty_cycle}")
+        pwm.duty_cycle(duty_cycle)
+    yield "PWM.duty_cycle", duty_cycle_before, lambda: pwm.duty_cycle(duty_cycle)
+
+    servo = Servo(1, log=log)
+    angle, pulse_width = 12.5, 1638
+
+    def set_raw_angle_before():
+        # set_raw_angle(), then duty_cycle() and write_duty_cycle() through pulse_width()
+        log.debug(f"Servo channel {servo.channel} angle: {angle}, pulse_width: {pulse_width}")
+        log.debug(f"PWM channel {servo.channel} duty cycle: {pulse_width}")
+        log.debug(f"PWM channel {servo.channel} duty cycle: {pulse_width}")
+        servo.set_raw_angle(angle)
+    yield "Servo.set_raw_angle", set_raw_angle_before, lambda: servo.set_raw_angle(angle)
+
+def main():
+    set_backend(BUS, NullSMBus)
+    log = logging.getLogger("log_overhead")
+    log.addHandler(logging.NullHandler())
+    log.setLevel(logging.INFO)
+    print(f"Debug logging disabled, {NUMBER} calls each, best of 5")
+    print(f"{'hot path':<26}{'before(ns)':>12}{'after(ns)':>12}{'saved(ns)':>12}{'saved':>8}")
+    try:
+        for name, before, after in cases(log):
+            b = ns_per_call(before)
+            a = ns_per_call(after)
+            print(f"{name:<26}{b:>12.1f}{a:>12.1f}{b - a:>12.1f}{(1 - a / b) * 100:>7.0f}%")
+    finally:
+        set_backend(BUS, None)
+
+if __name__ == "__main__":
+    main()
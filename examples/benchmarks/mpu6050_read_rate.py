@@ -0,0 +1,45 @@
+""" Achievable MPU6050 sample rate over I2C
+
+Compares reading one sample with 14 single byte transactions, as the
+driver used to, with one 14 byte burst (read_raw_data) and the scaled
+burst (get_all_data). The sensor itself outputs 1 kHz / (1 + SMPLRT_DIV)
+with the low pass filter on, 8 kHz with it off.
+
+    python3 mpu6050_read_rate.py [count] [bus]
+"""
+import sys
+import time
+from fusion_hat.modules.mpu6050 import MPU6050
+
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+BUS = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+def rate(func):
+    start = time.perf_counter()
+    for _ in range(COUNT):
+        func()
+    return COUNT / (time.perf_counter() - start)
+
+def main():
+    mpu = MPU6050(bus=BUS)
+    registers = [MPU6050.ACCEL_XOUT0 + 2 * i for i in range(7)]
+    read_word = mpu.read_i2c_word
+
+    def per_byte():
+        for register in registers:
+            read_word(register)
+
+    divider = mpu.regs.read(MPU6050.SMPLRT_DIV)
+    dlpf = mpu.regs.read_field(MPU6050.DLPF_CFG)
+    output_rate = (8000 if dlpf in (0, 7) else 1000) / (1 + divider)
+    print(f"bus {BUS}, {COUNT} samples per test, sensor outputs {output_rate:.0f} Hz")
+    for name, func in (
+        ("14 single byte reads", per_byte),
+        ("read_raw_data() burst", mpu.read_raw_data),
+        ("get_all_data() burst", mpu.get_all_data),
+    ):
+        print(f"{name:<24}{rate(func):>10.0f} samples/s")
+    mpu.close()
+
+if __name__ == "__main__":
+    main()
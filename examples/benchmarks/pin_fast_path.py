@@ -0,0 +1,65 @@
+""" Toggle and read rates of the Pin call paths
+
+Compares value()/high()/low() and raw() with fast_read()/fast_write(),
+for a fixed direction pin and an AUTO pin, which only reconfigures the
+pin when its direction actually changes. Use a free pin.
+
+    python3 pin_fast_path.py [pin] [count] [backend]
+"""
+import sys
+import time
+from fusion_hat.pin import Pin
+
+PIN = int(sys.argv[1]) if len(sys.argv) > 1 else 17
+COUNT = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+BACKEND = sys.argv[3] if len(sys.argv) > 3 else None
+
+def rate(func):
+    start = time.perf_counter()
+    func()
+    return COUNT / (time.perf_counter() - start)
+
+def toggle_value(pin):
+    for _ in range(COUNT // 2):
+        pin.high()
+        pin.low()
+
+def toggle_fast(pin):
+    write = pin.fast_write
+    for _ in range(COUNT // 2):
+        write(1)
+        write(0)
+
+def read_value(pin):
+    for _ in range(COUNT):
+        pin.value()
+
+def read_fast(pin):
+    read = pin.fast_read
+    for _ in range(COUNT):
+        read()
+
+def main():
+    print(f"pin {PIN}, {COUNT} calls per test")
+    tests = [
+        ("toggle OUT  high()/low()", Pin.OUT, toggle_value),
+        ("toggle OUT  fast_write()", Pin.OUT, toggle_fast),
+        ("toggle AUTO high()/low()", Pin.AUTO, toggle_value),
+        ("toggle AUTO fast_write()", Pin.AUTO, toggle_fast),
+        ("read   IN   value()", Pin.IN, read_value),
+        ("read   IN   fast_read()", Pin.IN, read_fast),
+        ("read   AUTO value()", Pin.AUTO, read_value),
+        ("read   AUTO fast_read()", Pin.AUTO, read_fast),
+    ]
+    for name, mode, func in tests:
+        pin = Pin(PIN, mode=mode, backend=BACKEND)
+        # Settle the direction of AUTO pins first, the fast paths bind to it
+        if func in (toggle_fast, toggle_value):
+            pin.low()
+        else:
+            pin.raw()
+        print(f"{name:<28}{rate(lambda: func(pin)) / 1000:>10.1f} k/s")
+        pin.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+""" CPU time of the Ultrasonic echo timing modes
+
+Ultrasonic.POLL spins on the echo pin while waiting for the echo,
+Ultrasonic.EDGE sleeps until the echo edges are queued and uses their
+timestamps. Both take the same readings, compare the CPU time they burn
+per reading and the distances they report.
+
+    python3 ultrasonic_cpu.py [trig] [echo] [count]
+"""
+import sys
+import time
+import statistics
+from fusion_hat.pin import Pin
+from fusion_hat.modules.ultrasonic import Ultrasonic
+
+TRIG = int(sys.argv[1]) if len(sys.argv) > 1 else 27
+ECHO = int(sys.argv[2]) if len(sys.argv) > 2 else 22
+COUNT = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+INTERVAL = 0.03
+
+def measure(mode):
+    sensor = Ultrasonic(Pin(TRIG), Pin(ECHO), mode=mode)
+    distances = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for _ in range(COUNT):
+        value = sensor.read_raw()
+        if value > 0:
+            distances.append(value)
+        # Let the echoes of the last reading die out
+        time.sleep(INTERVAL)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start - COUNT * INTERVAL
+    sensor.close()
+    return cpu, wall, distances
+
+def main():
+    print(f"trig {TRIG}, echo {ECHO}, {COUNT} readings per mode")
+    results = {}
+    for mode in (Ultrasonic.POLL, Ultrasonic.EDGE):
+        cpu, wall, distances = measure(mode)
+        results[mode] = cpu
+        median = statistics.median(distances) if distances else float("nan")
+        spread = statistics.pstdev(distances) if distances else float("nan")
+        print(f"{mode:<6}cpu {cpu / COUNT * 1000:7.3f} ms/reading, "
+              f"{cpu / wall * 100 if wall > 0 else 0:5.1f}% of a core while measuring, "
+              f"{len(distances)}/{COUNT} ok, median {median:.2f} cm, stdev {spread:.2f} cm")
+    if results[Ultrasonic.EDGE] > 0:
+        print(f"poll uses {results[Ultrasonic.POLL] / results[Ultrasonic.EDGE]:.1f}x the CPU time of edge")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from fusion_hat.modules import Magnetometer, AHRS
+from time import sleep
+
+# The magnetometer sits behind the MPU6050 bypass on GY-87 style boards,
+# Magnetometer enables it and keeps the MPU6050 in mag.mpu
+mag = Magnetometer()
+
+# decl_deg: magnetic declination of your location, see https://www.magnetic-declination.com/
+ahrs = AHRS(mag.mpu, mag, algorithm=AHRS.MADGWICK, rate=200, decl_deg=0.0)
+
+print("Keep the sensor still, calibrating gyro...")
+ahrs.calibrate_gyro()
+ahrs.start_thread()
+
+try:
+    while True:
+        roll, pitch, yaw = ahrs.euler()
+        print(f"roll {roll:+7.2f}°  pitch {pitch:+7.2f}°  heading {ahrs.heading():6.1f}°  "
+              f"({ahrs.updates} updates, {ahrs.overruns} overruns)")
+        sleep(0.2)
+except KeyboardInterrupt:
+    pass
+finally:
+    ahrs.close()
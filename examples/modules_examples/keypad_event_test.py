@@ -0,0 +1,25 @@
+from fusion_hat.modules import Keypad
+
+# Configure rows, columns, and keypad layout
+# pin from left to right - 4 17 27 22 23 24 25 12
+rows_pins = [4, 17, 27, 22]
+cols_pins = [23, 24, 25, 12]
+keys = ["1", "2", "3", "A",
+        "4", "5", "6", "B",
+        "7", "8", "9", "C",
+        "*", "0", "#", "D"]
+
+keypad = Keypad(rows_pins, cols_pins, keys)
+
+# Scan 100 times a second in the background, a key must hold 20ms to count
+keypad.start_thread(scan_rate=100, debounce=0.02)
+
+try:
+    while True:
+        # Wait for the next press or release
+        event = keypad.get_event()
+        print(f"{event.key} {'pressed' if event.pressed else 'released'}, holding {keypad.pressed()}")
+except KeyboardInterrupt:
+    pass
+finally:
+    keypad.close()
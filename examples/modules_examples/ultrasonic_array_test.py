@@ -0,0 +1,21 @@
+# Import UltrasonicArray and Pin class
+from fusion_hat.modules import UltrasonicArray
+from fusion_hat.pin import Pin
+
+# Create UltrasonicArray object with 4 sensors around the chassis,
+# front and back are fired together, then left and right
+array = UltrasonicArray([
+    (Pin(17), Pin(4)),   # front
+    (Pin(27), Pin(22)),  # left
+    (Pin(5), Pin(6)),    # back
+    (Pin(13), Pin(19)),  # right
+], schedule=UltrasonicArray.INTERLEAVED, guard=0.01)
+
+array.start_thread()
+try:
+    while True:
+        # Wait for the next distance vector
+        timestamp, distances = array.wait_scan()
+        print(f"{timestamp:.3f}: " + ", ".join(f"{d}cm" for d in distances))
+finally:
+    array.close()
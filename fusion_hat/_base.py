@@ -7,6 +7,11 @@ class _Base:
     To implement for all class
 
     - log: Logger object for logging
+    - _log_debug: True if debug logging is enabled, check it before logging in hot paths,
+      so disabled debug messages are never formatted:
+
+      >>> if self._log_debug:
+      ...     self.log.debug("write: 0x%02x", data)
 
     Args:
         log (logging.Logger): Logger, default is None
@@ -14,4 +19,22 @@ class _Base:
     """
     def __init__(self, *args, log: logging.Logger = Logger(__name__), log_level: [int, str] = logging.INFO, **kwargs):
         self.log = log
-        self.log.setLevel(log_level)
+        self.set_log_level(log_level)
+
+    def set_log_level(self, level: [int, str]) -> None:
+        """ Set log level
+
+        Args:
+            level (int, str): Log level
+        """
+        self.log.setLevel(level)
+
+    @property
+    def _log_debug(self) -> bool:
+        """ True if debug logging is enabled
+
+        Asked from the logger, which caches the answer until its level changes.
+        The default logger is shared by all instances and may change level
+        through any of them, so a per instance copy would go stale.
+        """
+        return self.log.isEnabledFor(logging.DEBUG)
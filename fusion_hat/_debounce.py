@@ -0,0 +1,248 @@
+""" Debounce and glitch filters for timestamped pin edges
+
+The filters work on :class:`fusion_hat._gpio.EdgeEvent` timestamps
+instead of sampling the pin, so nothing sleeps or polls. They see every
+raw edge of a pin and only pass on stable transitions. When a
+transition can only be confirmed once the pin has been quiet for a
+while, a shared timer thread wakes up exactly at that moment.
+
+- :class:`IntegratorFilter`: the level must win for ``stable_time`` more
+  than it loses, short glitches are cancelled out. Reports each
+  transition ``stable_time`` late, at the moment it is confirmed.
+- :class:`StateMachineFilter`: reports a transition at once, then ignores
+  chatter for ``lockout_time``, and reports the final level afterwards if
+  it differs. Good for buttons and encoder contacts, no added latency.
+
+Example:
+
+    >>> from fusion_hat.pin import Pin
+    >>> from fusion_hat._debounce import StateMachineFilter, IntegratorFilter
+    >>> button = Pin(17, mode=Pin.IN, pull=Pin.PULL_UP, active_state=Pin.ACTIVE_LOW)
+    >>> button.set_filter(StateMachineFilter(0.005))
+    >>> button.when_activated = lambda: print("press")
+
+    Reject glitches shorter than 200 microseconds on a sensor line
+
+    >>> sensor = Pin(27, mode=Pin.IN)
+    >>> sensor.set_filter(IntegratorFilter(0.0002))
+"""
+import time
+import heapq
+import threading
+from typing import Callable
+
+from . import _gpio
+from ._gpio import EdgeEvent
+
+class EdgeFilter:
+    """ Base class of edge filters
+
+    Args:
+        level (int, optional): initial pin level, default is 0
+    """
+    def __init__(self, level: int = 0) -> None:
+        self.lock = threading.Lock()
+        self.pin = None
+        """Pin number of the reported transitions, set by :meth:`fusion_hat.pin.Pin.set_filter`"""
+        self.reset(level)
+
+    def reset(self, level: int) -> None:
+        """ Restart from a stable level
+
+        Args:
+            level (int): pin level(0/1)
+        """
+        self.level = level
+        """Filtered level"""
+        self.raw = level
+        """Last raw level"""
+
+    @staticmethod
+    def _edge(pin: int, level: int, timestamp_ns: int) -> EdgeEvent:
+        return EdgeEvent(pin, _gpio.RISING if level else _gpio.FALLING, timestamp_ns)
+
+    def feed(self, events: list) -> list:
+        """ Filter raw edges
+
+        Args:
+            events (list): raw :class:`fusion_hat._gpio.EdgeEvent` list, oldest first
+
+        Returns:
+            list: stable transitions confirmed so far
+        """
+        raise NotImplementedError
+
+    def expire(self, now_ns: int) -> list:
+        """ Confirm transitions that became stable by now
+
+        Args:
+            now_ns (int): time.monotonic_ns()
+
+        Returns:
+            list: stable transitions confirmed
+        """
+        raise NotImplementedError
+
+    def deadline(self) -> int:
+        """ Time the next transition would be confirmed if no edge comes
+
+        Returns:
+            int: time.monotonic_ns() deadline, None if nothing is pending
+        """
+        raise NotImplementedError
+
+class IntegratorFilter(EdgeFilter):
+    """ Integrator filter
+
+    An integrator runs up while the raw level is high and down while it is
+    low, clamped to ``stable_time``. The filtered level turns high when it
+    reaches the top and low when it reaches the bottom.
+
+    Args:
+        stable_time (float): seconds a level must win to be reported
+        level (int, optional): initial pin level, default is 0
+    """
+    def __init__(self, stable_time: float, level: int = 0) -> None:
+        self.stable_ns = int(stable_time * 1e9)
+        super().__init__(level)
+
+    def reset(self, level: int) -> None:
+        super().reset(level)
+        self.integral = self.stable_ns if level else 0
+        self.last_ns = time.monotonic_ns()
+
+    def _advance(self, to_ns: int, out: list) -> None:
+        dt = to_ns - self.last_ns
+        if dt <= 0:
+            return
+        if self.raw:
+            if self.level == 0 and self.integral + dt >= self.stable_ns:
+                self.level = 1
+                out.append(self._edge(self.pin, 1, self.last_ns + self.stable_ns - self.integral))
+            self.integral = min(self.stable_ns, self.integral + dt)
+        else:
+            if self.level == 1 and self.integral - dt <= 0:
+                self.level = 0
+                out.append(self._edge(self.pin, 0, self.last_ns + self.integral))
+            self.integral = max(0, self.integral - dt)
+        self.last_ns = to_ns
+
+    def feed(self, events: list) -> list:
+        out = []
+        with self.lock:
+            for event in events:
+                self._advance(event.timestamp_ns, out)
+                self.raw = 1 if event.edge == _gpio.RISING else 0
+        return out
+
+    def expire(self, now_ns: int) -> list:
+        out = []
+        with self.lock:
+            self._advance(now_ns, out)
+        return out
+
+    def deadline(self) -> int:
+        if self.raw and self.level == 0:
+            return self.last_ns + self.stable_ns - self.integral
+        if not self.raw and self.level == 1:
+            return self.last_ns + self.integral
+        return None
+
+class StateMachineFilter(EdgeFilter):
+    """ Lockout state machine filter
+
+    Stable: the first edge changing the level is reported at once and
+    starts a lockout. Lockout: edges only update the raw level. When the
+    lockout ends, a raw level differing from the reported one is reported
+    with the time of its last edge, and starts another lockout.
+
+    Args:
+        lockout_time (float): seconds to ignore chatter after a transition
+        level (int, optional): initial pin level, default is 0
+    """
+    def __init__(self, lockout_time: float, level: int = 0) -> None:
+        self.lockout_ns = int(lockout_time * 1e9)
+        super().__init__(level)
+
+    def reset(self, level: int) -> None:
+        super().reset(level)
+        self.lock_until = None
+        self.raw_ns = 0
+
+    def _expire(self, now_ns: int, out: list) -> None:
+        while self.lock_until is not None and now_ns >= self.lock_until:
+            if self.raw == self.level:
+                self.lock_until = None
+                return
+            self.level = self.raw
+            out.append(self._edge(self.pin, self.level, self.raw_ns))
+            self.lock_until += self.lockout_ns
+
+    def feed(self, events: list) -> list:
+        out = []
+        with self.lock:
+            for event in events:
+                now = event.timestamp_ns
+                self._expire(now, out)
+                self.raw = 1 if event.edge == _gpio.RISING else 0
+                self.raw_ns = now
+                if self.lock_until is None and self.raw != self.level:
+                    self.level = self.raw
+                    self.lock_until = now + self.lockout_ns
+                    out.append(event)
+        return out
+
+    def expire(self, now_ns: int) -> list:
+        out = []
+        with self.lock:
+            self._expire(now_ns, out)
+        return out
+
+    def deadline(self) -> int:
+        if self.lock_until is not None and self.raw != self.level:
+            return self.lock_until
+        return None
+
+class _FilterTimer:
+    """ One thread waking filters up at their deadlines """
+    def __init__(self) -> None:
+        self._heap = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="edge-filter-timer", daemon=True)
+        self._thread.start()
+
+    def schedule(self, deadline_ns: int, callback: Callable[[], None]) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (deadline_ns, self._seq, callback))
+            self._seq += 1
+            if self._heap[0][1] == self._seq - 1:
+                self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic_ns()
+                    if self._heap and self._heap[0][0] <= now:
+                        callback = heapq.heappop(self._heap)[2]
+                        break
+                    self._cond.wait((self._heap[0][0] - now) / 1e9 if self._heap else None)
+            callback()
+
+_timer = None
+_timer_lock = threading.Lock()
+
+def get_timer() -> _FilterTimer:
+    """ Get the shared filter timer, started on first use """
+    global _timer
+    with _timer_lock:
+        if _timer is None:
+            _timer = _FilterTimer()
+        return _timer
+
+__all__ = [
+    'EdgeFilter',
+    'IntegratorFilter',
+    'StateMachineFilter',
+]
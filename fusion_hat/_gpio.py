@@ -0,0 +1,510 @@
+""" GPIO backends of :class:`fusion_hat.pin.Pin`
+
+Two backends are available:
+
+- ``rpi``: RPi.GPIO, or the rpi-lgpio shim on Pi 5
+- ``gpiod``: the Linux GPIO character device (``/dev/gpiochipN``) through
+  libgpiod v2 line requests, no shim needed on Pi 5
+
+The default backend is taken from the ``FUSION_HAT_GPIO_BACKEND``
+environment variable. Without it, ``rpi`` is used if RPi.GPIO can be
+imported, otherwise ``gpiod``. The chip used by ``gpiod`` is detected
+automatically and can be forced with ``FUSION_HAT_GPIOCHIP``.
+
+Constants use the values of RPi.GPIO, so they can be passed to either
+backend.
+
+Example:
+
+    Select the backend for all new pins
+
+    >>> from fusion_hat._gpio import set_default_backend
+    >>> set_default_backend("gpiod")
+
+    Or for a single pin
+
+    >>> from fusion_hat.pin import Pin
+    >>> pin = Pin(17, mode=Pin.OUT, backend="gpiod")
+"""
+import os
+import glob
+import select
+import time
+import threading
+from collections import namedtuple
+from datetime import timedelta
+from itertools import groupby
+from operator import attrgetter
+from typing import Callable
+
+IN = 1
+"""Direction input"""
+OUT = 0
+"""Direction output"""
+PUD_OFF = 20
+"""No pull"""
+PUD_DOWN = 21
+"""Pull down"""
+PUD_UP = 22
+"""Pull up"""
+RISING = 31
+"""Rising edge"""
+FALLING = 32
+"""Falling edge"""
+BOTH = 33
+"""Both edges"""
+
+ENV_BACKEND = "FUSION_HAT_GPIO_BACKEND"
+ENV_CHIP = "FUSION_HAT_GPIOCHIP"
+CONSUMER = "fusion-hat"
+
+EdgeEvent = namedtuple("EdgeEvent", ["pin", "edge", "timestamp_ns"])
+"""Edge of a pin: BCM pin number, RISING or FALLING, and CLOCK_MONOTONIC
+time in nanoseconds, comparable with time.monotonic_ns()"""
+
+_pin = attrgetter("pin")
+_timestamp = attrgetter("timestamp_ns")
+
+class GPIOBackend:
+    """ Base class of GPIO backends
+
+    Pins are BCM numbers, directions, pulls and edges use the constants
+    of this module.
+    """
+    name = None
+
+    def setup(self, pin: int, direction: int, pull: int = PUD_OFF, initial: int = None) -> None:
+        """ Configure a pin
+
+        Args:
+            pin (int): BCM pin number
+            direction (int): IN or OUT
+            pull (int, optional): PUD_OFF, PUD_UP or PUD_DOWN, default is PUD_OFF
+            initial (int, optional): initial output value, None to keep it
+        """
+        raise NotImplementedError
+
+    def input(self, pin: int) -> int:
+        """ Read a pin
+
+        Args:
+            pin (int): BCM pin number
+
+        Returns:
+            int: pin value(0/1)
+        """
+        raise NotImplementedError
+
+    def output(self, pin: int, value: int) -> None:
+        """ Write a pin
+
+        Args:
+            pin (int): BCM pin number
+            value (int): pin value(0/1)
+        """
+        raise NotImplementedError
+
+    def cleanup(self, pin: int) -> None:
+        """ Release a pin
+
+        Args:
+            pin (int): BCM pin number
+        """
+        raise NotImplementedError
+
+    def add_event_detect(self, pin: int, edge: int, callback: Callable[[int], None], bouncetime: int = 0) -> None:
+        """ Call a function on pin edges, from a background thread
+
+        Args:
+            pin (int): BCM pin number
+            edge (int): RISING, FALLING or BOTH
+            callback (Callable[[int], None]): called with the pin number
+            bouncetime (int, optional): bounce time in milliseconds, default is 0
+        """
+        raise NotImplementedError
+
+    def add_edge_events(self, pin: int, edge: int, callback: Callable[[list], None], bouncetime: int = 0) -> None:
+        """ Call a function with batches of timestamped edges, from a background thread
+
+        Args:
+            pin (int): BCM pin number
+            edge (int): RISING, FALLING or BOTH
+            callback (Callable[[list], None]): called with a list of :class:`EdgeEvent`
+            bouncetime (int, optional): bounce time in milliseconds, default is 0
+        """
+        raise NotImplementedError
+
+    def remove_event_detect(self, pin: int) -> None:
+        """ Stop edge detection on a pin
+
+        Args:
+            pin (int): BCM pin number
+        """
+        raise NotImplementedError
+
+    def setup_group(self, pins: tuple, direction: int, pull: int = PUD_OFF) -> None:
+        """ Configure several pins to be used together
+
+        Backends able to, request the pins as one group, so they are read
+        or written in a single kernel call. The default configures them
+        one by one.
+
+        Args:
+            pins (tuple): BCM pin numbers
+            direction (int): IN or OUT
+            pull (int, optional): PUD_OFF, PUD_UP or PUD_DOWN, default is PUD_OFF
+        """
+        for pin in pins:
+            self.setup(pin, direction, pull)
+
+    def input_group(self, pins: tuple) -> list:
+        """ Read a group of pins set up with :meth:`setup_group`
+
+        Args:
+            pins (tuple): BCM pin numbers
+
+        Returns:
+            list: pin values(0/1), in the order of pins
+        """
+        return [self.input(pin) for pin in pins]
+
+    def output_group(self, pins: tuple, values: list) -> None:
+        """ Write a group of pins set up with :meth:`setup_group`
+
+        Args:
+            pins (tuple): BCM pin numbers
+            values (list): pin values(0/1), in the order of pins
+        """
+        for pin, value in zip(pins, values):
+            self.output(pin, value)
+
+    def cleanup_group(self, pins: tuple) -> None:
+        """ Release a group of pins set up with :meth:`setup_group`
+
+        Args:
+            pins (tuple): BCM pin numbers
+        """
+        for pin in pins:
+            self.cleanup(pin)
+
+class RPiGPIOBackend(GPIOBackend):
+    """ RPi.GPIO backend, needs rpi-lgpio instead of RPi.GPIO on Pi 5 """
+    name = "rpi"
+
+    def __init__(self) -> None:
+        from RPi import GPIO
+        GPIO.setmode(GPIO.BCM)
+        self.GPIO = GPIO
+        # Bind the hot path calls directly, no extra Python frame per call
+        self.input = GPIO.input
+        self.output = GPIO.output
+        self.cleanup = GPIO.cleanup
+        self.remove_event_detect = GPIO.remove_event_detect
+
+    def setup(self, pin: int, direction: int, pull: int = PUD_OFF, initial: int = None) -> None:
+        if initial is None or direction != OUT:
+            self.GPIO.setup(pin, direction, pull_up_down=pull)
+        else:
+            self.GPIO.setup(pin, direction, pull_up_down=pull, initial=initial)
+
+    def add_event_detect(self, pin: int, edge: int, callback: Callable[[int], None], bouncetime: int = 0) -> None:
+        if bouncetime:
+            self.GPIO.add_event_detect(pin, edge, callback, bouncetime=int(bouncetime))
+        else:
+            self.GPIO.add_event_detect(pin, edge, callback)
+
+    def add_edge_events(self, pin: int, edge: int, callback: Callable[[list], None], bouncetime: int = 0) -> None:
+        # RPi.GPIO has no kernel timestamps, take the time as soon as the callback runs,
+        # and the direction of a BOTH edge from the level read right after it. On signals
+        # faster than the callback thread, the level may have changed again by then,
+        # so the direction can be wrong: use the gpiod backend for those
+        input = self.GPIO.input
+        def on_edge(channel):
+            now = time.monotonic_ns()
+            if edge == BOTH:
+                direction = RISING if input(channel) else FALLING
+            else:
+                direction = edge
+            callback([EdgeEvent(channel, direction, now)])
+        self.add_event_detect(pin, edge, on_edge, bouncetime)
+
+    def setup_group(self, pins: tuple, direction: int, pull: int = PUD_OFF) -> None:
+        self.GPIO.setup(list(pins), direction, pull_up_down=pull)
+
+    def output_group(self, pins: tuple, values: list) -> None:
+        # RPi.GPIO takes channel and value lists in one call
+        self.GPIO.output(list(pins), list(values))
+
+    def cleanup_group(self, pins: tuple) -> None:
+        self.GPIO.cleanup(list(pins))
+
+class GpiodBackend(GPIOBackend):
+    """ GPIO character device backend, built on libgpiod v2
+
+    Every pin is a line request of its own, reconfigured in place when its
+    direction changes. Edges of all pins are passed on in timestamp order.
+
+    Args:
+        chip (str, optional): gpiochip device path, default is auto detected
+    """
+    name = "gpiod"
+    MERGE_WINDOW = 0.001
+    """Seconds an edge is held, while several pins detect edges, so an earlier
+    edge of another pin, queued later by the kernel, is passed on first"""
+
+    def __init__(self, chip: str = None) -> None:
+        import gpiod
+        from gpiod.line import Direction, Value, Bias, Edge
+        self.gpiod = gpiod
+        self._Direction = Direction
+        self._Edge = Edge
+        self._values = (Value.INACTIVE, Value.ACTIVE)
+        self._bias = {PUD_OFF: Bias.DISABLED, PUD_UP: Bias.PULL_UP, PUD_DOWN: Bias.PULL_DOWN}
+        self._edges = {RISING: Edge.RISING, FALLING: Edge.FALLING, BOTH: Edge.BOTH}
+        self.chip = chip or os.environ.get(ENV_CHIP) or self.find_chip()
+        self._requests = {}
+        self._config = {}
+        self._callbacks = {}
+        self._groups = {}
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_w, False)
+        self._thread = None
+
+    def find_chip(self) -> str:
+        """ Find the gpiochip of the 40-pin header
+
+        Returns:
+            str: gpiochip device path, /dev/gpiochip0 if none matched
+        """
+        for path in sorted(glob.glob("/dev/gpiochip*")):
+            try:
+                with self.gpiod.Chip(path) as chip:
+                    label = chip.get_info().label
+            except OSError:
+                continue
+            # pinctrl-rp1 on Pi 5, pinctrl-bcm2711/bcm2835 on earlier models
+            if label.startswith("pinctrl-"):
+                return path
+        return "/dev/gpiochip0"
+
+    def _settings(self, pin: int):
+        direction, pull, initial, edge, bouncetime = self._config[pin]
+        kwargs = {"bias": self._bias[pull]}
+        if direction == OUT:
+            kwargs["direction"] = self._Direction.OUTPUT
+            if initial is not None:
+                kwargs["output_value"] = self._values[1 if initial else 0]
+        else:
+            kwargs["direction"] = self._Direction.INPUT
+            if edge is not None:
+                kwargs["edge_detection"] = self._edges[edge]
+                kwargs["debounce_period"] = timedelta(milliseconds=bouncetime)
+        return self.gpiod.LineSettings(**kwargs)
+
+    def _apply(self, pin: int) -> None:
+        config = {pin: self._settings(pin)}
+        request = self._requests.get(pin)
+        if request is None:
+            self._requests[pin] = self.gpiod.request_lines(self.chip, consumer=CONSUMER, config=config)
+        else:
+            request.reconfigure_lines(config)
+
+    def setup(self, pin: int, direction: int, pull: int = PUD_OFF, initial: int = None) -> None:
+        with self._lock:
+            _, _, _, edge, bouncetime = self._config.get(pin, (None, None, None, None, 0))
+            self._config[pin] = (direction, pull, initial, edge, bouncetime)
+            self._apply(pin)
+
+    def input(self, pin: int) -> int:
+        return self._requests[pin].get_value(pin).value
+
+    def output(self, pin: int, value: int) -> None:
+        self._requests[pin].set_value(pin, self._values[1 if value else 0])
+
+    def cleanup(self, pin: int) -> None:
+        with self._lock:
+            self._callbacks.pop(pin, None)
+            self._config.pop(pin, None)
+            request = self._requests.pop(pin, None)
+        if request is not None:
+            self._wake()
+            request.release()
+
+    def setup_group(self, pins: tuple, direction: int, pull: int = PUD_OFF) -> None:
+        pins = tuple(pins)
+        kwargs = {"bias": self._bias[pull]}
+        kwargs["direction"] = self._Direction.OUTPUT if direction == OUT else self._Direction.INPUT
+        config = {pins: self.gpiod.LineSettings(**kwargs)}
+        with self._lock:
+            request = self._groups.get(pins)
+            if request is None:
+                self._groups[pins] = self.gpiod.request_lines(self.chip, consumer=CONSUMER, config=config)
+            else:
+                request.reconfigure_lines(config)
+
+    def input_group(self, pins: tuple) -> list:
+        # One ioctl for the whole group
+        return [value.value for value in self._groups[pins].get_values(pins)]
+
+    def output_group(self, pins: tuple, values: list) -> None:
+        v = self._values
+        self._groups[pins].set_values({pin: v[1 if value else 0] for pin, value in zip(pins, values)})
+
+    def cleanup_group(self, pins: tuple) -> None:
+        with self._lock:
+            request = self._groups.pop(tuple(pins), None)
+        if request is not None:
+            request.release()
+
+    def add_event_detect(self, pin: int, edge: int, callback: Callable[[int], None], bouncetime: int = 0) -> None:
+        def on_edges(events):
+            for _ in events:
+                callback(pin)
+        self.add_edge_events(pin, edge, on_edges, bouncetime)
+
+    def add_edge_events(self, pin: int, edge: int, callback: Callable[[list], None], bouncetime: int = 0) -> None:
+        with self._lock:
+            direction, pull, initial, _, _ = self._config.get(pin, (IN, PUD_OFF, None, None, 0))
+            if direction != IN:
+                raise RuntimeError(f"Pin {pin} must be an input to detect edges")
+            self._config[pin] = (direction, pull, initial, edge, bouncetime)
+            self._apply(pin)
+            self._callbacks[pin] = callback
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._event_loop, name="gpiod-events", daemon=True)
+                self._thread.start()
+        self._wake()
+
+    def remove_event_detect(self, pin: int) -> None:
+        with self._lock:
+            if self._callbacks.pop(pin, None) is None:
+                return
+            direction, pull, initial, _, _ = self._config[pin]
+            self._config[pin] = (direction, pull, initial, None, 0)
+            self._apply(pin)
+        self._wake()
+
+    def _wake(self) -> None:
+        """ Make the event thread pick up changed requests """
+        # Nothing drains the pipe before the thread starts
+        if self._thread is None:
+            return
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            # Pipe full, the thread has a wake up pending anyway
+            pass
+
+    def _event_loop(self) -> None:
+        rising = self.gpiod.EdgeEvent.Type.RISING_EDGE
+        window = int(self.MERGE_WINDOW * 1e9)
+        pending = []
+        while True:
+            with self._lock:
+                fds = {self._requests[pin].fd: pin for pin in self._callbacks}
+            timeout = None
+            if pending:
+                timeout = max(0, pending[0].timestamp_ns + window - time.monotonic_ns()) / 1e9
+            try:
+                ready, _, _ = select.select([self._wake_r, *fds], [], [], timeout)
+            except (OSError, ValueError):
+                # A request was released meanwhile, the wake pipe has the news
+                continue
+            for fd in ready:
+                if fd == self._wake_r:
+                    os.read(self._wake_r, 64)
+                    continue
+                pin = fds[fd]
+                with self._lock:
+                    request = self._requests.get(pin)
+                    if request is None or pin not in self._callbacks:
+                        continue
+                    events = request.read_edge_events()
+                # Kernel timestamps, taken in the interrupt handler
+                pending.extend(EdgeEvent(pin, RISING if event.event_type == rising else FALLING, event.timestamp_ns)
+                               for event in events)
+            if not pending:
+                continue
+            if len(fds) > 1:
+                # Every line is a request of its own, read one after the other, so merge
+                # their edges by time. An edge is held until the other lines had
+                # MERGE_WINDOW to queue any edge timestamped before it.
+                pending.sort(key=_timestamp)
+                cutoff = time.monotonic_ns() - window
+                count = 0
+                while count < len(pending) and pending[count].timestamp_ns <= cutoff:
+                    count += 1
+                events, pending = pending[:count], pending[count:]
+            else:
+                events, pending = pending, []
+            # One batch per run of edges of the same pin, in timestamp order
+            for pin, run in groupby(events, key=_pin):
+                with self._lock:
+                    callback = self._callbacks.get(pin)
+                if callback is not None:
+                    callback(list(run))
+
+BACKENDS = {
+    RPiGPIOBackend.name: RPiGPIOBackend,
+    GpiodBackend.name: GpiodBackend,
+}
+"""Backend classes by name"""
+
+_instances = {}
+_default = None
+_lock = threading.Lock()
+
+def set_default_backend(name: str = None) -> None:
+    """ Set the backend of pins created without one
+
+    Args:
+        name (str, optional): "rpi" or "gpiod", None to detect it again
+
+    Raises:
+        ValueError: if the backend is unknown
+    """
+    global _default
+    if name is not None and name not in BACKENDS:
+        raise ValueError(f"Unknown GPIO backend: {name}, use one of {list(BACKENDS)}")
+    _default = name
+
+def get_backend(backend: [str, GPIOBackend] = None) -> GPIOBackend:
+    """ Get a GPIO backend, created on first use and shared afterwards
+
+    Args:
+        backend (str, GPIOBackend, optional): backend name or instance, None for the default
+
+    Returns:
+        GPIOBackend: GPIO backend
+
+    Raises:
+        ValueError: if the backend is unknown
+    """
+    if isinstance(backend, GPIOBackend):
+        return backend
+    with _lock:
+        name = backend or _default or os.environ.get(ENV_BACKEND)
+        if name is None:
+            try:
+                import RPi.GPIO
+                name = RPiGPIOBackend.name
+            except ImportError:
+                name = GpiodBackend.name
+        instance = _instances.get(name)
+        if instance is None:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown GPIO backend: {name}, use one of {list(BACKENDS)}")
+            instance = BACKENDS[name]()
+            _instances[name] = instance
+        return instance
+
+__all__ = [
+    'GPIOBackend',
+    'RPiGPIOBackend',
+    'GpiodBackend',
+    'EdgeEvent',
+    'BACKENDS',
+    'get_backend',
+    'set_default_backend',
+]
@@ -55,32 +55,285 @@ Example:
 
     >>> print(i2c.read_block_data(0x01))
     [0, 1, 2]
+
+    Read 64 bytes from register 0x00 in one combined transaction
+
+    >>> data = i2c.read_burst(0x00, 64)
+
+    Read into a preallocated buffer without copying
+
+    >>> buf = bytearray(14)
+    >>> i2c.write_read(0x3B, buf=buf)
+
+    Write a burst of bytes to register 0x10
+
+    >>> i2c.write_burst(0x10, bytes(48))
+
+    Retry less and return False instead of raising I2CError
+
+    >>> from fusion_hat._i2c import RetryPolicy
+    >>> i2c = I2C(address=0x17, retry_policy=RetryPolicy(attempts=2, raise_on_failure=False))
+
+    Read the transaction counters
+
+    >>> i2c.stats.as_dict()
+    {'calls': 12, 'attempts': 13, 'retries': 1, 'failures': 0, 'errors': {}, ...}
+
+    Scan the bus, cached results are reused for a short time
+
+    >>> I2C.scan(bus=1)
+    [23, 104]
+    >>> I2C.scan(bus=1, cached=True)
+    [23, 104]
+
+    Scan several buses at once with quick write probes
+
+    >>> I2C.scan_buses([1, 3], quick=True)
+    {1: [23, 104], 3: []}
 """
 
 #!/usr/bin/env python3
+import time
+import errno
+import random
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import ctypes
+from smbus2 import i2c_msg
+from smbus2.smbus2 import I2C_M_RD
+from typing import Callable, Any
 from ._utils import retry
-from smbus2 import SMBus
 from ._base import _Base
+from ._i2c_bus import get_bus, has_backend
+
+class I2CError(OSError):
+    """ I2C transaction failed after the retry policy gave up
+
+    Args:
+        err (OSError): last error raised by the bus
+        address (int): I2C device address
+        op (str): name of the failed operation
+        attempts (int): number of attempts made
+    """
+    def __init__(self, err: OSError, address: int, op: str, attempts: int) -> None:
+        addr = f"0x{address:02X}" if isinstance(address, int) else f"{address}"
+        super().__init__(err.errno, f"{op} on {addr} failed after {attempts} attempt(s): {err.strerror or err}")
+        self.address = address
+        self.op = op
+        self.attempts = attempts
+
+class RetryPolicy:
+    """ Retry policy for I2C transactions
+
+    Failed transactions are retried with exponential backoff and jitter,
+    depending on the errno of the failure:
+
+    - EBUSY, EAGAIN, EIO, ETIMEDOUT: bus or adapter hiccup, retried up to ``attempts`` times
+    - EREMOTEIO: device NACK, usually busy (e.g. EEPROM write cycle), retried up to ``nack_attempts`` times
+    - ENXIO, ENODEV, EINVAL, EOPNOTSUPP: device missing or request invalid, never retried
+    - others: retried up to ``attempts`` times
+
+    Args:
+        attempts (int, optional): maximum attempts for transient errors, default is 5
+        nack_attempts (int, optional): maximum attempts when the device NACKs, default is 3
+        base_delay (float, optional): delay before the first retry in seconds, default is 0.0005
+        max_delay (float, optional): upper bound of the backoff delay in seconds, default is 0.02
+        jitter (float, optional): relative random spread of each delay(0-1), default is 0.5
+        raise_on_failure (bool, optional): raise :class:`I2CError` when giving up, return False otherwise, default is True
+    """
+
+    TRANSIENT_ERRNOS = (errno.EBUSY, errno.EAGAIN, errno.EIO, errno.ETIMEDOUT)
+    """Errors caused by the bus or adapter, worth retrying"""
+    NACK_ERRNOS = (errno.EREMOTEIO,)
+    """Errors caused by a device not acknowledging"""
+    FATAL_ERRNOS = (errno.ENXIO, errno.ENODEV, errno.EINVAL, errno.EOPNOTSUPP)
+    """Errors that retrying cannot fix"""
+
+    def __init__(self,
+            attempts: int = 5,
+            nack_attempts: int = 3,
+            base_delay: float = 0.0005,
+            max_delay: float = 0.02,
+            jitter: float = 0.5,
+            raise_on_failure: bool = True) -> None:
+        self.attempts = max(1, int(attempts))
+        self.nack_attempts = max(1, int(nack_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.raise_on_failure = raise_on_failure
+
+    def max_attempts(self, err: OSError) -> int:
+        """ Maximum number of attempts allowed for an error
+
+        Args:
+            err (OSError): error raised by the bus
+
+        Returns:
+            int: maximum attempts, 1 means do not retry
+        """
+        if err.errno in self.FATAL_ERRNOS:
+            return 1
+        if err.errno in self.NACK_ERRNOS:
+            return min(self.nack_attempts, self.attempts)
+        return self.attempts
+
+    def delay(self, attempt: int) -> float:
+        """ Backoff delay before the next attempt
+
+        Args:
+            attempt (int): number of the failed attempt, starting from 1
+
+        Returns:
+            float: delay in seconds
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def run(self, func: Callable[..., Any], op: str, address: int, stats: 'I2CStats' = None) -> Any:
+        """ Run a transaction under this policy
+
+        Args:
+            func (Callable): transaction to run, without arguments
+            op (str): operation name, used in errors
+            address (int): I2C device address, used in errors
+            stats (I2CStats, optional): counters to update
+
+        Returns:
+            Any: result of func, or False if it failed and raise_on_failure is False
+
+        Raises:
+            I2CError: if it failed and raise_on_failure is True
+        """
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = func()
+            except OSError as err:
+                if attempt < self.max_attempts(err):
+                    time.sleep(self.delay(attempt))
+                    continue
+                if stats is not None:
+                    stats.record(attempt, time.perf_counter() - start, err.errno)
+                if self.raise_on_failure:
+                    raise I2CError(err, address, op, attempt) from err
+                return False
+            if stats is not None:
+                stats.record(attempt, time.perf_counter() - start)
+            return result
+
+class I2CStats:
+    """ Transaction counters of an I2C device
+
+    Attributes:
+        calls (int): transactions requested
+        attempts (int): bus transactions tried, including retries
+        retries (int): attempts beyond the first one
+        failures (int): transactions that gave up
+        errors (dict): errno of failed transactions and their count
+        latency_total (float): total time spent in transactions in seconds, including backoff
+        latency_max (float): longest transaction in seconds
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """ Reset all counters """
+        with self._lock:
+            self.calls = 0
+            self.attempts = 0
+            self.retries = 0
+            self.failures = 0
+            self.errors = {}
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+
+    def record(self, attempts: int, latency: float, error: int = None) -> None:
+        """ Record one transaction
+
+        Args:
+            attempts (int): attempts made
+            latency (float): time spent in seconds
+            error (int, optional): errno if the transaction failed
+        """
+        with self._lock:
+            self.calls += 1
+            self.attempts += attempts
+            self.retries += attempts - 1
+            self.latency_total += latency
+            if latency > self.latency_max:
+                self.latency_max = latency
+            if error is not None:
+                self.failures += 1
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+    @property
+    def latency_avg(self) -> float:
+        """ Average transaction time in seconds """
+        return self.latency_total / self.calls if self.calls else 0.0
+
+    def as_dict(self) -> dict:
+        """ Snapshot of all counters
+
+        Returns:
+            dict: counters
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "failures": self.failures,
+                "errors": dict(self.errors),
+                "latency_total": self.latency_total,
+                "latency_avg": self.latency_total / self.calls if self.calls else 0.0,
+                "latency_max": self.latency_max,
+            }
+
+def _transaction(func: Callable[..., Any]) -> Callable[..., Any]:
+    """ Run an I2C method under the retry policy of its instance """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        return self.retry_policy.run(lambda: func(self, *args, **kwargs), func.__name__, self.address, self.stats)
+    return wrapper
 
 class I2C(_Base):
     """ I2C bus read/write functions
-    
+
+    Bus transactions are retried according to :attr:`retry_policy`, and
+    raise :class:`I2CError` when it gives up. Counters of every transaction
+    are kept in :attr:`stats`.
+
     Args:
         address (int): I2C device address
         bus (int): I2C bus number
+        retry_policy (RetryPolicy, optional): retry policy, default is RetryPolicy(attempts=RETRY)
         *args: Parameters to pass to :class:`fusion_hat._base._Base`.
         **kwargs: Keyword arguments to pass to :class:`fusion_hat._base._Base`.
     """
 
     RETRY = 5
     DEFAULT_BUS = 1
+    SCAN_CACHE_TTL = 1.0
+    """Seconds a scan result stays valid for cached lookups"""
+    RDWR_MAX_LEN = 8192
+    """Maximum length of a single I2C_RDWR message accepted by the kernel"""
 
-    def __init__(self, *args, address: int = None, bus: int = DEFAULT_BUS, **kwargs) -> None:
+    _scan_cache = {}
+    _scan_cache_lock = threading.Lock()
+
+    def __init__(self, *args, address: int = None, bus: int = DEFAULT_BUS, retry_policy: RetryPolicy = None, **kwargs) -> None:
         super().__init__(*args, **kwargs)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy(attempts=self.RETRY)
+        self.stats = I2CStats()
         self._bus = bus
-        self._smbus = SMBus(self._bus)
+        self._smbus = get_bus(self._bus)
         if isinstance(address, list):
-            connected_devices = self.scan()
+            connected_devices = self.scan(self._bus, cached=True)
             for _addr in address:
                 if _addr in connected_devices:
                     self.address = _addr
@@ -90,7 +343,13 @@ class I2C(_Base):
         else:
             self.address = address
 
-    @retry(RETRY)
+    def close(self) -> None:
+        """ Release the shared I2C bus handle """
+        if self._smbus is not None:
+            self._smbus.close()
+            self._smbus = None
+
+    @_transaction
     def write_byte(self, data: int) -> bool:
         """ Write a byte to the I2C bus
 
@@ -100,11 +359,12 @@ class I2C(_Base):
         Returns:
             bool: True if the byte is written successfully, False otherwise
         """
-        self.log.debug(f"write_byte: 0x{data:02x}({data})")
+        if self._log_debug:
+            self.log.debug("write_byte: 0x%02x(%d)", data, data)
         result = self._smbus.write_byte(self.address, data)
         return result
 
-    @retry(RETRY)
+    @_transaction
     def write_byte_data(self, reg: int, data: int) -> bool:
         """ Write a byte to the I2C bus
 
@@ -115,11 +375,12 @@ class I2C(_Base):
         Returns:
             bool: True if the byte is written successfully, False otherwise
         """
-        self.log.debug(f"write_byte_data: 0x{reg:02x}({reg}), 0x{data:02x}({data})")
+        if self._log_debug:
+            self.log.debug("write_byte_data: 0x%02x(%d), 0x%02x(%d)", reg, reg, data, data)
         result = self._smbus.write_byte_data(self.address, reg, data)
         return result
 
-    @retry(RETRY)
+    @_transaction
     def write_word_data(self, reg: int, data: int, lsb: bool = False) -> bool:
         """ Write a word to the I2C bus
 
@@ -131,16 +392,19 @@ class I2C(_Base):
         Returns:
             bool: True if the word is written successfully, False otherwise
         """
-        msg = f"write_word_data: 0x{reg:02x}({reg}), 0x{data:04x}({data})"
+        word = data
         if lsb:
             l_byte = (data >> 0) & 0xFF
             h_byte = (data >> 8) & 0xFF
             data = (l_byte << 8) | h_byte
-            msg += f", LSB={lsb} (sent: 0x{data:04x}({data}))"
-        self.log.debug(msg)
+        if self._log_debug:
+            if lsb:
+                self.log.debug("write_word_data: 0x%02x(%d), 0x%04x(%d), LSB=%s (sent: 0x%04x(%d))", reg, reg, word, word, lsb, data, data)
+            else:
+                self.log.debug("write_word_data: 0x%02x(%d), 0x%04x(%d)", reg, reg, word, word)
         return self._smbus.write_word_data(self.address, reg, data)
 
-    @retry(RETRY)
+    @_transaction
     def write_i2c_block_data(self, reg: int, data: list) -> bool:
         """ Write a block of data to the I2C bus
 
@@ -151,22 +415,24 @@ class I2C(_Base):
         Returns:
             bool: True if the block of data is written successfully, False otherwise
         """
-        self.log.debug(f"write_i2c_block_data: 0x{reg:02x}({reg}), {data}")
+        if self._log_debug:
+            self.log.debug("write_i2c_block_data: 0x%02x(%d), %s", reg, reg, data)
         result = self._smbus.write_i2c_block_data(self.address, reg, data)
         return result
 
-    @retry(RETRY)
+    @_transaction
     def read_byte(self) -> int:
         """ Read a byte from the I2C bus
 
         Returns:
             int: byte read from the I2C bus
         """
-        self.log.debug(f"read_byte: 0x{self.address:02x}({self.address})")
+        if self._log_debug:
+            self.log.debug("read_byte: 0x%02x(%d)", self.address, self.address)
         result = self._smbus.read_byte(self.address)
         return result
 
-    @retry(RETRY)
+    @_transaction
     def read_byte_data(self, reg: int) -> int:
         """ Read a byte from the I2C bus
 
@@ -176,11 +442,12 @@ class I2C(_Base):
         Returns:
             int: byte read from the I2C bus
         """
-        self.log.debug(f"read_byte_data: 0x{reg:02x}({reg})")
+        if self._log_debug:
+            self.log.debug("read_byte_data: 0x%02x(%d)", reg, reg)
         result = self._smbus.read_byte_data(self.address, reg)
         return result
 
-    @retry(RETRY)
+    @_transaction
     def read_word_data(self, reg: int, lsb: bool = False) -> int:
         """ Read a word from the I2C bus
 
@@ -191,17 +458,19 @@ class I2C(_Base):
         Returns:
             int: word read from the I2C bus
         """
-        msg = f"read_word_data: 0x{reg:02x}({reg})"
         result = self._smbus.read_word_data(self.address, reg)
         if lsb:
             l_byte = (result >> 0) & 0xFF
             h_byte = (result >> 8) & 0xFF
             result = (l_byte << 8) | h_byte  
-            msg += f", LSB={lsb} (received: 0x{result:04x}({result}))"
-        self.log.debug(msg)
+        if self._log_debug:
+            if lsb:
+                self.log.debug("read_word_data: 0x%02x(%d), LSB=%s (received: 0x%04x(%d))", reg, reg, lsb, result, result)
+            else:
+                self.log.debug("read_word_data: 0x%02x(%d)", reg, reg)
         return result
 
-    @retry(RETRY)
+    @_transaction
     def read_i2c_block_data(self, reg: int, num: int) -> list:
         """ Read a block of data from the I2C bus
 
@@ -212,21 +481,23 @@ class I2C(_Base):
         Returns:
             list: block of data read from the I2C bus
         """
-        msg = f"read_i2c_block_data: 0x{reg:02x}({reg}), {num} bytes"
         result = self._smbus.read_i2c_block_data(self.address, reg, num)
-        msg += f", {result}"
-        self.log.debug(msg) 
+        if self._log_debug:
+            self.log.debug("read_i2c_block_data: 0x%02x(%d), %d bytes, %s", reg, reg, num, result)
         return result
 
     @retry(RETRY)
     def is_ready(self) -> bool:
         """Check if the I2C device is ready
 
+        Uses the cached scan result of the bus if it is younger than
+        :attr:`SCAN_CACHE_TTL`.
+
         Returns:
             bool: True if the I2C device is ready, False otherwise
         """
         self.log.debug(f"Check if 0x{self.address:02x}({self.address}) is ready")
-        addresses = self.scan()
+        addresses = self.scan(self._bus, cached=True)
         if self.address in addresses:
             self.log.debug(f"0x{self.address:02x}({self.address}) is ready")
             return True
@@ -234,33 +505,91 @@ class I2C(_Base):
             self.log.debug(f"0x{self.address:02x}({self.address}) is not ready")
             return False
 
-    @staticmethod
-    def scan(bus: int = 1, force: bool = False) -> list:
+    @classmethod
+    def scan(cls, bus: int = 1, force: bool = False, quick: bool = False, cached: bool = False) -> list:
         """Scan the I2C bus for devices
 
+        All addresses are probed on the shared handle of the bus, and the
+        result is cached per bus and probe settings for :attr:`SCAN_CACHE_TTL` seconds.
+        Scans of a bus whose backend is replaced (see
+        :func:`fusion_hat._i2c_bus.set_backend`), e.g. while recording or
+        replaying a trace, are never cached, so every probe goes through it.
+
         Args:
             bus (int, optional): I2C bus number, default is 1
             force (bool, optional): True if force to access the I2C bus, False otherwise, default is False
+            quick (bool, optional): Probe with SMBus quick write like ``i2cdetect`` does,
+                EEPROM ranges(0x30-0x37, 0x50-0x5F) are still probed with a read, default is False
+            cached (bool, optional): Return the cached result if it is still fresh, default is False
 
         Returns:
             list: List of I2C addresses of devices found
         """
+        key = (bus, quick, force)
+        cacheable = not has_backend(bus)
+        if cached and cacheable:
+            with cls._scan_cache_lock:
+                entry = cls._scan_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < cls.SCAN_CACHE_TTL:
+                return list(entry[1])
+
         devices = []
-        for addr in range(0x03, 0x77 + 1):
-            try:
-                with SMBus(bus) as smbus:
-                    # Read a byte from the address
-                    smbus.read_byte(addr, force=force)
+        smbus = get_bus(bus)
+        try:
+            for addr in range(0x03, 0x77 + 1):
+                try:
+                    if quick and not (0x30 <= addr <= 0x37 or 0x50 <= addr <= 0x5F):
+                        smbus.write_quick(addr, force=force)
+                    else:
+                        smbus.read_byte(addr, force=force)
                     devices.append(addr)
-            except OSError as expt:
-                # Ignore device busy or unresponsive errors
-                if expt.errno == 16:  # Device or resource busy
-                    # print(f"Address 0x{addr:02X} busy")
-                    pass
-                # Other errors continue to try
-                continue
-        return devices
+                except OSError as expt:
+                    # Ignore device busy or unresponsive errors
+                    if expt.errno == 16:  # Device or resource busy
+                        pass
+                    # Other errors continue to try
+                    continue
+        finally:
+            smbus.close()
+
+        if cacheable:
+            with cls._scan_cache_lock:
+                cls._scan_cache[key] = (time.monotonic(), devices)
+        return list(devices)
+
+    @classmethod
+    def scan_buses(cls, buses: list, force: bool = False, quick: bool = False, cached: bool = False) -> dict:
+        """Scan several I2C buses concurrently
 
+        Args:
+            buses (list): I2C bus numbers
+            force (bool, optional): True if force to access the I2C bus, False otherwise, default is False
+            quick (bool, optional): Probe with SMBus quick write, see :meth:`scan`, default is False
+            cached (bool, optional): Return cached results if they are still fresh, default is False
+
+        Returns:
+            dict: I2C addresses of devices found, keyed by bus number
+        """
+        buses = list(buses)
+        if not buses:
+            return {}
+        with ThreadPoolExecutor(max_workers=len(buses)) as executor:
+            futures = {bus: executor.submit(cls.scan, bus, force, quick, cached) for bus in buses}
+            return {bus: future.result() for bus, future in futures.items()}
+
+    @classmethod
+    def clear_scan_cache(cls, bus: int = None) -> None:
+        """Drop cached scan results
+
+        Args:
+            bus (int, optional): I2C bus number, leave it None to clear all buses
+        """
+        with cls._scan_cache_lock:
+            if bus is None:
+                cls._scan_cache.clear()
+            else:
+                for key in [key for key in cls._scan_cache if key[0] == bus]:
+                    del cls._scan_cache[key]
 
     def write(self, data: int | list | bytearray) -> None:
         """ Write data to the I2C device
@@ -353,13 +682,127 @@ class I2C(_Base):
         result = self.read_i2c_block_data(memaddr, length)
         return result
 
+    @staticmethod
+    def _read_msg(address: int, view: memoryview) -> tuple:
+        """ Build an i2c_msg that reads straight into a writable buffer
+
+        Args:
+            address (int): I2C device address
+            view (memoryview): byte view of the destination buffer
+
+        Returns:
+            tuple: (i2c_msg, ctypes array), keep the array alive until the transfer is done
+        """
+        array = (ctypes.c_char * view.nbytes).from_buffer(view)
+        msg = i2c_msg(addr=address, flags=I2C_M_RD, len=view.nbytes,
+                      buf=ctypes.cast(array, ctypes.POINTER(ctypes.c_char)))
+        return msg, array
+
+    @staticmethod
+    def _byte_view(buf: bytearray | memoryview, length: int = None) -> memoryview:
+        """ Get a writable, flat byte view of buf, optionally limited to length bytes """
+        view = memoryview(buf).cast('B')
+        if view.readonly:
+            raise ValueError("buf must be a writable bytearray or memoryview")
+        if length is not None:
+            if length > view.nbytes:
+                raise ValueError(f"buf is too small: {view.nbytes} bytes, need {length}")
+            view = view[:length]
+        return view
+
+    @_transaction
+    def write_read(self, reg_bytes: int | list | bytes, n: int = None, buf: bytearray | memoryview = None) -> bytearray | memoryview:
+        """ Write register address bytes then read n bytes, in a single combined transaction
+
+        The write and the read are sent with one ``I2C_RDWR`` ioctl and a
+        repeated start, so they are not limited to 32 bytes like SMBus
+        block reads. Each message can carry up to :attr:`RDWR_MAX_LEN` bytes.
+
+        Args:
+            reg_bytes (int | list | bytes): register address byte(s) to write before reading
+            n (int, optional): number of bytes to read, default is the length of buf
+            buf (bytearray | memoryview, optional): buffer to read into without copying,
+                a new bytearray is created if None
+
+        Returns:
+            bytearray | memoryview: buf, or the new bytearray holding the data
+
+        Raises:
+            ValueError: if neither n nor buf is given, or buf is too small or read-only
+        """
+        if isinstance(reg_bytes, int):
+            reg_bytes = [reg_bytes]
+        if buf is None:
+            if n is None:
+                raise ValueError("either n or buf must be given")
+            buf = bytearray(n)
+        view = self._byte_view(buf, n)
+        if view.nbytes > self.RDWR_MAX_LEN:
+            raise ValueError(f"cannot read more than {self.RDWR_MAX_LEN} bytes in one message")
+        if self._log_debug:
+            self.log.debug("write_read: %s, %d bytes", list(reg_bytes), view.nbytes)
+        write = i2c_msg.write(self.address, reg_bytes)
+        read, _array = self._read_msg(self.address, view)
+        self._smbus.i2c_rdwr(write, read)
+        return buf
+
+    def read_burst(self, reg: int, n: int = None, buf: bytearray | memoryview = None) -> bytearray | memoryview:
+        """ Read n bytes starting from a register, relying on register auto increment
+
+        The whole read is one combined transaction, up to :attr:`RDWR_MAX_LEN` bytes.
+
+        Args:
+            reg (int): first register address
+            n (int, optional): number of bytes to read, default is the length of buf
+            buf (bytearray | memoryview, optional): buffer to read into without copying,
+                a new bytearray is created if None
+
+        Returns:
+            bytearray | memoryview: buf, or the new bytearray holding the data
+
+        Raises:
+            ValueError: if more than :attr:`RDWR_MAX_LEN` bytes are requested
+        """
+        return self.write_read(reg, n, buf)
+
+    @_transaction
+    def write_burst(self, reg: int, data: list | bytes | bytearray | memoryview) -> bool:
+        """ Write data starting from a register, relying on register auto increment
+
+        Unlike :meth:`write_i2c_block_data` the data is not limited to 32 bytes,
+        it is sent as one message of up to :attr:`RDWR_MAX_LEN` bytes including
+        the register address.
+
+        Args:
+            reg (int): first register address
+            data (list | bytes | bytearray | memoryview): data to write
+
+        Returns:
+            bool: True if the data is written successfully, False otherwise
+
+        Raises:
+            ValueError: if data is longer than :attr:`RDWR_MAX_LEN` - 1 bytes
+        """
+        view = memoryview(bytes(data) if isinstance(data, list) else data).cast('B')
+        if view.nbytes > self.RDWR_MAX_LEN - 1:
+            raise ValueError(f"cannot write more than {self.RDWR_MAX_LEN - 1} bytes in one message")
+        if self._log_debug:
+            self.log.debug("write_burst: 0x%02x(%d), %d bytes", reg, reg, view.nbytes)
+        payload = bytearray(view.nbytes + 1)
+        payload[0] = reg
+        payload[1:] = view
+        self._smbus.i2c_rdwr(i2c_msg.write(self.address, payload))
+        return True
+
     def is_avaliable(self) -> bool:
         """ Check if the I2C device is avaliable
 
+        Uses the cached scan result of the bus, see :meth:`is_ready`.
+
         Returns:
             bool: True if the I2C device is avaliable, False otherwise
         """
-        return self.address in self.scan()
+        return self.address in self.scan(self._bus, cached=True)
 
     def _write_byte(self, data: int) -> None:
         """ [DEPRECATED] Write a byte to I2C register
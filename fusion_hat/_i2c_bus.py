@@ -0,0 +1,540 @@
+""" Shared I2C bus handles
+
+Every driver talking to the same I2C bus shares one reference-counted
+:class:`SharedBus`, so only one file descriptor is opened per bus and all
+transactions on it are serialised by a per-bus lock.
+
+Example:
+
+    Get the shared handle of bus 1
+
+    >>> from fusion_hat._i2c_bus import get_bus
+    >>> bus = get_bus(1)
+
+    Use it like a smbus2.SMBus, every call is thread safe
+
+    >>> bus.write_byte_data(0x68, 0x6B, 0x00)
+    >>> bus.read_byte_data(0x68, 0x75)
+    104
+
+    Keep a multi-step sequence atomic by holding the bus lock
+
+    >>> with bus.lock:
+    ...     high = bus.read_byte_data(0x68, 0x3B)
+    ...     low = bus.read_byte_data(0x68, 0x3C)
+
+    Release the handle, the bus is closed with the last reference
+
+    >>> bus.close()
+
+    Run transactions on the dedicated worker thread of bus 1
+
+    >>> from fusion_hat._i2c_bus import get_worker
+    >>> future = get_worker(1).submit(bus.read_byte_data, 0x68, 0x75)
+    >>> future.result()
+    104
+
+    Time-critical reads jump ahead of queued background work, and a
+    generator job yields the bus between its steps
+
+    >>> from fusion_hat._i2c_bus import PRIORITY_HIGH, PRIORITY_LOW
+    >>> def slow_update():
+    ...     for value in range(16):
+    ...         bus.write_byte(0x27, value)
+    ...         yield 0.002     # bus is free for 2 ms
+    >>> worker = get_worker(1)
+    >>> worker.submit(slow_update, priority=PRIORITY_LOW)
+    >>> worker.run(bus.read_byte_data, 0x68, 0x75, priority=PRIORITY_HIGH, deadline=0.005)
+    104
+    >>> worker.histogram(PRIORITY_HIGH).as_dict()
+"""
+import bisect
+import heapq
+import inspect
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Any, Hashable
+from smbus2 import SMBus
+
+_buses = {}
+_buses_lock = threading.Lock()
+_workers = {}
+_workers_lock = threading.Lock()
+_backends = {}
+
+class SharedBus:
+    """ Reference-counted, thread safe wrapper of smbus2.SMBus
+
+    Do not create it directly, use :func:`get_bus` instead.
+
+    Args:
+        bus (int): I2C bus number
+    """
+
+    def __init__(self, bus: int) -> None:
+        self.bus = bus
+        self.lock = threading.RLock()
+        """Per-bus lock, hold it to keep several transactions atomic"""
+        self._smbus = None
+        self._refs = 0
+        self._open()
+
+    def _open(self):
+        """ Open the backend of the bus, on creation and after the backend changed """
+        self._smbus = _backends.get(self.bus, SMBus)(self.bus)
+        return self._smbus
+
+    @property
+    def refs(self) -> int:
+        """ Number of drivers holding this handle """
+        return self._refs
+
+    def close(self) -> None:
+        """ Release this handle, the bus is closed when no one uses it anymore """
+        with _buses_lock:
+            if self._refs <= 0:
+                return
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            if _buses.get(self.bus) is self:
+                del _buses[self.bus]
+        with self.lock:
+            if self._smbus is not None:
+                self._smbus.close()
+                self._smbus = None
+
+    def write_quick(self, i2c_addr: int, force: bool = None) -> None:
+        """ Perform a quick write transaction """
+        with self.lock:
+            return (self._smbus or self._open()).write_quick(i2c_addr, force=force)
+
+    def read_byte(self, i2c_addr: int, force: bool = None) -> int:
+        """ Read a single byte from a device """
+        with self.lock:
+            return (self._smbus or self._open()).read_byte(i2c_addr, force=force)
+
+    def write_byte(self, i2c_addr: int, value: int, force: bool = None) -> None:
+        """ Write a single byte to a device """
+        with self.lock:
+            return (self._smbus or self._open()).write_byte(i2c_addr, value, force=force)
+
+    def read_byte_data(self, i2c_addr: int, register: int, force: bool = None) -> int:
+        """ Read a single byte from a designated register """
+        with self.lock:
+            return (self._smbus or self._open()).read_byte_data(i2c_addr, register, force=force)
+
+    def write_byte_data(self, i2c_addr: int, register: int, value: int, force: bool = None) -> None:
+        """ Write a byte to a given register """
+        with self.lock:
+            return (self._smbus or self._open()).write_byte_data(i2c_addr, register, value, force=force)
+
+    def read_word_data(self, i2c_addr: int, register: int, force: bool = None) -> int:
+        """ Read a single word (2 bytes) from a given register """
+        with self.lock:
+            return (self._smbus or self._open()).read_word_data(i2c_addr, register, force=force)
+
+    def write_word_data(self, i2c_addr: int, register: int, value: int, force: bool = None) -> None:
+        """ Write a single word (2 bytes) to a given register """
+        with self.lock:
+            return (self._smbus or self._open()).write_word_data(i2c_addr, register, value, force=force)
+
+    def read_i2c_block_data(self, i2c_addr: int, register: int, length: int, force: bool = None) -> list:
+        """ Read a block of byte data from a given register """
+        with self.lock:
+            return (self._smbus or self._open()).read_i2c_block_data(i2c_addr, register, length, force=force)
+
+    def write_i2c_block_data(self, i2c_addr: int, register: int, data: list, force: bool = None) -> None:
+        """ Write a block of byte data to a given register """
+        with self.lock:
+            return (self._smbus or self._open()).write_i2c_block_data(i2c_addr, register, data, force=force)
+
+    def i2c_rdwr(self, *i2c_msgs) -> None:
+        """ Combine a series of i2c read and write operations in a single transaction """
+        with self.lock:
+            return (self._smbus or self._open()).i2c_rdwr(*i2c_msgs)
+
+PRIORITY_HIGH = 0
+"""Priority of time-critical transactions, e.g. IMU sampling"""
+PRIORITY_NORMAL = 1
+"""Default priority"""
+PRIORITY_LOW = 2
+"""Priority of slow background work, e.g. display updates"""
+
+class LatencyHistogram:
+    """ Histogram of job latencies, from submission to completion
+
+    Args:
+        bounds (tuple, optional): upper bounds of the buckets in seconds,
+            an overflow bucket is added after the last one
+    """
+    BOUNDS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01,
+              0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+    def __init__(self, bounds: tuple = BOUNDS) -> None:
+        self.bounds = tuple(bounds)
+        self.reset()
+
+    def reset(self) -> None:
+        """ Clear the histogram """
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Jobs dropped or finished after their deadline
+        self.missed = 0
+
+    def record(self, latency: float) -> None:
+        """ Add a latency
+
+        Args:
+            latency (float): latency in seconds
+        """
+        self.counts[bisect.bisect_left(self.bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    @property
+    def mean(self) -> float:
+        """ Mean latency in seconds """
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """ Upper bound of the bucket holding the p-th percentile
+
+        Args:
+            p (float): percentile, 0 to 100
+
+        Returns:
+            float: latency in seconds, max latency for the overflow bucket
+        """
+        if self.count == 0:
+            return 0.0
+        rank = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> dict:
+        """ Histogram as a dict
+
+        Returns:
+            dict: count, mean, max, missed and buckets keyed by upper bound
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "missed": self.missed,
+            "buckets": dict(zip(self.bounds + (float("inf"),), self.counts)),
+        }
+
+class _Job:
+    __slots__ = ("future", "key", "func", "args", "kwargs", "priority",
+                 "deadline", "submitted", "seq", "steps")
+
+class BusWorker:
+    """ Dedicated thread arbitrating the transactions of one I2C bus
+
+    Jobs are served by priority (lower value first), then by deadline,
+    then in submission order. A job whose deadline passed before it
+    started is dropped with a TimeoutError.
+
+    A job may be a generator function: every ``yield`` ends one step and
+    lets more urgent jobs use the bus before the next step. Yielding a
+    number of seconds also frees the bus for that long, instead of
+    sleeping on the bus thread.
+
+    Jobs submitted with the same ``key`` while an earlier one is still
+    queued are coalesced: they share its future instead of running again.
+    Do not create it directly, use :func:`get_worker` instead.
+
+    Args:
+        bus (int): I2C bus number
+    """
+
+    def __init__(self, bus: int) -> None:
+        self.bus = bus
+        self._ready = []
+        self._sleeping = []
+        self._seq = 0
+        self._pending = {}
+        self._stopping = False
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self.histograms = {}
+        """Latency histograms keyed by priority"""
+        self._thread = threading.Thread(target=self._loop, name=f"i2c-{bus}-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable[..., Any], *args, key: Hashable = None,
+               priority: int = PRIORITY_NORMAL, deadline: float = None, **kwargs) -> Future:
+        """ Queue a job
+
+        Args:
+            func (Callable): job to run on the bus thread, may be a generator function
+            *args: arguments of func
+            key (Hashable, optional): coalescing key, jobs with the same key share
+                one queued run, leave it None to never coalesce
+            priority (int, optional): priority, lower runs first, default is PRIORITY_NORMAL
+            deadline (float, optional): seconds from now the job must start within,
+                None for no deadline
+            **kwargs: keyword arguments of func
+
+        Returns:
+            concurrent.futures.Future: future of the job result
+        """
+        now = time.monotonic()
+        with self._cond:
+            if key is not None:
+                future = self._pending.get(key)
+                if future is not None and not future.cancelled():
+                    future.waiters += 1
+                    return future
+            future = Future()
+            future.waiters = 1
+            if key is not None:
+                self._pending[key] = future
+            job = _Job()
+            job.future = future
+            job.key = key
+            job.func = func
+            job.args = args
+            job.kwargs = kwargs
+            job.priority = priority
+            job.deadline = None if deadline is None else now + deadline
+            job.submitted = now
+            job.seq = self._seq
+            job.steps = None
+            self._seq += 1
+            self._push(job)
+            self._cond.notify()
+        return future
+
+    def run(self, func: Callable[..., Any], *args, priority: int = PRIORITY_NORMAL,
+            deadline: float = None, timeout: float = None, **kwargs) -> Any:
+        """ Run a job and wait for its result
+
+        Called from the bus thread itself, e.g. inside another job, the job
+        runs inline to avoid a deadlock.
+
+        Args:
+            func (Callable): job, may be a generator function
+            *args: arguments of func
+            priority (int, optional): priority, lower runs first, default is PRIORITY_NORMAL
+            deadline (float, optional): seconds from now the job must start within
+            timeout (float, optional): seconds to wait for the result, None to wait forever
+            **kwargs: keyword arguments of func
+
+        Returns:
+            Any: result of func
+        """
+        if threading.current_thread() is self._thread:
+            result = func(*args, **kwargs)
+            if not inspect.isgenerator(result):
+                return result
+            try:
+                while True:
+                    delay = next(result)
+                    if delay:
+                        time.sleep(delay)
+            except StopIteration as stop:
+                return stop.value
+        return self.submit(func, *args, priority=priority, deadline=deadline, **kwargs).result(timeout)
+
+    def cancel(self, future: Future) -> bool:
+        """ Withdraw one waiter of a future, the job is cancelled when no waiter is left
+
+        Args:
+            future (concurrent.futures.Future): future returned by :meth:`submit`
+
+        Returns:
+            bool: True if the job was cancelled before it ran
+        """
+        with self._lock:
+            future.waiters -= 1
+            if future.waiters > 0:
+                return False
+        return future.cancel()
+
+    def histogram(self, priority: int = PRIORITY_NORMAL) -> LatencyHistogram:
+        """ Latency histogram of a priority
+
+        Args:
+            priority (int, optional): priority, default is PRIORITY_NORMAL
+
+        Returns:
+            LatencyHistogram: latency histogram
+        """
+        hist = self.histograms.get(priority)
+        if hist is None:
+            hist = self.histograms.setdefault(priority, LatencyHistogram())
+        return hist
+
+    def reset_stats(self) -> None:
+        """ Clear all latency histograms """
+        for hist in list(self.histograms.values()):
+            hist.reset()
+
+    def _push(self, job: _Job) -> None:
+        order = float("inf") if job.deadline is None else job.deadline
+        heapq.heappush(self._ready, (job.priority, order, job.seq, job))
+
+    def _next_job(self) -> _Job:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._sleeping and self._sleeping[0][0] <= now:
+                    self._push(heapq.heappop(self._sleeping)[-1])
+                if self._ready:
+                    job = heapq.heappop(self._ready)[-1]
+                    if job.key is not None and self._pending.get(job.key) is job.future:
+                        del self._pending[job.key]
+                    return job
+                if self._stopping and not self._sleeping:
+                    return None
+                self._cond.wait(self._sleeping[0][0] - now if self._sleeping else None)
+
+    def _finish(self, job: _Job) -> None:
+        now = time.monotonic()
+        hist = self.histogram(job.priority)
+        hist.record(now - job.submitted)
+        if job.deadline is not None and now > job.deadline:
+            hist.missed += 1
+
+    def _loop(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            future = job.future
+            try:
+                if job.steps is None:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    if job.deadline is not None and time.monotonic() > job.deadline:
+                        self.histogram(job.priority).missed += 1
+                        future.set_exception(TimeoutError(f"I2C bus {self.bus} job missed its deadline"))
+                        continue
+                    result = job.func(*job.args, **job.kwargs)
+                    if not inspect.isgenerator(result):
+                        self._finish(job)
+                        future.set_result(result)
+                        continue
+                    job.steps = result
+                delay = next(job.steps)
+            except StopIteration as stop:
+                self._finish(job)
+                future.set_result(stop.value)
+            except BaseException as err:
+                self._finish(job)
+                future.set_exception(err)
+            else:
+                # Resume later, keeping the original order of the job
+                with self._cond:
+                    if delay:
+                        heapq.heappush(self._sleeping, (time.monotonic() + delay, job.seq, job))
+                    else:
+                        self._push(job)
+
+    def stop(self) -> None:
+        """ Stop the worker thread once queued jobs are done """
+        with _workers_lock:
+            if _workers.get(self.bus) is self:
+                del _workers[self.bus]
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+def get_bus(bus: int = 1) -> SharedBus:
+    """ Get the shared handle of an I2C bus
+
+    The handle is opened on first use and reference counted afterwards,
+    call :meth:`SharedBus.close` when the handle is no longer needed.
+
+    Args:
+        bus (int, optional): I2C bus number, default is 1
+
+    Returns:
+        SharedBus: shared bus handle
+    """
+    with _buses_lock:
+        shared = _buses.get(bus)
+        if shared is None:
+            shared = SharedBus(bus)
+            _buses[bus] = shared
+        shared._refs += 1
+        return shared
+
+def set_backend(bus: int, factory: Callable[[int], Any] = None) -> None:
+    """ Replace the SMBus implementation behind a bus
+
+    The factory is called with the bus number and must return an object
+    with the smbus2.SMBus methods used by :class:`SharedBus`. An already
+    open shared handle switches to the new backend on its next transaction.
+
+    Args:
+        bus (int): I2C bus number
+        factory (Callable[[int], Any], optional): backend factory, None to restore smbus2.SMBus
+    """
+    with _buses_lock:
+        if factory is None:
+            _backends.pop(bus, None)
+        else:
+            _backends[bus] = factory
+        shared = _buses.get(bus)
+        if shared is None:
+            return
+        with shared.lock:
+            if shared._smbus is not None:
+                shared._smbus.close()
+                shared._smbus = None
+
+def has_backend(bus: int) -> bool:
+    """ Check whether the SMBus implementation of a bus is replaced
+
+    Args:
+        bus (int): I2C bus number
+
+    Returns:
+        bool: True if a factory was set with :func:`set_backend`
+    """
+    with _buses_lock:
+        return bus in _backends
+
+def get_worker(bus: int = 1) -> BusWorker:
+    """ Get the worker thread of an I2C bus, started on first use
+
+    Args:
+        bus (int, optional): I2C bus number, default is 1
+
+    Returns:
+        BusWorker: bus worker
+    """
+    with _workers_lock:
+        worker = _workers.get(bus)
+        if worker is None:
+            worker = BusWorker(bus)
+            _workers[bus] = worker
+        return worker
+
+__all__ = [
+    'SharedBus',
+    'BusWorker',
+    'LatencyHistogram',
+    'PRIORITY_HIGH',
+    'PRIORITY_NORMAL',
+    'PRIORITY_LOW',
+    'get_bus',
+    'get_worker',
+    'set_backend',
+    'has_backend',
+]
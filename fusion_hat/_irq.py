@@ -0,0 +1,183 @@
+""" Dispatcher of pin interrupt callbacks
+
+Pin callbacks used to run on the single event thread of the GPIO
+backend, so one slow callback delayed the interrupts of every other pin.
+The dispatcher moves each edge onto a bounded queue served by a pool of
+worker threads:
+
+- edges of the same pin run one at a time, in order
+- bursts of a pin can be coalesced, only its newest queued edge is kept
+- edges arriving while the queue is full are dropped and counted
+- edges that start later than ``late_after`` after they happened are counted
+
+Example:
+
+    Pins use the shared dispatcher, make it bigger before creating them
+
+    >>> from fusion_hat._irq import IRQDispatcher, set_dispatcher
+    >>> set_dispatcher(IRQDispatcher(workers=4, maxsize=1024))
+
+    Check the counters
+
+    >>> from fusion_hat._irq import get_dispatcher
+    >>> get_dispatcher().stats()
+    {'dispatched': 12, 'coalesced': 0, 'dropped': 0, 'late': 1, 'queued': 0}
+"""
+import time
+import threading
+from collections import deque
+from typing import Callable, Hashable
+
+from ._base import _Base
+
+class IRQDispatcher(_Base):
+    """ Bounded queue of edge callbacks served by a worker pool
+
+    Args:
+        workers (int, optional): number of worker threads, default is 2
+        maxsize (int, optional): most queued edges, default is 256
+        late_after (float, optional): seconds after the edge a callback counts as late, default is 0.05
+        *args: Additional arguments for :class:`fusion_hat._base._Base`
+        **kwargs: Additional keyword arguments for :class:`fusion_hat._base._Base`
+    """
+
+    def __init__(self, workers: int = 2, maxsize: int = 256, late_after: float = 0.05, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.maxsize = maxsize
+        self.late_after = late_after
+        self._late_after_ns = int(late_after * 1e9)
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._ready = deque()
+        self._running = set()
+        self._size = 0
+        self._stopping = False
+        self.dispatched = 0
+        """Callbacks run"""
+        self.coalesced = 0
+        """Edges replaced by a newer edge of the same pin"""
+        self.dropped = 0
+        """Edges dropped because the queue was full"""
+        self.late = 0
+        """Callbacks started more than late_after after their edge"""
+        self._threads = [threading.Thread(target=self._loop, name=f"irq-dispatch-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key: Hashable, func: Callable, event, coalesce: bool = False) -> bool:
+        """ Queue a callback of an edge
+
+        Args:
+            key (Hashable): ordering key, usually the pin number, callbacks with the
+                same key run one at a time in order
+            func (Callable): callback, called with event
+            event (fusion_hat._gpio.EdgeEvent): edge
+            coalesce (bool, optional): replace the newest queued edge of the same key
+                instead of queueing another one, default is False
+
+        Returns:
+            bool: False if the edge was dropped
+        """
+        with self._cond:
+            queue = self._pending.get(key)
+            if coalesce and queue:
+                queue[-1] = (func, event)
+                self.coalesced += 1
+                return True
+            if self._size >= self.maxsize or self._stopping:
+                self.dropped += 1
+                return False
+            if queue is None:
+                queue = self._pending[key] = deque()
+            queue.append((func, event))
+            self._size += 1
+            if len(queue) == 1 and key not in self._running:
+                self._ready.append(key)
+                self._cond.notify()
+        return True
+
+    def stats(self) -> dict:
+        """ Counters of the dispatcher
+
+        Returns:
+            dict: dispatched, coalesced, dropped, late and queued counts
+        """
+        return {
+            "dispatched": self.dispatched,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "late": self.late,
+            "queued": self._size,
+        }
+
+    def reset_stats(self) -> None:
+        """ Clear the counters """
+        with self._cond:
+            self.dispatched = self.coalesced = self.dropped = self.late = 0
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready and not self._stopping:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                func, event = self._pending[key].popleft()
+                self._size -= 1
+                self._running.add(key)
+                if time.monotonic_ns() - event.timestamp_ns > self._late_after_ns:
+                    self.late += 1
+                self.dispatched += 1
+            try:
+                func(event)
+            except Exception:
+                self.log.exception("IRQ callback of %s failed", key)
+            with self._cond:
+                self._running.discard(key)
+                if self._pending[key]:
+                    self._ready.append(key)
+                    self._cond.notify()
+                else:
+                    del self._pending[key]
+
+    def stop(self) -> None:
+        """ Stop the workers once queued callbacks are done """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher() -> IRQDispatcher:
+    """ Get the shared dispatcher, started on first use
+
+    Returns:
+        IRQDispatcher: shared dispatcher
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = IRQDispatcher()
+        return _dispatcher
+
+def set_dispatcher(dispatcher: IRQDispatcher) -> None:
+    """ Replace the shared dispatcher, pins created afterwards use it
+
+    Args:
+        dispatcher (IRQDispatcher): new shared dispatcher
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        _dispatcher = dispatcher
+
+__all__ = [
+    'IRQDispatcher',
+    'get_dispatcher',
+    'set_dispatcher',
+]
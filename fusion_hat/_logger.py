@@ -64,5 +64,8 @@ class Logger(logging.Logger):
         if isinstance(level, str):
             level = level.upper()
         super().setLevel(level)
+        # Not registered with the logging manager, which only clears the
+        # isEnabledFor() cache of registered loggers
+        self._cache.clear()
         for handler in self.handlers:
             handler.setLevel(level)
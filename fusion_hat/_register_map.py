@@ -0,0 +1,274 @@
+""" Register map with shadow registers
+
+A small helper for drivers that configure devices through 8-bit
+registers. It keeps a shadow copy of the configuration registers it
+writes, so reading them back or updating some of their bits does not
+need a bus read while the shadow is valid, and it groups writes to
+adjacent registers into one burst when the transport can do so.
+
+Only registers listed as ``shadowed`` are cached. Status and data
+registers, which the device changes by itself, are always read from the
+bus.
+
+Example:
+
+    Declare the registers and fields of a device
+
+    >>> from fusion_hat._register_map import RegisterMap, Field
+    >>> from fusion_hat._i2c_bus import get_bus
+    >>> ACCEL_CONFIG = 0x1C
+    >>> ACCEL_FS = Field(ACCEL_CONFIG, shift=3, width=2)
+    >>> regs = RegisterMap.from_smbus(get_bus(1), 0x68, shadowed=[0x19, 0x1A, 0x1B, 0x1C])
+
+    The first read goes to the bus, later reads use the shadow
+
+    >>> regs.read(ACCEL_CONFIG)
+    0
+    >>> regs.write_field(ACCEL_FS, 2)   # read-modify-write without a bus read
+    >>> regs.read(ACCEL_CONFIG)
+    16
+
+    Write 0x19-0x1C in one burst
+
+    >>> regs.write_many({0x19: 9, 0x1A: 3, 0x1B: 0x08, 0x1C: 0x10})
+
+    Forget the shadow after a device reset
+
+    >>> regs.invalidate()
+"""
+import threading
+from typing import Callable, Iterable
+
+class Field:
+    """ Bit field of a register
+
+    Args:
+        register (int): register address
+        shift (int): position of the lowest bit
+        width (int, optional): number of bits, default is 1
+    """
+    def __init__(self, register: int, shift: int, width: int = 1) -> None:
+        self.register = register
+        self.shift = shift
+        self.width = width
+        self.mask = ((1 << width) - 1) << shift
+
+    def __repr__(self) -> str:
+        return f"Field(0x{self.register:02X}, shift={self.shift}, width={self.width})"
+
+class RegisterMap:
+    """ Register map with shadow registers
+
+    Args:
+        read (Callable[[int], int]): read a register
+        write (Callable[[int, int], None]): write a register
+        write_block (Callable[[int, list], None], optional): write consecutive registers
+            starting from an address in one transaction, None if the transport can't
+        shadowed (Iterable[int], optional): registers safe to cache, default is none
+        max_block (int, optional): longest block write_block accepts, default is 32
+        lock (threading.RLock, optional): lock held during read-modify-write, default is a new one
+    """
+    def __init__(self,
+            read: Callable[[int], int],
+            write: Callable[[int, int], None],
+            write_block: Callable[[int, list], None] = None,
+            shadowed: Iterable[int] = (),
+            max_block: int = 32,
+            lock: threading.RLock = None) -> None:
+        self._read = read
+        self._write = write
+        self._write_block = write_block
+        self.shadowed = frozenset(shadowed)
+        self.max_block = max_block
+        self.lock = lock if lock is not None else threading.RLock()
+        self._shadow = {}
+
+    @classmethod
+    def from_smbus(cls, bus, address: int, shadowed: Iterable[int] = (), **kwargs) -> 'RegisterMap':
+        """ Register map of a device on a shared I2C bus handle
+
+        Args:
+            bus (fusion_hat._i2c_bus.SharedBus): shared bus handle
+            address (int): I2C device address
+            shadowed (Iterable[int], optional): registers safe to cache
+            **kwargs: Keyword arguments to pass to :class:`RegisterMap`
+
+        Returns:
+            RegisterMap: register map
+        """
+        return cls(
+            lambda reg: bus.read_byte_data(address, reg),
+            lambda reg, value: bus.write_byte_data(address, reg, value),
+            lambda reg, values: bus.write_i2c_block_data(address, reg, values),
+            shadowed=shadowed, lock=bus.lock, **kwargs)
+
+    @classmethod
+    def from_i2c(cls, i2c, shadowed: Iterable[int] = (), **kwargs) -> 'RegisterMap':
+        """ Register map of a :class:`fusion_hat._i2c.I2C` device
+
+        Block writes use :meth:`fusion_hat._i2c.I2C.write_burst`, so they are not limited to 32 bytes.
+
+        Args:
+            i2c (fusion_hat._i2c.I2C): I2C device
+            shadowed (Iterable[int], optional): registers safe to cache
+            **kwargs: Keyword arguments to pass to :class:`RegisterMap`
+
+        Returns:
+            RegisterMap: register map
+        """
+        kwargs.setdefault("max_block", i2c.RDWR_MAX_LEN - 1)
+        return cls(i2c.read_byte_data, i2c.write_byte_data, i2c.write_burst, shadowed=shadowed, **kwargs)
+
+    def is_valid(self, reg: int) -> bool:
+        """ Check if the shadow of a register is valid
+
+        Args:
+            reg (int): register address
+
+        Returns:
+            bool: True if reading it won't touch the bus
+        """
+        return reg in self._shadow
+
+    def invalidate(self, reg: int = None) -> None:
+        """ Drop shadow values, e.g. after a device reset
+
+        Args:
+            reg (int, optional): register address, leave it None to drop all
+        """
+        with self.lock:
+            if reg is None:
+                self._shadow.clear()
+            else:
+                self._shadow.pop(reg, None)
+
+    def read(self, reg: int, cached: bool = True) -> int:
+        """ Read a register
+
+        Args:
+            reg (int): register address
+            cached (bool, optional): False to bypass the shadow and read the bus, default is True
+
+        Returns:
+            int: register value
+        """
+        if cached:
+            value = self._shadow.get(reg)
+            if value is not None:
+                return value
+        value = self._read(reg)
+        if reg in self.shadowed:
+            self._shadow[reg] = value
+        return value
+
+    def write(self, reg: int, value: int) -> None:
+        """ Write a register
+
+        Args:
+            reg (int): register address
+            value (int): register value
+        """
+        value &= 0xFF
+        with self.lock:
+            self._write(reg, value)
+            if reg in self.shadowed:
+                self._shadow[reg] = value
+
+    def update_bits(self, reg: int, mask: int, value: int) -> int:
+        """ Read-modify-write the bits of a register selected by mask
+
+        The read is served from the shadow when it is valid, and nothing
+        is written if the bits already hold the value.
+
+        Args:
+            reg (int): register address
+            mask (int): bits to change
+            value (int): new value of those bits, already shifted into place
+
+        Returns:
+            int: new register value
+        """
+        with self.lock:
+            old = self.read(reg)
+            new = (old & ~mask) | (value & mask)
+            if new != old or reg not in self.shadowed:
+                self.write(reg, new)
+            return new
+
+    def set_bits(self, reg: int, mask: int) -> int:
+        """ Set the bits of a register selected by mask
+
+        Args:
+            reg (int): register address
+            mask (int): bits to set
+
+        Returns:
+            int: new register value
+        """
+        return self.update_bits(reg, mask, mask)
+
+    def clear_bits(self, reg: int, mask: int) -> int:
+        """ Clear the bits of a register selected by mask
+
+        Args:
+            reg (int): register address
+            mask (int): bits to clear
+
+        Returns:
+            int: new register value
+        """
+        return self.update_bits(reg, mask, 0)
+
+    def read_field(self, field: Field, cached: bool = True) -> int:
+        """ Read a bit field
+
+        Args:
+            field (Field): field
+            cached (bool, optional): False to bypass the shadow, default is True
+
+        Returns:
+            int: field value
+        """
+        return (self.read(field.register, cached) & field.mask) >> field.shift
+
+    def write_field(self, field: Field, value: int) -> int:
+        """ Write a bit field, keeping the other bits of the register
+
+        Args:
+            field (Field): field
+            value (int): field value
+
+        Returns:
+            int: new register value
+        """
+        return self.update_bits(field.register, field.mask, value << field.shift)
+
+    def write_many(self, values: dict) -> None:
+        """ Write several registers, adjacent ones in one burst
+
+        Args:
+            values (dict): register values keyed by register address
+        """
+        regs = sorted(values)
+        with self.lock:
+            start = 0
+            while start < len(regs):
+                end = start + 1
+                if self._write_block is not None:
+                    while (end < len(regs) and regs[end] == regs[end - 1] + 1
+                            and end - start < self.max_block):
+                        end += 1
+                if end - start == 1:
+                    self.write(regs[start], values[regs[start]])
+                else:
+                    block = [values[reg] & 0xFF for reg in regs[start:end]]
+                    self._write_block(regs[start], block)
+                    for reg, value in zip(regs[start:end], block):
+                        if reg in self.shadowed:
+                            self._shadow[reg] = value
+                start = end
+
+__all__ = [
+    'Field',
+    'RegisterMap',
+]
@@ -0,0 +1,168 @@
+""" Asyncio I2C device access
+
+Awaitable versions of the :class:`fusion_hat._i2c.I2C` transfers. The
+blocking calls run on the worker thread of the bus (see
+:func:`fusion_hat._i2c_bus.get_worker`), which serialises every
+transaction on that bus. Identical reads of the same device that are
+still waiting in the queue are coalesced into one bus transaction.
+Every call accepts a timeout, and cancelling a call withdraws it from the
+queue if it has not started yet.
+
+Example:
+
+    >>> import asyncio
+    >>> from fusion_hat.aio import AsyncI2C
+
+    >>> async def main():
+    ...     async with AsyncI2C(0x68) as mpu:
+    ...         await mpu.write_byte_data(0x6B, 0x00)
+    ...         data = await mpu.read_burst(0x3B, 14, timeout=0.1)
+    ...         print(list(data))
+    >>> asyncio.run(main())
+
+    Run any blocking driver call on the bus worker
+
+    >>> from fusion_hat.aio import run_on_bus
+    >>> from fusion_hat.modules import MPU6050
+
+    >>> async def main():
+    ...     mpu = MPU6050()
+    ...     accel = await run_on_bus(1, mpu.get_accel_data, timeout=0.1)
+    ...     print(accel)
+    >>> asyncio.run(main())
+"""
+import asyncio
+from typing import Callable, Any, Hashable
+
+from ._i2c import I2C
+from ._i2c_bus import get_worker, PRIORITY_NORMAL
+
+async def run_on_bus(bus: int, func: Callable[..., Any], *args, key: Hashable = None,
+                     priority: int = PRIORITY_NORMAL, deadline: float = None, timeout: float = None, **kwargs) -> Any:
+    """ Run a blocking call on the worker thread of an I2C bus
+
+    Args:
+        bus (int): I2C bus number
+        func (Callable): blocking call
+        *args: arguments of func
+        key (Hashable, optional): coalescing key, queued calls with the same key
+            share one run, leave it None to never coalesce
+        priority (int, optional): bus priority, lower runs first, default is PRIORITY_NORMAL
+        deadline (float, optional): seconds from now the call must start within, None for no deadline
+        timeout (float, optional): timeout in seconds, None to wait forever
+        **kwargs: keyword arguments of func
+
+    Returns:
+        Any: result of func
+
+    Raises:
+        asyncio.TimeoutError: if the call did not finish in time
+    """
+    worker = get_worker(bus)
+    future = worker.submit(func, *args, key=key, priority=priority, deadline=deadline, **kwargs)
+    try:
+        # Shield the shared future, other coalesced waiters may still need it
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        worker.cancel(future)
+        raise
+
+class AsyncI2C:
+    """ Asyncio I2C device
+
+    Args:
+        address (int): I2C device address
+        bus (int, optional): I2C bus number, default is 1
+        timeout (float, optional): default timeout of every call in seconds, default is None(no timeout)
+        priority (int, optional): bus priority of every call, default is PRIORITY_NORMAL
+        **kwargs: Keyword arguments to pass to :class:`fusion_hat._i2c.I2C`
+    """
+
+    def __init__(self, address: int, bus: int = I2C.DEFAULT_BUS, timeout: float = None,
+                 priority: int = PRIORITY_NORMAL, **kwargs) -> None:
+        self.i2c = I2C(address=address, bus=bus, **kwargs)
+        """Underlying blocking I2C device"""
+        self.bus = bus
+        self.timeout = timeout
+        self.priority = priority
+
+    @property
+    def address(self) -> int:
+        """ I2C device address """
+        return self.i2c.address
+
+    async def __aenter__(self) -> 'AsyncI2C':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """ Release the shared I2C bus handle """
+        self.i2c.close()
+
+    async def _read(self, func: Callable[..., Any], *args, timeout: float = None) -> Any:
+        key = (self.address, func.__name__, args)
+        return await run_on_bus(self.bus, func, *args, key=key, priority=self.priority,
+                                timeout=self.timeout if timeout is None else timeout)
+
+    async def _write(self, func: Callable[..., Any], *args, timeout: float = None) -> Any:
+        return await run_on_bus(self.bus, func, *args, priority=self.priority,
+                                timeout=self.timeout if timeout is None else timeout)
+
+    async def read_byte(self, timeout: float = None) -> int:
+        """ Read a byte, see :meth:`fusion_hat._i2c.I2C.read_byte` """
+        return await self._read(self.i2c.read_byte, timeout=timeout)
+
+    async def read_byte_data(self, reg: int, timeout: float = None) -> int:
+        """ Read a byte from a register, see :meth:`fusion_hat._i2c.I2C.read_byte_data` """
+        return await self._read(self.i2c.read_byte_data, reg, timeout=timeout)
+
+    async def read_word_data(self, reg: int, lsb: bool = False, timeout: float = None) -> int:
+        """ Read a word from a register, see :meth:`fusion_hat._i2c.I2C.read_word_data` """
+        return await self._read(self.i2c.read_word_data, reg, lsb, timeout=timeout)
+
+    async def read_i2c_block_data(self, reg: int, num: int, timeout: float = None) -> list:
+        """ Read a block of up to 32 bytes, see :meth:`fusion_hat._i2c.I2C.read_i2c_block_data` """
+        return await self._read(self.i2c.read_i2c_block_data, reg, num, timeout=timeout)
+
+    async def read_burst(self, reg: int, n: int, timeout: float = None) -> bytearray:
+        """ Read n bytes from a register in one transaction, see :meth:`fusion_hat._i2c.I2C.read_burst`
+
+        Coalesced reads share the returned bytearray, do not modify it in place.
+        """
+        return await self._read(self.i2c.read_burst, reg, n, timeout=timeout)
+
+    async def write_read(self, reg_bytes: int | bytes, n: int, timeout: float = None) -> bytearray:
+        """ Write then read in one transaction, see :meth:`fusion_hat._i2c.I2C.write_read`
+
+        Coalesced reads share the returned bytearray, do not modify it in place.
+        """
+        if isinstance(reg_bytes, (list, bytearray)):
+            reg_bytes = bytes(reg_bytes)
+        return await self._read(self.i2c.write_read, reg_bytes, n, timeout=timeout)
+
+    async def write_byte(self, data: int, timeout: float = None) -> bool:
+        """ Write a byte, see :meth:`fusion_hat._i2c.I2C.write_byte` """
+        return await self._write(self.i2c.write_byte, data, timeout=timeout)
+
+    async def write_byte_data(self, reg: int, data: int, timeout: float = None) -> bool:
+        """ Write a byte to a register, see :meth:`fusion_hat._i2c.I2C.write_byte_data` """
+        return await self._write(self.i2c.write_byte_data, reg, data, timeout=timeout)
+
+    async def write_word_data(self, reg: int, data: int, lsb: bool = False, timeout: float = None) -> bool:
+        """ Write a word to a register, see :meth:`fusion_hat._i2c.I2C.write_word_data` """
+        return await self._write(self.i2c.write_word_data, reg, data, lsb, timeout=timeout)
+
+    async def write_i2c_block_data(self, reg: int, data: list, timeout: float = None) -> bool:
+        """ Write a block of up to 32 bytes, see :meth:`fusion_hat._i2c.I2C.write_i2c_block_data` """
+        return await self._write(self.i2c.write_i2c_block_data, reg, data, timeout=timeout)
+
+    async def write_burst(self, reg: int, data: bytes | bytearray | list, timeout: float = None) -> bool:
+        """ Write data from a register in one transaction, see :meth:`fusion_hat._i2c.I2C.write_burst` """
+        return await self._write(self.i2c.write_burst, reg, bytes(data), timeout=timeout)
+
+__all__ = [
+    'AsyncI2C',
+    'run_on_bus',
+]
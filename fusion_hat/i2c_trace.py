@@ -0,0 +1,427 @@
+""" I2C transaction recorder and replay bus
+
+Record every transaction made through the shared I2C bus handles
+(:mod:`fusion_hat._i2c_bus`), which :class:`fusion_hat._i2c.I2C` and the
+drivers in :mod:`fusion_hat.modules` use, into a compact binary trace.
+Replay the trace later on a machine without I2C, at full speed or in
+real time, to test or benchmark sensor code deterministically.
+
+Example:
+
+    Record a session on the robot
+
+    >>> from fusion_hat.i2c_trace import I2CRecorder
+    >>> from fusion_hat.modules import MPU6050
+    >>> with I2CRecorder("mpu6050.trace"):
+    ...     mpu = MPU6050()
+    ...     for _ in range(100):
+    ...         mpu.get_all_data()
+
+    Replay it anywhere, the driver gets the recorded bytes back
+
+    >>> from fusion_hat.i2c_trace import I2CReplay
+    >>> with I2CReplay("mpu6050.trace", realtime=False):
+    ...     mpu = MPU6050()
+    ...     for _ in range(100):
+    ...         mpu.get_all_data()
+
+    Inspect a trace
+
+    >>> from fusion_hat.i2c_trace import read_trace
+    >>> for record in read_trace("mpu6050.trace")[:3]:
+    ...     print(record)
+"""
+import time
+import ctypes
+import struct
+import threading
+from collections import namedtuple
+
+from smbus2 import SMBus
+from smbus2.smbus2 import I2C_M_RD
+
+from ._i2c import I2C
+from ._i2c_bus import set_backend
+
+MAGIC = b"FHI2CTR1"
+"""File signature of a trace"""
+
+OP_WRITE_QUICK = 0
+OP_READ_BYTE = 1
+OP_WRITE_BYTE = 2
+OP_READ_BYTE_DATA = 3
+OP_WRITE_BYTE_DATA = 4
+OP_READ_WORD_DATA = 5
+OP_WRITE_WORD_DATA = 6
+OP_READ_I2C_BLOCK_DATA = 7
+OP_WRITE_I2C_BLOCK_DATA = 8
+OP_I2C_RDWR = 9
+
+OP_NAMES = {
+    OP_WRITE_QUICK: "write_quick",
+    OP_READ_BYTE: "read_byte",
+    OP_WRITE_BYTE: "write_byte",
+    OP_READ_BYTE_DATA: "read_byte_data",
+    OP_WRITE_BYTE_DATA: "write_byte_data",
+    OP_READ_WORD_DATA: "read_word_data",
+    OP_WRITE_WORD_DATA: "write_word_data",
+    OP_READ_I2C_BLOCK_DATA: "read_i2c_block_data",
+    OP_WRITE_I2C_BLOCK_DATA: "write_i2c_block_data",
+    OP_I2C_RDWR: "i2c_rdwr",
+}
+"""Operation names by code"""
+
+NO_REGISTER = 0xFFFF
+"""Register value of operations without a register"""
+
+# timestamp, latency, bus, address, op, register, errno, payload length
+_RECORD = struct.Struct("<dfBHBHHH")
+# flags, length of each i2c_rdwr message in the payload
+_MSG = struct.Struct("<HH")
+
+TraceRecord = namedtuple("TraceRecord", ["timestamp", "latency", "bus", "address", "op", "register", "errno", "data"])
+TraceRecord.__doc__ = """ One recorded transaction
+
+    timestamp (float): seconds since the recording started
+    latency (float): duration of the transaction in seconds
+    bus (int): I2C bus number
+    address (int): I2C device address
+    op (int): operation code, see OP_NAMES
+    register (int): register address, NO_REGISTER if none
+    errno (int): errno of a failed transaction, 0 if it succeeded
+    data (bytes): bytes written or read
+"""
+
+class TraceMismatchError(AssertionError):
+    """ Replayed code made a transaction different from the recorded one """
+
+def read_trace(path: str) -> list:
+    """ Read a trace file
+
+    Args:
+        path (str): trace file path
+
+    Returns:
+        list: list of :class:`TraceRecord`
+
+    Raises:
+        ValueError: if the file is not a trace
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content.startswith(MAGIC):
+        raise ValueError(f"{path} is not an I2C trace")
+    records = []
+    offset = len(MAGIC)
+    while offset < len(content):
+        fields = _RECORD.unpack_from(content, offset)
+        offset += _RECORD.size
+        length = fields[-1]
+        records.append(TraceRecord(*fields[:-1], content[offset:offset + length]))
+        offset += length
+    return records
+
+def _encode_msgs(msgs) -> bytes:
+    payload = bytearray()
+    for msg in msgs:
+        payload += _MSG.pack(msg.flags, msg.len)
+        payload += ctypes.string_at(msg.buf, msg.len)
+    return bytes(payload)
+
+def _decode_msgs(payload: bytes) -> list:
+    msgs = []
+    offset = 0
+    while offset < len(payload):
+        flags, length = _MSG.unpack_from(payload, offset)
+        offset += _MSG.size
+        msgs.append((flags, payload[offset:offset + length]))
+        offset += length
+    return msgs
+
+class _RecordingSMBus:
+    """ SMBus backend recording every transaction into an :class:`I2CRecorder` """
+
+    def __init__(self, bus: int, recorder: 'I2CRecorder') -> None:
+        self.bus = bus
+        self._smbus = SMBus(bus)
+        self._recorder = recorder
+
+    def close(self) -> None:
+        self._smbus.close()
+
+    def _run(self, op: int, address: int, register: int, func, *args, written: bytes = b"", encode=None):
+        timestamp = time.monotonic()
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except OSError as err:
+            self._recorder.add(timestamp, time.perf_counter() - start, self.bus, address, op, register, err.errno or 0, written)
+            raise
+        latency = time.perf_counter() - start
+        data = encode(result) if encode is not None else written
+        self._recorder.add(timestamp, latency, self.bus, address, op, register, 0, data)
+        return result
+
+    def write_quick(self, i2c_addr, force=None):
+        return self._run(OP_WRITE_QUICK, i2c_addr, NO_REGISTER, self._smbus.write_quick, i2c_addr, force)
+
+    def read_byte(self, i2c_addr, force=None):
+        return self._run(OP_READ_BYTE, i2c_addr, NO_REGISTER, self._smbus.read_byte, i2c_addr, force,
+                         encode=lambda value: bytes([value]))
+
+    def write_byte(self, i2c_addr, value, force=None):
+        return self._run(OP_WRITE_BYTE, i2c_addr, NO_REGISTER, self._smbus.write_byte, i2c_addr, value, force,
+                         written=bytes([value]))
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        return self._run(OP_READ_BYTE_DATA, i2c_addr, register, self._smbus.read_byte_data, i2c_addr, register, force,
+                         encode=lambda value: bytes([value]))
+
+    def write_byte_data(self, i2c_addr, register, value, force=None):
+        return self._run(OP_WRITE_BYTE_DATA, i2c_addr, register, self._smbus.write_byte_data, i2c_addr, register, value, force,
+                         written=bytes([value]))
+
+    def read_word_data(self, i2c_addr, register, force=None):
+        return self._run(OP_READ_WORD_DATA, i2c_addr, register, self._smbus.read_word_data, i2c_addr, register, force,
+                         encode=lambda value: value.to_bytes(2, "little"))
+
+    def write_word_data(self, i2c_addr, register, value, force=None):
+        return self._run(OP_WRITE_WORD_DATA, i2c_addr, register, self._smbus.write_word_data, i2c_addr, register, value, force,
+                         written=value.to_bytes(2, "little"))
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        return self._run(OP_READ_I2C_BLOCK_DATA, i2c_addr, register, self._smbus.read_i2c_block_data, i2c_addr, register, length, force,
+                         encode=bytes)
+
+    def write_i2c_block_data(self, i2c_addr, register, data, force=None):
+        return self._run(OP_WRITE_I2C_BLOCK_DATA, i2c_addr, register, self._smbus.write_i2c_block_data, i2c_addr, register, data, force,
+                         written=bytes(data))
+
+    def i2c_rdwr(self, *i2c_msgs):
+        address = i2c_msgs[0].addr if i2c_msgs else 0
+        return self._run(OP_I2C_RDWR, address, NO_REGISTER, self._smbus.i2c_rdwr, *i2c_msgs,
+                         written=_encode_msgs(i2c_msgs), encode=lambda _: _encode_msgs(i2c_msgs))
+
+class I2CRecorder:
+    """ Record the transactions of I2C buses into a trace file
+
+    Args:
+        path (str): trace file path, overwritten if it exists
+        buses (list, optional): I2C bus numbers to record, default is [1]
+    """
+
+    def __init__(self, path: str, buses: list = [1]) -> None:
+        self.path = path
+        self.buses = list(buses)
+        self.count = 0
+        """Number of recorded transactions"""
+        self._file = None
+        self._start = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'I2CRecorder':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """ Start recording """
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC)
+        self._start = time.monotonic()
+        self.count = 0
+        for bus in self.buses:
+            set_backend(bus, lambda bus: _RecordingSMBus(bus, self))
+            # Scans must reach the recorder, not a result of the real bus
+            I2C.clear_scan_cache(bus)
+
+    def stop(self) -> None:
+        """ Stop recording and close the trace file """
+        for bus in self.buses:
+            set_backend(bus, None)
+            I2C.clear_scan_cache(bus)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def add(self, timestamp: float, latency: float, bus: int, address: int, op: int, register: int, err: int, data: bytes) -> None:
+        """ Append one transaction to the trace
+
+        Args:
+            timestamp (float): time.monotonic() when the transaction started
+            latency (float): duration in seconds
+            bus (int): I2C bus number
+            address (int): I2C device address
+            op (int): operation code
+            register (int): register address, NO_REGISTER if none
+            err (int): errno, 0 if succeeded
+            data (bytes): bytes written or read
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(_RECORD.pack(timestamp - self._start, latency, bus, address, op, register, err, len(data)))
+            self._file.write(data)
+            self.count += 1
+
+class _ReplaySMBus:
+    """ SMBus backend serving transactions from an :class:`I2CReplay` """
+
+    def __init__(self, bus: int, replay: 'I2CReplay') -> None:
+        self.bus = bus
+        self._replay = replay
+
+    def close(self) -> None:
+        pass
+
+    def write_quick(self, i2c_addr, force=None):
+        self._replay.next(self.bus, OP_WRITE_QUICK, i2c_addr)
+
+    def read_byte(self, i2c_addr, force=None):
+        return self._replay.next(self.bus, OP_READ_BYTE, i2c_addr).data[0]
+
+    def write_byte(self, i2c_addr, value, force=None):
+        self._replay.next(self.bus, OP_WRITE_BYTE, i2c_addr, written=bytes([value]))
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        return self._replay.next(self.bus, OP_READ_BYTE_DATA, i2c_addr, register).data[0]
+
+    def write_byte_data(self, i2c_addr, register, value, force=None):
+        self._replay.next(self.bus, OP_WRITE_BYTE_DATA, i2c_addr, register, bytes([value]))
+
+    def read_word_data(self, i2c_addr, register, force=None):
+        return int.from_bytes(self._replay.next(self.bus, OP_READ_WORD_DATA, i2c_addr, register).data, "little")
+
+    def write_word_data(self, i2c_addr, register, value, force=None):
+        self._replay.next(self.bus, OP_WRITE_WORD_DATA, i2c_addr, register, value.to_bytes(2, "little"))
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        return list(self._replay.next(self.bus, OP_READ_I2C_BLOCK_DATA, i2c_addr, register).data)
+
+    def write_i2c_block_data(self, i2c_addr, register, data, force=None):
+        self._replay.next(self.bus, OP_WRITE_I2C_BLOCK_DATA, i2c_addr, register, bytes(data))
+
+    def i2c_rdwr(self, *i2c_msgs):
+        address = i2c_msgs[0].addr if i2c_msgs else 0
+        written = _encode_msgs(msg for msg in i2c_msgs if not msg.flags & I2C_M_RD)
+        record = self._replay.next(self.bus, OP_I2C_RDWR, address)
+        recorded = _decode_msgs(record.data)
+        if self._replay.strict:
+            expected = _encode_msgs_from(recorded, lambda flags: not flags & I2C_M_RD)
+            if expected != written:
+                raise TraceMismatchError(f"i2c_rdwr on 0x{address:02X} wrote {written!r}, recorded {expected!r}")
+        for msg, (flags, data) in zip(i2c_msgs, recorded):
+            if msg.flags & I2C_M_RD:
+                ctypes.memmove(msg.buf, data, min(msg.len, len(data)))
+
+def _encode_msgs_from(decoded: list, select) -> bytes:
+    payload = bytearray()
+    for flags, data in decoded:
+        if select(flags):
+            payload += _MSG.pack(flags, len(data))
+            payload += data
+    return bytes(payload)
+
+class I2CReplay:
+    """ Serve recorded transactions back to the code, without any I2C hardware
+
+    Transactions are served in recorded order per bus. Failed transactions
+    raise the recorded OSError again.
+
+    Args:
+        path (str): trace file path
+        buses (list, optional): I2C bus numbers to replay, default is every bus in the trace
+        realtime (bool, optional): True to reproduce the recorded timing, False to run at full speed, default is False
+        strict (bool, optional): True to raise :class:`TraceMismatchError` when the code does not
+            repeat the recorded transaction, default is True
+    """
+
+    def __init__(self, path: str, buses: list = None, realtime: bool = False, strict: bool = True) -> None:
+        records = read_trace(path)
+        if buses is None:
+            buses = sorted({record.bus for record in records})
+        self.buses = list(buses)
+        self.realtime = realtime
+        self.strict = strict
+        self._records = {bus: [record for record in records if record.bus == bus] for bus in self.buses}
+        self._cursor = {bus: 0 for bus in self.buses}
+        self._start = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'I2CReplay':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def remaining(self) -> int:
+        """ Number of recorded transactions not served yet """
+        return sum(len(self._records[bus]) - self._cursor[bus] for bus in self.buses)
+
+    def start(self) -> None:
+        """ Start replaying, from the beginning of the trace """
+        self._cursor = {bus: 0 for bus in self.buses}
+        self._start = time.monotonic()
+        for bus in self.buses:
+            set_backend(bus, lambda bus: _ReplaySMBus(bus, self))
+            I2C.clear_scan_cache(bus)
+
+    def stop(self) -> None:
+        """ Stop replaying and restore the real buses """
+        for bus in self.buses:
+            set_backend(bus, None)
+            I2C.clear_scan_cache(bus)
+
+    def next(self, bus: int, op: int, address: int, register: int = NO_REGISTER, written: bytes = None) -> TraceRecord:
+        """ Serve the next recorded transaction of a bus
+
+        Args:
+            bus (int): I2C bus number
+            op (int): operation code of the transaction made by the code
+            address (int): I2C device address
+            register (int, optional): register address, NO_REGISTER if none
+            written (bytes, optional): bytes written by the code
+
+        Returns:
+            TraceRecord: recorded transaction
+
+        Raises:
+            TraceMismatchError: if the trace is exhausted, or in strict mode the transaction differs
+            OSError: if the recorded transaction failed
+        """
+        with self._lock:
+            records = self._records[bus]
+            index = self._cursor[bus]
+            if index >= len(records):
+                raise TraceMismatchError(f"trace of bus {bus} exhausted at {OP_NAMES[op]} on 0x{address:02X}")
+            record = records[index]
+            self._cursor[bus] = index + 1
+        if self.strict:
+            register = NO_REGISTER if register is None else register
+            if (record.op, record.address, record.register) != (op, address, register):
+                raise TraceMismatchError(
+                    f"transaction {index} of bus {bus}: got {OP_NAMES[op]} 0x{address:02X}/0x{register:02X}, "
+                    f"recorded {OP_NAMES[record.op]} 0x{record.address:02X}/0x{record.register:02X}")
+            if written is not None and record.errno == 0 and written != record.data:
+                raise TraceMismatchError(
+                    f"transaction {index} of bus {bus}: {OP_NAMES[op]} on 0x{address:02X} wrote {written!r}, recorded {record.data!r}")
+        if self.realtime:
+            delay = self._start + record.timestamp + record.latency - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if record.errno:
+            raise OSError(record.errno, f"replayed error on 0x{address:02X}")
+        return record
+
+__all__ = [
+    'I2CRecorder',
+    'I2CReplay',
+    'TraceRecord',
+    'TraceMismatchError',
+    'read_trace',
+]
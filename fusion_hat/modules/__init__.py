@@ -1,10 +1,11 @@
-from .ultrasonic import Ultrasonic
+from .ultrasonic import Ultrasonic, UltrasonicArray, DistanceFilter
 from .adxl345 import ADXL345
 from .rgb_led import RGB_LED
 from .buzzer import Buzzer
 from .grayscale_module import Grayscale_Module, LineTracker
 from .keypad import Keypad
 from .mpu6050 import MPU6050
+from .ahrs import AHRS, Madgwick, Mahony
 from .lcd1602 import LCD1602
 from .dht11 import DHT11
 from .rotary_encoder import Rotary_Encoder
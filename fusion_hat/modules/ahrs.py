@@ -0,0 +1,574 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orientation estimation (AHRS) from MPU6050 accel/gyro and a magnetometer
+
+The Madgwick and Mahony filters fuse the gyro, which is smooth but
+drifts, with the accelerometer (gravity) and the magnetometer (north),
+which don't drift but are noisy. Both are written as unrolled scalar
+math on local floats: for a 4 element quaternion that is faster in
+Python than NumPy, whose call overhead alone is larger than the update,
+and it creates no lists or arrays per sample.
+
+Example:
+
+    >>> from fusion_hat.modules import Magnetometer
+    >>> from fusion_hat.modules.ahrs import AHRS
+    >>> mag = Magnetometer()
+    >>> ahrs = AHRS(mag.mpu, mag, rate=200)
+    >>> ahrs.calibrate_gyro()
+    >>> ahrs.start_thread()
+    >>> ahrs.euler()
+    (1.52, -0.37, 87.9)
+    >>> ahrs.heading()
+    272.1
+"""
+import math
+import time
+import threading
+
+from .mpu6050 import MPU6050
+
+DEG_TO_RAD = math.pi / 180.0
+
+class OrientationFilter():
+    """
+    Base class of the orientation filters, holds the quaternion.
+
+    The quaternion rotates the sensor frame into the earth frame, z up and
+    x towards magnetic north. Filters are not thread safe, update them from
+    one thread.
+    """
+    def __init__(self):
+        self.gain_scale = 1.0
+        """Multiplies the filter gain, raised while converging from a bad start"""
+        self.reset()
+
+    def reset(self):
+        """
+        Restart from the identity orientation.
+        """
+        self.q0 = 1.0
+        self.q1 = 0.0
+        self.q2 = 0.0
+        self.q3 = 0.0
+
+    def update(self, gx, gy, gz, ax, ay, az, mx=0.0, my=0.0, mz=0.0, dt=0.005):
+        """
+        Fuse one sample.
+
+        Args:
+            gx, gy, gz (float): Angular rate in rad/s
+            ax, ay, az (float): Acceleration, any unit
+            mx, my, mz (float, optional): Magnetic field, any unit, all 0 to fuse accel and gyro only
+            dt (float, optional): Seconds since the last sample
+        """
+        raise NotImplementedError
+
+    def quaternion(self):
+        """
+        Returns:
+            tuple: (w, x, y, z)
+        """
+        return (self.q0, self.q1, self.q2, self.q3)
+
+def quaternion_to_euler(q0, q1, q2, q3):
+    """
+    Convert a quaternion to roll, pitch and yaw (Z-Y-X order).
+
+    Returns:
+        tuple: (roll, pitch, yaw) in degrees, yaw counterclockwise from magnetic north
+    """
+    roll = math.atan2(2.0 * (q0 * q1 + q2 * q3), 1.0 - 2.0 * (q1 * q1 + q2 * q2))
+    sin_pitch = 2.0 * (q0 * q2 - q3 * q1)
+    pitch = math.asin(1.0 if sin_pitch > 1.0 else -1.0 if sin_pitch < -1.0 else sin_pitch)
+    yaw = math.atan2(2.0 * (q0 * q3 + q1 * q2), 1.0 - 2.0 * (q2 * q2 + q3 * q3))
+    return (math.degrees(roll), math.degrees(pitch), math.degrees(yaw))
+
+class Madgwick(OrientationFilter):
+    """
+    Madgwick gradient descent orientation filter.
+
+    Args:
+        beta (float, optional): Gain of the accel/mag correction, higher converges faster but lets
+            more accel noise through. Default is 0.1.
+    """
+    def __init__(self, beta=0.1):
+        self.beta = beta
+        super().__init__()
+
+    def update(self, gx, gy, gz, ax, ay, az, mx=0.0, my=0.0, mz=0.0, dt=0.005):
+        if mx == 0.0 and my == 0.0 and mz == 0.0:
+            self.update_imu(gx, gy, gz, ax, ay, az, dt)
+            return
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+
+        # Rate of change of the quaternion from the gyro
+        qdot0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+        qdot1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+        qdot2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+        qdot3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+        norm = ax * ax + ay * ay + az * az
+        if norm > 0.0:
+            norm = 1.0 / math.sqrt(norm)
+            ax *= norm
+            ay *= norm
+            az *= norm
+            norm = 1.0 / math.sqrt(mx * mx + my * my + mz * mz)
+            mx *= norm
+            my *= norm
+            mz *= norm
+
+            _2q0mx = 2.0 * q0 * mx
+            _2q0my = 2.0 * q0 * my
+            _2q0mz = 2.0 * q0 * mz
+            _2q1mx = 2.0 * q1 * mx
+            _2q0 = 2.0 * q0
+            _2q1 = 2.0 * q1
+            _2q2 = 2.0 * q2
+            _2q3 = 2.0 * q3
+            _2q0q2 = 2.0 * q0 * q2
+            _2q2q3 = 2.0 * q2 * q3
+            q0q0 = q0 * q0
+            q0q1 = q0 * q1
+            q0q2 = q0 * q2
+            q0q3 = q0 * q3
+            q1q1 = q1 * q1
+            q1q2 = q1 * q2
+            q1q3 = q1 * q3
+            q2q2 = q2 * q2
+            q2q3 = q2 * q3
+            q3q3 = q3 * q3
+
+            # Earth frame field direction, only north and up components
+            hx = mx * q0q0 - _2q0my * q3 + _2q0mz * q2 + mx * q1q1 + _2q1 * my * q2 + _2q1 * mz * q3 - mx * q2q2 - mx * q3q3
+            hy = _2q0mx * q3 + my * q0q0 - _2q0mz * q1 + _2q1mx * q2 - my * q1q1 + my * q2q2 + _2q2 * mz * q3 - my * q3q3
+            _2bx = math.sqrt(hx * hx + hy * hy)
+            _2bz = -_2q0mx * q2 + _2q0my * q1 + mz * q0q0 + _2q1mx * q3 - mz * q1q1 + _2q2 * my * q3 - mz * q2q2 + mz * q3q3
+            _4bx = 2.0 * _2bx
+            _4bz = 2.0 * _2bz
+
+            # Objective function, predicted minus measured gravity and field
+            f1 = 2.0 * q1q3 - _2q0q2 - ax
+            f2 = 2.0 * q0q1 + _2q2q3 - ay
+            f3 = 1.0 - 2.0 * q1q1 - 2.0 * q2q2 - az
+            f4 = _2bx * (0.5 - q2q2 - q3q3) + _2bz * (q1q3 - q0q2) - mx
+            f5 = _2bx * (q1q2 - q0q3) + _2bz * (q0q1 + q2q3) - my
+            f6 = _2bx * (q0q2 + q1q3) + _2bz * (0.5 - q1q1 - q2q2) - mz
+
+            # Gradient, Jacobian transposed times objective
+            s0 = -_2q2 * f1 + _2q1 * f2 - _2bz * q2 * f4 + (-_2bx * q3 + _2bz * q1) * f5 + _2bx * q2 * f6
+            s1 = _2q3 * f1 + _2q0 * f2 - 4.0 * q1 * f3 + _2bz * q3 * f4 + (_2bx * q2 + _2bz * q0) * f5 + (_2bx * q3 - _4bz * q1) * f6
+            s2 = -_2q0 * f1 + _2q3 * f2 - 4.0 * q2 * f3 + (-_4bx * q2 - _2bz * q0) * f4 + (_2bx * q1 + _2bz * q3) * f5 + (_2bx * q0 - _4bz * q2) * f6
+            s3 = _2q1 * f1 + _2q2 * f2 + (-_4bx * q3 + _2bz * q1) * f4 + (-_2bx * q0 + _2bz * q2) * f5 + _2bx * q1 * f6
+
+            norm = s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3
+            if norm > 0.0:
+                norm = self.beta * self.gain_scale / math.sqrt(norm)
+                qdot0 -= norm * s0
+                qdot1 -= norm * s1
+                qdot2 -= norm * s2
+                qdot3 -= norm * s3
+
+        self._integrate(q0, q1, q2, q3, qdot0, qdot1, qdot2, qdot3, dt)
+
+    def update_imu(self, gx, gy, gz, ax, ay, az, dt=0.005):
+        """
+        Fuse one sample without magnetometer, yaw drifts with the gyro.
+        """
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+
+        qdot0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+        qdot1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+        qdot2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+        qdot3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+        norm = ax * ax + ay * ay + az * az
+        if norm > 0.0:
+            norm = 1.0 / math.sqrt(norm)
+            ax *= norm
+            ay *= norm
+            az *= norm
+
+            _2q0 = 2.0 * q0
+            _2q1 = 2.0 * q1
+            _2q2 = 2.0 * q2
+            _2q3 = 2.0 * q3
+            _4q0 = 4.0 * q0
+            _4q1 = 4.0 * q1
+            _4q2 = 4.0 * q2
+            _8q1 = 8.0 * q1
+            _8q2 = 8.0 * q2
+            q0q0 = q0 * q0
+            q1q1 = q1 * q1
+            q2q2 = q2 * q2
+            q3q3 = q3 * q3
+
+            s0 = _4q0 * q2q2 + _2q2 * ax + _4q0 * q1q1 - _2q1 * ay
+            s1 = _4q1 * q3q3 - _2q3 * ax + 4.0 * q0q0 * q1 - _2q0 * ay - _4q1 + _8q1 * q1q1 + _8q1 * q2q2 + _4q1 * az
+            s2 = 4.0 * q0q0 * q2 + _2q0 * ax + _4q2 * q3q3 - _2q3 * ay - _4q2 + _8q2 * q1q1 + _8q2 * q2q2 + _4q2 * az
+            s3 = 4.0 * q1q1 * q3 - _2q1 * ax + 4.0 * q2q2 * q3 - _2q2 * ay
+
+            norm = s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3
+            if norm > 0.0:
+                norm = self.beta * self.gain_scale / math.sqrt(norm)
+                qdot0 -= norm * s0
+                qdot1 -= norm * s1
+                qdot2 -= norm * s2
+                qdot3 -= norm * s3
+
+        self._integrate(q0, q1, q2, q3, qdot0, qdot1, qdot2, qdot3, dt)
+
+    def _integrate(self, q0, q1, q2, q3, qdot0, qdot1, qdot2, qdot3, dt):
+        q0 += qdot0 * dt
+        q1 += qdot1 * dt
+        q2 += qdot2 * dt
+        q3 += qdot3 * dt
+        norm = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        self.q0 = q0 * norm
+        self.q1 = q1 * norm
+        self.q2 = q2 * norm
+        self.q3 = q3 * norm
+
+class Mahony(OrientationFilter):
+    """
+    Mahony complementary orientation filter with PI feedback.
+
+    Args:
+        kp (float, optional): Proportional gain of the accel/mag correction. Default is 1.0.
+        ki (float, optional): Integral gain, estimates the gyro bias, 0 to disable. Default is 0.0.
+    """
+    def __init__(self, kp=1.0, ki=0.0):
+        self.kp = kp
+        self.ki = ki
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.bias_x = 0.0
+        self.bias_y = 0.0
+        self.bias_z = 0.0
+
+    def update(self, gx, gy, gz, ax, ay, az, mx=0.0, my=0.0, mz=0.0, dt=0.005):
+        if mx == 0.0 and my == 0.0 and mz == 0.0:
+            self.update_imu(gx, gy, gz, ax, ay, az, dt)
+            return
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+
+        norm = ax * ax + ay * ay + az * az
+        if norm > 0.0:
+            norm = 1.0 / math.sqrt(norm)
+            ax *= norm
+            ay *= norm
+            az *= norm
+            norm = 1.0 / math.sqrt(mx * mx + my * my + mz * mz)
+            mx *= norm
+            my *= norm
+            mz *= norm
+
+            q0q0 = q0 * q0
+            q0q1 = q0 * q1
+            q0q2 = q0 * q2
+            q0q3 = q0 * q3
+            q1q1 = q1 * q1
+            q1q2 = q1 * q2
+            q1q3 = q1 * q3
+            q2q2 = q2 * q2
+            q2q3 = q2 * q3
+            q3q3 = q3 * q3
+
+            # Earth frame field direction, only north and up components
+            hx = 2.0 * (mx * (0.5 - q2q2 - q3q3) + my * (q1q2 - q0q3) + mz * (q1q3 + q0q2))
+            hy = 2.0 * (mx * (q1q2 + q0q3) + my * (0.5 - q1q1 - q3q3) + mz * (q2q3 - q0q1))
+            bx = math.sqrt(hx * hx + hy * hy)
+            bz = 2.0 * (mx * (q1q3 - q0q2) + my * (q2q3 + q0q1) + mz * (0.5 - q1q1 - q2q2))
+
+            # Estimated gravity and field directions, half length
+            halfvx = q1q3 - q0q2
+            halfvy = q0q1 + q2q3
+            halfvz = q0q0 - 0.5 + q3q3
+            halfwx = bx * (0.5 - q2q2 - q3q3) + bz * (q1q3 - q0q2)
+            halfwy = bx * (q1q2 - q0q3) + bz * (q0q1 + q2q3)
+            halfwz = bx * (q0q2 + q1q3) + bz * (0.5 - q1q1 - q2q2)
+
+            # Error, cross product of estimated and measured directions
+            halfex = (ay * halfvz - az * halfvy) + (my * halfwz - mz * halfwy)
+            halfey = (az * halfvx - ax * halfvz) + (mz * halfwx - mx * halfwz)
+            halfez = (ax * halfvy - ay * halfvx) + (mx * halfwy - my * halfwx)
+            gx, gy, gz = self._feedback(gx, gy, gz, halfex, halfey, halfez, dt)
+
+        self._integrate(q0, q1, q2, q3, gx, gy, gz, dt)
+
+    def update_imu(self, gx, gy, gz, ax, ay, az, dt=0.005):
+        """
+        Fuse one sample without magnetometer, yaw drifts with the gyro.
+        """
+        q0, q1, q2, q3 = self.q0, self.q1, self.q2, self.q3
+
+        norm = ax * ax + ay * ay + az * az
+        if norm > 0.0:
+            norm = 1.0 / math.sqrt(norm)
+            ax *= norm
+            ay *= norm
+            az *= norm
+
+            halfvx = q1 * q3 - q0 * q2
+            halfvy = q0 * q1 + q2 * q3
+            halfvz = q0 * q0 - 0.5 + q3 * q3
+
+            halfex = ay * halfvz - az * halfvy
+            halfey = az * halfvx - ax * halfvz
+            halfez = ax * halfvy - ay * halfvx
+            gx, gy, gz = self._feedback(gx, gy, gz, halfex, halfey, halfez, dt)
+
+        self._integrate(q0, q1, q2, q3, gx, gy, gz, dt)
+
+    def _feedback(self, gx, gy, gz, halfex, halfey, halfez, dt):
+        if self.ki > 0.0:
+            ki = 2.0 * self.ki * dt
+            self.bias_x += ki * halfex
+            self.bias_y += ki * halfey
+            self.bias_z += ki * halfez
+            gx += self.bias_x
+            gy += self.bias_y
+            gz += self.bias_z
+        kp = 2.0 * self.kp * self.gain_scale
+        return gx + kp * halfex, gy + kp * halfey, gz + kp * halfez
+
+    def _integrate(self, q0, q1, q2, q3, gx, gy, gz, dt):
+        gx *= 0.5 * dt
+        gy *= 0.5 * dt
+        gz *= 0.5 * dt
+        r0 = q0 + (-q1 * gx - q2 * gy - q3 * gz)
+        r1 = q1 + (q0 * gx + q2 * gz - q3 * gy)
+        r2 = q2 + (q0 * gy - q1 * gz + q3 * gx)
+        r3 = q3 + (q0 * gz + q1 * gy - q2 * gx)
+        norm = 1.0 / math.sqrt(r0 * r0 + r1 * r1 + r2 * r2 + r3 * r3)
+        self.q0 = r0 * norm
+        self.q1 = r1 * norm
+        self.q2 = r2 * norm
+        self.q3 = r3 * norm
+
+class AHRS():
+    """
+    Orientation of an MPU6050 and magnetometer, updated at a fixed rate in a sampler thread.
+
+    Without int_pin, the thread wakes up every 1/rate seconds and reads one
+    burst. With int_pin wired to the MPU6050 INT pin, it runs on the data
+    ready interrupt instead (see :meth:`MPU6050.start_sampling`) and
+    integrates with the interrupt timestamps. The magnetometer is read at
+    mag_rate, between reads its last value is reused. The latest orientation
+    is published as one tuple, reading it needs no lock.
+
+    Args:
+        mpu (MPU6050, optional): IMU, default is a new MPU6050 on bus 1.
+        magnetometer (Magnetometer, optional): Magnetometer, or one of its drivers, e.g. QMC6310.
+            Default is None, fuse accel and gyro only, heading then drifts.
+        algorithm (str, optional): AHRS.MADGWICK or AHRS.MAHONY. Default is AHRS.MADGWICK.
+        rate (float, optional): Updates per second. Default is 200.
+        decl_deg (float, optional): Magnetic declination in degrees, added to the heading. Default is 0.
+        int_pin (int, optional): GPIO wired to the MPU6050 INT pin. Default is None, timer driven.
+        mag_rate (float, optional): Magnetometer reads per second. Default is 50.
+        mag_align (callable, optional): Maps a magnetometer reading (x, y, z) onto the MPU6050 axes.
+            Default is None, the axes are the same.
+        settle_time (float, optional): Seconds the filter gain is raised after start to
+            converge from the identity orientation. Default is 1.0.
+        **gains: Filter gains, beta for Madgwick, kp and ki for Mahony.
+    """
+    MADGWICK = "madgwick"
+    """Madgwick gradient descent filter"""
+    MAHONY = "mahony"
+    """Mahony complementary filter"""
+
+    SETTLE_GAIN = 10.0
+    """Gain multiplier while settling"""
+
+    def __init__(self, mpu=None, magnetometer=None, algorithm=MADGWICK, rate=200, decl_deg=0.0,
+                 int_pin=None, mag_rate=50, mag_align=None, settle_time=1.0, **gains):
+        if algorithm == self.MADGWICK:
+            self.filter = Madgwick(**gains)
+        elif algorithm == self.MAHONY:
+            self.filter = Mahony(**gains)
+        else:
+            raise ValueError(f"algorithm must be AHRS.MADGWICK or AHRS.MAHONY, not {algorithm!r}")
+        self.mpu = mpu if mpu is not None else MPU6050()
+        # Magnetometer wraps the detected driver, all drivers have read_magnet
+        self.mag = getattr(magnetometer, "active_magnetometer", magnetometer)
+        self.rate = rate
+        self.decl_deg = float(decl_deg)
+        self.int_pin = int_pin
+        self.mag_interval = 1.0 / mag_rate
+        self.mag_align = mag_align
+        self.settle_time = settle_time
+
+        self.gyro_bias = (0.0, 0.0, 0.0)
+        """Gyro offset in deg/s, subtracted from every sample, see calibrate_gyro"""
+        self.callback = None
+        """Called from the thread with (timestamp_ns, quaternion) after each update"""
+        self.updates = 0
+        """Filter updates done"""
+        self.overruns = 0
+        """Timer periods an update took longer than"""
+        self.mag_errors = 0
+        """Failed magnetometer reads"""
+
+        self._state = (None, 1.0, 0.0, 0.0, 0.0)
+        self._last_ns = None
+        self._mag = (0.0, 0.0, 0.0)
+        self._next_mag_ns = 0
+        self._settle_until_ns = 0
+        self.thread = None
+        self.thread_started = False
+
+    def calibrate_gyro(self, seconds=1.0):
+        """
+        Measure the gyro offset, keep the sensor still meanwhile.
+
+        Args:
+            seconds (float, optional): Averaging time. Default is 1.0.
+
+        Returns:
+            tuple: Gyro offset in deg/s
+        """
+        sums = [0.0, 0.0, 0.0]
+        count = 0
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            gx, gy, gz = self.mpu.get_gyro_data()
+            sums[0] += gx
+            sums[1] += gy
+            sums[2] += gz
+            count += 1
+            time.sleep(0.005)
+        self.gyro_bias = tuple(s / max(1, count) for s in sums)
+        return self.gyro_bias
+
+    def _read_mag(self, timestamp_ns):
+        if self.mag is None or timestamp_ns < self._next_mag_ns:
+            return
+        self._next_mag_ns = timestamp_ns + int(self.mag_interval * 1e9)
+        try:
+            mag = self.mag.read_magnet()
+        except OSError:
+            self.mag_errors += 1
+            return
+        if self.mag_align is not None:
+            mag = self.mag_align(*mag)
+        self._mag = tuple(mag)
+
+    def _update(self, timestamp_ns, accel, gyro):
+        """
+        Fuse one sample, accel in g and gyro in deg/s.
+        """
+        last_ns, self._last_ns = self._last_ns, timestamp_ns
+        if last_ns is None or timestamp_ns <= last_ns:
+            return
+        self._read_mag(timestamp_ns)
+        filt = self.filter
+        filt.gain_scale = self.SETTLE_GAIN if timestamp_ns < self._settle_until_ns else 1.0
+        bx, by, bz = self.gyro_bias
+        mx, my, mz = self._mag
+        filt.update((gyro[0] - bx) * DEG_TO_RAD, (gyro[1] - by) * DEG_TO_RAD, (gyro[2] - bz) * DEG_TO_RAD,
+                    accel[0], accel[1], accel[2], mx, my, mz, (timestamp_ns - last_ns) / 1e9)
+        self._state = (timestamp_ns, filt.q0, filt.q1, filt.q2, filt.q3)
+        self.updates += 1
+        if self.callback is not None:
+            self.callback(timestamp_ns, self._state[1:])
+
+    def _on_sample(self, timestamp_ns, accel, gyro, temp):
+        self._update(timestamp_ns, accel, gyro)
+
+    def thread_loop(self):
+        """
+        Timer driven sampler loop, one update every 1/rate seconds.
+        """
+        period = 1.0 / self.rate
+        next_time = time.monotonic()
+        while self.thread_started:
+            accel, gyro, _ = self.mpu.get_all_data(g=True)
+            self._update(time.monotonic_ns(), accel, gyro)
+            next_time += period
+            rest = next_time - time.monotonic()
+            if rest > 0:
+                time.sleep(rest)
+            else:
+                self.overruns += 1
+                next_time = time.monotonic()
+
+    def start_thread(self):
+        """
+        Start updating the orientation in the background.
+        """
+        if self.thread_started:
+            return
+        self.filter.reset()
+        self._last_ns = None
+        self._next_mag_ns = 0
+        self._settle_until_ns = time.monotonic_ns() + int(self.settle_time * 1e9)
+        self.thread_started = True
+        if self.int_pin is not None:
+            self.mpu.start_sampling(self.int_pin, callback=self._on_sample, sample_rate=self.rate,
+                                    filter_range=MPU6050.FILTER_BW_98, g=True)
+        else:
+            # Fresh data every period, with little filter delay
+            self.mpu.set_sample_rate(min(1000, self.rate * 2), MPU6050.FILTER_BW_98)
+            self.thread = threading.Thread(target=self.thread_loop, name="ahrs", daemon=True)
+            self.thread.start()
+
+    def stop_thread(self):
+        """
+        Stop updating the orientation.
+        """
+        self.thread_started = False
+        if self.int_pin is not None:
+            self.mpu.stop_sampling()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def quaternion(self):
+        """
+        Returns:
+            tuple: Latest orientation (w, x, y, z)
+        """
+        return self._state[1:]
+
+    def euler(self):
+        """
+        Returns:
+            tuple: Latest (roll, pitch, yaw) in degrees
+        """
+        _, q0, q1, q2, q3 = self._state
+        return quaternion_to_euler(q0, q1, q2, q3)
+
+    def heading(self):
+        """
+        Tilt compensated heading, clockwise from north like a compass.
+
+        Returns:
+            float: Heading in degrees, 0-360, declination applied
+        """
+        _, q0, q1, q2, q3 = self._state
+        yaw = quaternion_to_euler(q0, q1, q2, q3)[2]
+        return (self.decl_deg - yaw) % 360.0
+
+    def read(self):
+        """
+        Returns:
+            dict: Latest {timestamp_ns, quaternion, euler, heading}
+        """
+        state = self._state
+        euler = quaternion_to_euler(*state[1:])
+        return {
+            "timestamp_ns": state[0],
+            "quaternion": state[1:],
+            "euler": euler,
+            "heading": (self.decl_deg - euler[2]) % 360.0,
+        }
+
+    def close(self):
+        """
+        Stop the thread.
+        """
+        self.stop_thread()
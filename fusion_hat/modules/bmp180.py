@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from smbus2 import SMBus
+from .._i2c_bus import SharedBus
 import time
 
 
@@ -17,12 +17,12 @@ class BMP180:
     CMD_TEMP = 0x2E
     CMD_PRES_BASE = 0x34
 
-    def __init__(self, bus: SMBus, oversampling=3):
+    def __init__(self, bus: SharedBus, oversampling=3):
         """
         Initialize BMP180 sensor
         
         Parameters:
-            bus: SMBus instance for I2C communication
+            bus: SharedBus instance for I2C communication
             oversampling: Oversampling rate (0-3), higher value means higher accuracy but longer measurement time
                           0: Standard mode, fastest
                           3: Ultra-high precision mode, slowest
@@ -41,8 +41,9 @@ class BMP180:
         Returns:
             int: converted signed 16-bit integer value
         """
-        high = self.bus.read_byte_data(self.ADDR, reg)
-        low = self.bus.read_byte_data(self.ADDR, reg + 1)
+        with self.bus.lock:
+            high = self.bus.read_byte_data(self.ADDR, reg)
+            low = self.bus.read_byte_data(self.ADDR, reg + 1)
 
         val = (high << 8) | low
         if val & 0x8000:
@@ -59,8 +60,9 @@ class BMP180:
         Returns:
             int: converted unsigned 16-bit integer value
         """
-        high = self.bus.read_byte_data(self.ADDR, reg)
-        low = self.bus.read_byte_data(self.ADDR, reg + 1)
+        with self.bus.lock:
+            high = self.bus.read_byte_data(self.ADDR, reg)
+            low = self.bus.read_byte_data(self.ADDR, reg + 1)
 
         return (high << 8) | low
 
@@ -95,9 +97,10 @@ class BMP180:
         """
         self.bus.write_byte_data(self.ADDR, self.REG_CTRL, self.CMD_TEMP)
         time.sleep(0.005)
-        msb = self.bus.read_byte_data(self.ADDR, self.REG_DATA)
-        lsb = self.bus.read_byte_data(self.ADDR, self.REG_DATA + 1)
-  
+        with self.bus.lock:
+            msb = self.bus.read_byte_data(self.ADDR, self.REG_DATA)
+            lsb = self.bus.read_byte_data(self.ADDR, self.REG_DATA + 1)
+
         return (msb << 8) | lsb
 
     def _read_raw_pressure(self):
@@ -115,9 +118,10 @@ class BMP180:
         time.sleep({0: 0.005, 1: 0.008, 2: 0.014, 3: 0.026}[self.oss])
         
         # Read three bytes of raw pressure data
-        msb = self.bus.read_byte_data(self.ADDR, self.REG_DATA)
-        lsb = self.bus.read_byte_data(self.ADDR, self.REG_DATA + 1)
-        xlsb = self.bus.read_byte_data(self.ADDR, self.REG_DATA + 2)
+        with self.bus.lock:
+            msb = self.bus.read_byte_data(self.ADDR, self.REG_DATA)
+            lsb = self.bus.read_byte_data(self.ADDR, self.REG_DATA + 1)
+            xlsb = self.bus.read_byte_data(self.ADDR, self.REG_DATA + 2)
         
         # Combine into 24-bit value, then right shift according to oversampling rate
         raw = ((msb << 16) + (lsb << 8) + xlsb) >> (8 - self.oss)
@@ -1,81 +1,155 @@
-from gpiozero import OutputDevice, InputDevice
 import time
+from ..pin import Pin
 
 
 class DHT11():
-   MAX_DELAY_COUINT = 100
-   BIT_1_DELAY_COUNT = 10
+   """
+   DHT11 temperature and humidity sensor.
+
+   The frame is decoded from the timestamps of its falling edges. Each bit
+   is a 50us low pulse and a high pulse of 26-28us for 0 or 70us for 1, so
+   the time between two falling edges is about 77us for a 0 and 120us for
+   a 1. On the gpiod backend the edges come with kernel timestamps, so
+   decoding does not depend on CPU speed or load. RPi.GPIO timestamps its
+   edges in a callback thread, much too late for that, so on it the line
+   is polled in a busy loop for the length of the frame instead.
+
+   Args:
+      pin (int): BCM pin number of the data line.
+      pull_up (bool, optional): Enable the internal pull up. Default is False.
+      retries (int, optional): Attempts per read, on timeout or checksum failure. Default is 3.
+      timeout (float, optional): Hard timeout of one attempt in seconds, after the start signal. Default is 0.05.
+      backend (str, optional): GPIO backend of the pin, see :class:`fusion_hat.pin.Pin`. Default is None.
+   """
    BITS_LEN = 40
-
-   def __init__(self, pin, pull_up=False):
+   START_TIME = 0.02
+   """Seconds the start signal holds the line low, at least 18ms."""
+   MIN_INTERVAL = 1.0
+   """Seconds the sensor needs between two reads."""
+   BIT_1_PERIOD_NS = 100000
+   """Falling edge to falling edge time in nanoseconds above which a bit is 1."""
+
+   def __init__(self, pin, pull_up=False, retries=3, timeout=0.05, backend=None):
       self._pin = pin
       self._pull_up = pull_up
-
+      self.retries = retries
+      self.timeout = timeout
+      self._gpio = Pin(pin, mode=Pin.AUTO, pull=Pin.PULL_UP if pull_up else Pin.PULL_NONE, backend=backend)
+      self._gpio.raw()
+      self._last_start = None
+      self._cache = None
+      self._cache_time = None
 
    def read(self):
-      bit_count = 0
-      delay_count = 0
-      bits = ""
+      """
+      Read humidity and temperature.
+
+      Results younger than MIN_INTERVAL are served from the cache, asking
+      the sensor again that soon returns garbage.
+
+      Returns:
+         tuple: (humidity, temperature), humidity in %, temperature in °C,
+            (0.0, 0.0) if every attempt timed out or failed the checksum.
+      """
+      if self._cache is not None and time.monotonic() - self._cache_time < self.MIN_INTERVAL:
+         return self._cache
+      for _ in range(self.retries):
+         if self._last_start is not None:
+            wait = self._last_start + self.MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+               time.sleep(wait)
+         result = self._read_once()
+         if result is not None:
+            self._cache = result
+            self._cache_time = self._last_start
+            return result
+      return 0.0, 0.0
+
+   def _read_once(self):
+      gpio = self._gpio
       # -------------- send start --------------
-      gpio = OutputDevice(self._pin)
-      gpio.off()
-
-      time.sleep(0.02)
-
-      gpio.close()
-      gpio = InputDevice(self._pin, pull_up=self._pull_up)
-
-      # -------------- wait response --------------
-      while gpio.value == 1:
-            pass
-
-      # -------------- read data --------------
-      while bit_count < self.BITS_LEN:
-            while gpio.value == 0:
-               pass
-
-            # st = time.time()
-            while gpio.value == 1:
-               delay_count += 1
-               # break
-               if delay_count > self.MAX_DELAY_COUINT:
-                  break
-            if delay_count > self.BIT_1_DELAY_COUNT:
-               bits += "1"
-            else:
-               bits += "0"
-
-            delay_count = 0
-            bit_count += 1
+      self._last_start = time.monotonic()
+      gpio.low()
+      time.sleep(self.START_TIME)
+      # -------------- capture frame --------------
+      # Response low, response high, then one falling edge per bit
+      if gpio._backend.name == "gpiod":
+         times = self._capture_events()
+      else:
+         times = self._capture_poll()
+      if len(times) < self.BITS_LEN + 1:
+         return None
+
+      # -------------- decode --------------
+      # The last 41 falling edges frame the 40 bits
+      times = times[-(self.BITS_LEN + 1):]
+      value = 0
+      for start, end in zip(times, times[1:]):
+         value = value << 1 | (end - start > self.BIT_1_PERIOD_NS)
+      data = value.to_bytes(5, "big")
 
       # -------------- verify --------------
-      humidity_integer = int(bits[0:8], 2)
-      humidity_decimal = int(bits[8:16], 2)
-      temperature_integer = int(bits[16:24], 2)
-      temperature_decimal = int(bits[24:32], 2)
-      check_sum = int(bits[32:40], 2)
-
-      _sum = humidity_integer + humidity_decimal + temperature_integer + temperature_decimal
-
-      # print(bits)
-      # print(humidity_integer, humidity_decimal, temperature_integer, temperature_decimal)
-      # print(f'sum:{_sum}, check_sum:{check_sum}')
-      # print()
-
-      if check_sum != _sum:
-            humidity = 0.0
-            temperature = 0.0
-      else:
-            humidity = float(f'{humidity_integer}.{humidity_decimal}')
-            temperature = float(f'{temperature_integer}.{temperature_decimal}')
+      humidity_integer, humidity_decimal, temperature_integer, temperature_decimal, check_sum = data
+      if sum(data[:4]) & 0xFF != check_sum:
+         return None
 
-      # -------------- return --------------
+      humidity = float(f'{humidity_integer}.{humidity_decimal}')
+      temperature = float(f'{temperature_integer}.{temperature_decimal}')
       return humidity, temperature
 
+   def _capture_events(self):
+      """
+      Release the line and collect the kernel timestamps of its falling edges.
+      """
+      gpio = self._gpio
+      # The response starts 20-40us after the release
+      gpio.raw()
+      gpio.start_events(Pin.IRQ_FALLING, maxlen=64)
+      try:
+         edges = []
+         deadline = time.monotonic() + self.timeout
+         while len(edges) < self.BITS_LEN + 2:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+               break
+            edges += gpio.read_events(timeout=remaining)
+      finally:
+         gpio.stop_events()
+         gpio.raw()
+      return [edge.timestamp_ns for edge in edges]
+
+   def _capture_poll(self):
+      """
+      Release the line and time its falling edges in a busy loop, until
+      the frame is complete or the timeout.
+      """
+      gpio = self._gpio
+      gpio.raw()
+      read = gpio.fast_read
+      now = time.monotonic_ns
+      deadline = now() + int(self.timeout * 1e9)
+      times = []
+      last = read()
+      while len(times) < self.BITS_LEN + 2:
+         level = read()
+         t = now()
+         if last and not level:
+            times.append(t)
+         elif t > deadline:
+            break
+         last = level
+      return times
+
+   def close(self):
+      """
+      Release the pin.
+      """
+      self._gpio.close()
+
 
 if __name__ == '__main__':
    dht11 = DHT11(17)
    while True:
       humidity, temperature = dht11.read()
       print(f"{time.time():.3f}  temperature:{temperature}°C  humidity: {humidity}%")
-      time.sleep(2)
\ No newline at end of file
+      time.sleep(2)
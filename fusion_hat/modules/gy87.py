@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from smbus2 import SMBus
 import time
 import math
+from fusion_hat._i2c import I2C
+from fusion_hat._i2c_bus import get_bus, get_worker, PRIORITY_HIGH
 from fusion_hat.modules import Magnetometer,MPU6050,BMP180
  
 I2C_BUS = 1  
@@ -19,15 +20,7 @@ def scan_i2c_addr(bus_id=I2C_BUS):
     Returns:
         found: list of all detected I2C device addresses
     """
-    found = []
-    with SMBus(bus_id) as b:
-        for addr in range(0x03, 0x78):  # I2C address range (0x03–0x77)
-            try:
-                b.read_byte(addr)
-                found.append(addr)
-            except Exception:
-                pass
-    return found
+    return I2C.scan(bus_id)
 
 # ------------------------ Tool Function ------------------------
 def tilt_comp_heading(mx, my, mz, ax, ay, az, decl_deg=0.0):
@@ -59,10 +52,14 @@ class GY87:
     GY-87 sensor module main class
     Integrate MPU6050 (accelerometer + gyroscope), BMP180 (barometer), and magnetometer (support multiple models)
     Provide complete sensor data reading functionality, including self-recovery mechanism
+    IMU and magnetometer reads run on the bus worker with a high priority, ahead of slow
+    devices sharing the bus, such as an LCD1602
     """
     
-    def __init__(self, bus_id=I2C_BUS, decl_deg=0.0):
-        self.bus = SMBus(bus_id)
+    def __init__(self, bus_id=I2C_BUS, decl_deg=0.0, priority=PRIORITY_HIGH):
+        self.bus = get_bus(bus_id)
+        self.priority = priority
+        self._worker = get_worker(bus_id)
         self.bmp = BMP180(self.bus)
         self.decl_deg = float(decl_deg)
 
@@ -98,11 +95,14 @@ class GY87:
                 except Exception:
                     return default
         
+        def _read_imu():
+            return (_safe(lambda: self.mpu.get_accel_data(g=True), (0.0, 0.0, 0.0)),  # unit: g
+                    _safe(self.mpu.get_gyro_data,  (0.0, 0.0, 0.0)),   # unit: dps
+                    _safe(self.mpu.get_temp, 0.0))              # unit: °C
+
         # read MPU6050 sensor data
         if self.mpu is not None:
-            ax, ay, az = _safe(lambda: self.mpu.get_accel_data(g=True), (0.0, 0.0, 0.0))  # unit: g
-            gx, gy, gz = _safe(self.mpu.get_gyro_data,  (0.0, 0.0, 0.0))   # unit: dps
-            t_mpu      = _safe(self.mpu.get_temp, 0.0)              # unit: °C
+            (ax, ay, az), (gx, gy, gz), t_mpu = self._worker.run(_read_imu, priority=self.priority)
         else:
             ax, ay, az = (0.0, 0.0, 0.0)
             gx, gy, gz = (0.0, 0.0, 0.0)
@@ -125,7 +125,7 @@ class GY87:
         
         if self.mag is not None:
             try:
-                mx, my, mz = self.mag.read_magnet()
+                mx, my, mz = self._worker.run(self.mag.read_magnet, priority=self.priority)
             except Exception:
                 mx = my = mz = 0.0
             
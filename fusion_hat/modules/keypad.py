@@ -1,5 +1,12 @@
 #!/usr/bin/env python3
-from gpiozero import DigitalOutputDevice, Button
+import time
+import queue
+import threading
+from collections import namedtuple
+from ..pin import Pin, PinGroup
+
+KeyEvent = namedtuple("KeyEvent", ["key", "pressed", "timestamp"])
+"""Key press or release, timestamp is time.monotonic() of the scan that confirmed it."""
 
 class Keypad:
     def __init__(self, rows_pins, cols_pins, keys):
@@ -9,26 +16,179 @@ class Keypad:
         :param cols_pins: List of GPIO pins for the columns.
         :param keys: List of keys in the keypad layout.
         """
-        # Initialize row pins as DigitalOutputDevice
-        self.rows = [DigitalOutputDevice(pin) for pin in rows_pins]
-        # Initialize column pins as Buttons
-        self.cols = [Button(pin, pull_up=False) for pin in cols_pins]
+        # Drive all rows with one call, bit i is rows_pins[i]
+        self.rows = PinGroup(rows_pins, mode=Pin.OUT)
+        self.rows.value(0)
+        # Read all columns with one call, bit j is cols_pins[j]
+        self.cols = PinGroup(cols_pins, mode=Pin.IN, pull=Pin.PULL_DOWN)
         self.keys = keys  # Set the keypad layout
 
+        self.events = queue.Queue(maxsize=64)
+        """Queue of KeyEvent, filled by the scan thread. Events are dropped when it is full."""
+        self.on_press = None
+        """Called with the key on each press, from the scan thread."""
+        self.on_release = None
+        """Called with the key on each release, from the scan thread."""
+        self.ghost_frames = 0
+        """Scans ignored because they could contain ghost keys."""
+        self.thread = None
+        self.thread_started = False
+        self._lock = threading.Lock()
+        self._pressed = set()
+
+    def _scan_rows(self):
+        """
+        Scan the matrix once.
+        :return: Column bitmask of each row.
+        """
+        rows = []
+        for i in range(len(self.rows)):
+            self.rows.value(1 << i)  # Enable the current row only
+            rows.append(self.cols.value())
+        self.rows.value(0)  # Disable all rows
+        return rows
+
     def read(self):
         """
         Read the currently pressed keys on the keypad.
         :return: A list of pressed keys.
         """
+        with self._lock:
+            rows = self._scan_rows()
+        return self._keys_of(rows)
+
+    def _keys_of(self, rows):
         pressed_keys = []
-        # Scan each row and column to identify pressed keys
-        for i, row in enumerate(self.rows):
-            row.on()  # Enable the current row
-            for j, col in enumerate(self.cols):
-                if col.is_pressed:  # Check if the column button is pressed
+        n_cols = len(self.cols)
+        for i, cols in enumerate(rows):
+            for j in range(n_cols):
+                if cols >> j & 1:  # Check if the column button is pressed
                     # Calculate the key index based on row and column
-                    index = i * len(self.cols) + j
+                    index = i * n_cols + j
                     pressed_keys.append(self.keys[index])
-            row.off()  # Disable the current row
         return pressed_keys
 
+    @staticmethod
+    def is_ghosted(rows):
+        """
+        Check a scan for possible ghost keys.
+
+        Without diodes, three keys pressed on the corners of a rectangle make
+        the fourth corner read as pressed too. A scan where two rows share
+        two or more columns can't tell real keys from ghosts.
+        :param rows: Column bitmask of each row.
+        :return: True if the scan could contain ghost keys.
+        """
+        for i, cols in enumerate(rows):
+            if cols & cols - 1:  # Two or more columns on this row
+                for other in rows[i + 1:]:
+                    shared = cols & other
+                    if shared & shared - 1:
+                        return True
+        return False
+
+    def pressed(self):
+        """
+        Keys the scan thread currently sees as pressed, debounced.
+        :return: A list of pressed keys.
+        """
+        with self._lock:
+            return [key for key in self.keys if key in self._pressed]
+
+    def get_event(self, timeout=None):
+        """
+        Get the next press or release from the scan thread.
+        :param timeout: Seconds to wait, None to wait forever.
+        :return: KeyEvent, or None on timeout.
+        """
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _emit(self, key, pressed, timestamp):
+        try:
+            self.events.put_nowait(KeyEvent(key, pressed, timestamp))
+        except queue.Full:
+            pass
+        callback = self.on_press if pressed else self.on_release
+        if callback is not None:
+            callback(key)
+
+    def thread_scan_loop(self, interval, debounce_scans):
+        """
+        Thread loop scanning the keypad.
+
+        A key changes state only after debounce_scans scans in a row agree.
+        Scans that could contain ghost keys are skipped, every key pressed
+        in a clean scan is reported (n-key rollover).
+        """
+        n_keys = len(self.rows) * len(self.cols)
+        counts = [0] * n_keys
+        stable = [False] * n_keys
+        n_cols = len(self.cols)
+        next_scan = time.monotonic()
+        while self.thread_started:
+            with self._lock:
+                rows = self._scan_rows()
+            now = time.monotonic()
+            if self.is_ghosted(rows):
+                self.ghost_frames += 1
+            else:
+                for index in range(n_keys):
+                    down = bool(rows[index // n_cols] >> index % n_cols & 1)
+                    if down == stable[index]:
+                        counts[index] = 0
+                        continue
+                    counts[index] += 1
+                    if counts[index] >= debounce_scans:
+                        counts[index] = 0
+                        stable[index] = down
+                        key = self.keys[index]
+                        with self._lock:
+                            if down:
+                                self._pressed.add(key)
+                            else:
+                                self._pressed.discard(key)
+                        self._emit(key, down, now)
+            next_scan += interval
+            rest = next_scan - time.monotonic()
+            if rest > 0:
+                time.sleep(rest)
+            else:
+                next_scan = time.monotonic()
+
+    def start_thread(self, scan_rate=100, debounce=0.02):
+        """
+        Start scanning the keypad in a background thread.
+
+        Presses and releases go to the events queue and the on_press and
+        on_release callbacks.
+        :param scan_rate: Scans per second.
+        :param debounce: Seconds a key must stay pressed or released to change state.
+        """
+        if self.thread is None:
+            debounce_scans = max(1, round(debounce * scan_rate))
+            self.thread_started = True
+            self.thread = threading.Thread(target=self.thread_scan_loop,
+                                           args=(1 / scan_rate, debounce_scans), daemon=True)
+            self.thread.start()
+
+    def stop_thread(self):
+        """
+        Stop the scan thread.
+        """
+        self.thread_started = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        with self._lock:
+            self._pressed.clear()
+
+    def close(self):
+        """
+        Release the row and column pins.
+        """
+        self.stop_thread()
+        self.rows.close()
+        self.cols.close()
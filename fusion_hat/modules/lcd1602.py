@@ -1,18 +1,29 @@
 from .._i2c import I2C
+from .._i2c_bus import get_worker, PRIORITY_LOW
 from time import sleep
+import threading
 
 class LCD1602():
-    """LCD1602 module."""
+    """LCD1602 module.
+
+    Writes run as low priority jobs on the bus worker (see
+    :class:`fusion_hat._i2c_bus.BusWorker`), and the bus is released
+    during every enable pulse, so other devices on the bus are not held
+    up by slow display updates.
+    """
     DEFAULT_ADDRESS_1 = 0x27
     DEFAULT_ADDRESS_2 = 0x3f
 
-    def __init__(self, address=None, backlight:bool=True, bus=1):
+    def __init__(self, address=None, backlight:bool=True, bus=1, priority=PRIORITY_LOW):
         """Initialize the LCD1602 module."""
         self.bus = bus
         self.address = address
         self._backlight = backlight
+        self.priority = priority
+        self._worker = get_worker(self.bus)
+        self._lock = threading.Lock()
 
-        _addr_list = I2C.scan(bus=1)
+        _addr_list = I2C.scan(bus=self.bus, cached=True)
         if self.address is None:
             if self.DEFAULT_ADDRESS_1 in _addr_list:
                 self.address = self.DEFAULT_ADDRESS_1
@@ -24,7 +35,7 @@ class LCD1602():
             if self.address not in _addr_list:
                 raise OSError(f"No LCD1602 found on I2C:0x{self.address:0X}")
             
-        self.i2c = I2C(self.address, self.bus)
+        self.i2c = I2C(address=self.address, bus=self.bus)
 
         self.send_command(0x33) # Must initialize to 8-line mode at first
         sleep(0.005)
@@ -46,40 +57,26 @@ class LCD1602():
             temp &= 0xF7
         self.i2c.write_byte(temp)
     
+    def _run(self, steps, *args):
+        # One display update at a time, their nibbles must not interleave
+        with self._lock:
+            return self._worker.run(steps, *args, priority=self.priority)
+
+    def _send(self, value, mode):
+        # Send bit7-4 firstly, bit3-0 secondly
+        for buf in (value & 0xF0, (value & 0x0F) << 4):
+            buf |= mode               # EN = 1
+            self.write_byte(buf)
+            yield 0.002               # Free the bus while EN is held high
+            buf &= 0xFB               # Make EN = 0
+            self.write_byte(buf)
+
     def send_command(self, cmd):
-        # Send bit7-4 firstly
-        buf = cmd & 0xF0
-        buf |= 0x04               # RS = 0, RW = 0, EN = 1
-        self.write_byte(buf)
-        sleep(0.002)
-        buf &= 0xFB               # Make EN = 0
-        self.write_byte(buf)
+        self._run(self._send, cmd, 0x04)   # RS = 0, RW = 0
 
-        # Send bit3-0 secondly
-        buf = (cmd & 0x0F) << 4
-        buf |= 0x04               # RS = 0, RW = 0, EN = 1
-        self.write_byte(buf)
-        sleep(0.002)
-        buf &= 0xFB               # Make EN = 0
-        self.write_byte(buf)
-    
     def send_data(self, data):
-        # Send bit7-4 firstly
-        buf = data & 0xF0
-        buf |= 0x05               # RS = 1, RW = 0, EN = 1
-        self.write_byte(buf)
-        sleep(0.002)
-        buf &= 0xFB               # Make EN = 0
-        self.write_byte(buf)
+        self._run(self._send, data, 0x05)  # RS = 1, RW = 0
 
-        # Send bit3-0 secondly
-        buf = (data & 0x0F) << 4
-        buf |= 0x05               # RS = 1, RW = 0, EN = 1
-        self.write_byte(buf)
-        sleep(0.002)
-        buf &= 0xFB               # Make EN = 0
-        self.write_byte(buf)
-    
     def clear(self):
         self.send_command(0x01) # Clear Screen
         
@@ -101,15 +98,20 @@ class LCD1602():
 
         # Move cursor
         addr = 0x80 + 0x40 * y + x
-        self.send_command(addr)
+        self._run(self._write_steps, addr, str)
 
+    def _write_steps(self, addr, str):
+        yield from self._send(addr, 0x04)
         for chr in str:
-            self.send_data(ord(chr))
+            yield from self._send(ord(chr), 0x05)
     
     def message(self, text):
         #print("message: %s"%text)
+        self._run(self._message_steps, text)
+
+    def _message_steps(self, text):
         for char in text:
             if char == '\n':
-                self.send_command(0xC0) # next line
+                yield from self._send(0xC0, 0x04) # next line
             else:
-                self.send_data(ord(char))
\ No newline at end of file
+                yield from self._send(ord(char), 0x05)
\ No newline at end of file
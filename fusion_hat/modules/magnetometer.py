@@ -1,5 +1,5 @@
 from fusion_hat.modules.mpu6050 import MPU6050
-from smbus2 import SMBus
+from fusion_hat._i2c_bus import SharedBus, get_bus
 from enum import Enum
 import time
 
@@ -22,7 +22,7 @@ def i2c_ack(bus, addr):
     Check if a device responds at the specified I2C address
     
     Parameters:
-        bus: SMBus instance
+        bus: SharedBus instance
         addr: I2C address to check
     
     Returns:
@@ -97,7 +97,7 @@ class QMC6310:
     QMC6310_VAL_SOFT_RST_ON   = 1 << 7
     QMC6310_VAL_SOFT_RST_OFF  = 0 << 7
 
-    def __init__(self, bus: SMBus, addr: int = DEF_ADDR, field_range="8G"):
+    def __init__(self, bus: SharedBus, addr: int = DEF_ADDR, field_range="8G"):
         """
         Initialize QMC6310 magnetometer
         
@@ -164,7 +164,7 @@ class HMC5883L:
     REG_MODE     = 0x02
     REG_OUT_X_H  = 0x03
 
-    def __init__(self, bus: SMBus, addr: int = DEF_ADDR):
+    def __init__(self, bus: SharedBus, addr: int = DEF_ADDR):
         self.bus = bus
         self.ADDR = addr
         self.bus.write_byte_data(self.ADDR, self.REG_CONFIG_A, 0b01110000)  # average 8 samples, 15Hz output rate
@@ -185,8 +185,9 @@ class HMC5883L:
         Returns:
             val: converted signed 16-bit integer
         """
-        high = self.bus.read_byte_data(self.ADDR, reg_h)
-        low  = self.bus.read_byte_data(self.ADDR, reg_h + 1)
+        with self.bus.lock:
+            high = self.bus.read_byte_data(self.ADDR, reg_h)
+            low  = self.bus.read_byte_data(self.ADDR, reg_h + 1)
         val = (high << 8) | low
         if val >= 0x8000:
             val = -((65535 - val) + 1)
@@ -218,12 +219,12 @@ class QMC5883L:
     REG_SET_RESET = 0x0B
     REG_OUT_X_L   = 0x00
 
-    def __init__(self, bus: SMBus, addr: int = DEF_ADDR):
+    def __init__(self, bus: SharedBus, addr: int = DEF_ADDR):
         """
         Initialize QMC5883L magnetometer
         
         Parameters:
-            bus: SMBus instance for I2C communication
+            bus: SharedBus instance for I2C communication
             addr: Device I2C address, default is DEF_ADDR (0x0D)
         """
         self.bus = bus
@@ -254,10 +255,11 @@ class QMC5883L:
         Returns:
             val: Converted signed 16-bit integer
         """
-        # First read the low byte
-        low = self.bus.read_byte_data(self.ADDR, reg_l)
-        # Then read the high byte
-        high = self.bus.read_byte_data(self.ADDR, reg_l + 1)
+        with self.bus.lock:
+            # First read the low byte
+            low = self.bus.read_byte_data(self.ADDR, reg_l)
+            # Then read the high byte
+            high = self.bus.read_byte_data(self.ADDR, reg_l + 1)
         # Combine the two bytes into a 16-bit integer (note little-endian format)
         val = (high << 8) | low
         # Convert to signed integer
@@ -291,12 +293,12 @@ class QMC5883P:
     REG_MODE    = 0x0A
     REG_CONFIG  = 0x0B
 
-    def __init__(self, bus: SMBus, addr: int = DEF_ADDR):
+    def __init__(self, bus: SharedBus, addr: int = DEF_ADDR):
         """
         Initialize QMC5883P magnetometer
         
         Parameters:
-            bus: SMBus instance for I2C communication
+            bus: SharedBus instance for I2C communication
             addr: Device I2C address, default is DEF_ADDR (0x2C)
         """
         self.bus = bus
@@ -371,7 +373,7 @@ class Magnetometer:
         self.mpu = None
         
         try:
-            self.bus = SMBus(I2C_BUS)
+            self.bus = get_bus(I2C_BUS)
             
             if mag_type == MagnetometerType.mag_QMC6310:
                 try:
@@ -3,10 +3,27 @@ This code is based on Martijn's(martijn@mrtijn.nl) project mpu6050.
 Follow the MIT protocol.
 
 https://github.com/m-rtijn/mpu6050
+
+FIFO streaming needs NumPy, it is only imported when used:
+
+    >>> mpu = MPU6050()
+    >>> for timestamps, accel, gyro in mpu.stream_fifo(block_size=500, sample_rate=1000):
+    ...     print(timestamps[-1], accel[:, 2].std())
+
+With the INT pin wired to a GPIO, sample exactly once per new sample:
+
+    >>> def on_sample(timestamp_ns, accel, gyro, temp):
+    ...     print(timestamp_ns, accel, gyro)
+    >>> mpu.start_sampling(int_pin=26, callback=on_sample, sample_rate=200)
 """
 
-from smbus2 import SMBus
+from .._i2c_bus import get_bus
+from .._register_map import RegisterMap, Field
+from ..pin import Pin
+from smbus2 import i2c_msg
+import threading
 import time
+import struct
 
 class MPU6050():
 
@@ -61,25 +78,91 @@ class MPU6050():
     GYRO_YOUT0 = 0x45
     GYRO_ZOUT0 = 0x47
 
+    SMPLRT_DIV = 0x19
     ACCEL_CONFIG = 0x1C
     GYRO_CONFIG = 0x1B
     MPU_CONFIG = 0x1A
+    INT_ENABLE = 0x38
+    FIFO_EN = 0x23
 
     # Bypass Mode
     REG_INT_PIN_CFG = 0x37    # INT_PIN_CFG
     REG_USER_CTRL = 0x6A      # USER_CTRL
     REG_WHO_AM_I = 0x75       # WHO_AM_I
 
+    # FIFO
+    REG_FIFO_COUNTH = 0x72    # FIFO_COUNTH, FIFO_COUNTL follows
+    REG_FIFO_R_W = 0x74       # FIFO_R_W
+    FIFO_SIZE = 1024
+    FIFO_EN_ACCEL_GYRO = 0x78 # XG, YG, ZG and ACCEL into the FIFO
+    FIFO_FRAME_SIZE = 12      # accel x, y, z, gyro x, y, z
+    USER_CTRL_FIFO_EN = 0x40
+    USER_CTRL_FIFO_RESET = 0x04
+
+    # Data ready interrupt
+    REG_INT_STATUS = 0x3A     # INT_STATUS, cleared by reading it
+    INT_DATA_RDY = 0x01       # DATA_RDY_EN in INT_ENABLE, DATA_RDY_INT in INT_STATUS
+    # INT_LEVEL, INT_OPEN, LATCH_INT_EN and INT_RD_CLEAR in INT_PIN_CFG, I2C_BYPASS_EN is kept
+    INT_PIN_CFG_MASK = 0xF0
+    INT_PIN_CFG_PULSE = 0x10  # active high push-pull 50us pulse, status cleared on any read
+
+    # Configuration registers only changed by the driver, safe to shadow.
+    # USER_CTRL and PWR_MGMT_1 have self-clearing reset bits, so they are not.
+    SHADOWED_REGISTERS = (SMPLRT_DIV, MPU_CONFIG, GYRO_CONFIG, ACCEL_CONFIG,
+                          FIFO_EN, REG_INT_PIN_CFG, INT_ENABLE)
+    DLPF_CFG = Field(MPU_CONFIG, shift=0, width=3)
+    EXT_SYNC_SET = Field(MPU_CONFIG, shift=3, width=3)
+
+    ACCEL_SCALE_MODIFIERS = {
+        ACCEL_RANGE_2G: ACCEL_SCALE_MODIFIER_2G,
+        ACCEL_RANGE_4G: ACCEL_SCALE_MODIFIER_4G,
+        ACCEL_RANGE_8G: ACCEL_SCALE_MODIFIER_8G,
+        ACCEL_RANGE_16G: ACCEL_SCALE_MODIFIER_16G,
+    }
+    GYRO_SCALE_MODIFIERS = {
+        GYRO_RANGE_250DEG: GYRO_SCALE_MODIFIER_250DEG,
+        GYRO_RANGE_500DEG: GYRO_SCALE_MODIFIER_500DEG,
+        GYRO_RANGE_1000DEG: GYRO_SCALE_MODIFIER_1000DEG,
+        GYRO_RANGE_2000DEG: GYRO_SCALE_MODIFIER_2000DEG,
+    }
+
+    # ACCEL_XOUT_H to GYRO_ZOUT_L, big endian: accel x, y, z, temp, gyro x, y, z
+    BURST_LENGTH = 14
+    _burst = struct.Struct(">7h")
+    _vector = struct.Struct(">3h")
+
     def __init__(self, address=I2C_ADDRESS, bus=1):
         self.address = address
-        self.bus = SMBus(bus)
+        self.bus = get_bus(bus)
+        self.regs = RegisterMap.from_smbus(self.bus, self.address, shadowed=self.SHADOWED_REGISTERS)
+        # Divisors of the current ranges, None until needed again after a range change
+        self._accel_scale = None
+        self._gyro_scale = None
+        self.fifo_overflows = 0
+        """FIFO overflows seen while streaming, each one loses samples"""
+        self.missed_samples = 0
+        """Data ready pulses queued behind another one while sampling, their samples were overwritten"""
+        self._int_pin = None
+        self._own_int_pin = False
+        self._sampler = None
+        self._sampling = False
+        self._sample = None
+        self._sample_cond = threading.Condition()
 
         # Wake up the MPU-6050 since it starts in sleep mode
         try:
             self.bus.write_byte_data(self.address, self.PWR_MGMT_1, 0x00)
         except:
+            self.bus.close()
             raise OSError(f"MPU6050 not found addr: 0x{self.address:0x}")
 
+    def close(self):
+        """Release the shared I2C bus handle."""
+        self.stop_sampling()
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
 
     # I2C communication methods
     def read_i2c_word(self, register):
@@ -88,9 +171,10 @@ class MPU6050():
         register -- the first register to read from.
         Returns the combined read results.
         """
-        # Read the data from the registers
-        high = self.bus.read_byte_data(self.address, register)
-        low = self.bus.read_byte_data(self.address, register + 1)
+        # Read the data from the registers, keep both bytes from the same sample
+        with self.bus.lock:
+            high = self.bus.read_byte_data(self.address, register)
+            low = self.bus.read_byte_data(self.address, register + 1)
 
         value = (high << 8) + low
 
@@ -99,6 +183,42 @@ class MPU6050():
         else:
             return value
 
+    def read_raw_data(self):
+        """Read accel, temperature and gyro in one 14 byte I2C transaction.
+
+        All values come from the same sample.
+        Returns the raw signed values (ax, ay, az, temp, gx, gy, gz).
+        """
+        data = self.bus.read_i2c_block_data(self.address, self.ACCEL_XOUT0, self.BURST_LENGTH)
+        return self._burst.unpack(bytes(data))
+
+    def _read_vector(self, register):
+        """Read three consecutive words in one 6 byte I2C transaction."""
+        data = self.bus.read_i2c_block_data(self.address, register, 6)
+        return self._vector.unpack(bytes(data))
+
+    def _get_accel_scale(self):
+        """Accel divisor of the current range, cached until set_accel_range."""
+        if self._accel_scale is None:
+            accel_range = self.read_accel_range(True)
+            scale = self.ACCEL_SCALE_MODIFIERS.get(accel_range)
+            if scale is None:
+                print("Unkown range - accel_scale_modifier set to self.ACCEL_SCALE_MODIFIER_2G")
+                scale = self.ACCEL_SCALE_MODIFIER_2G
+            self._accel_scale = scale
+        return self._accel_scale
+
+    def _get_gyro_scale(self):
+        """Gyro divisor of the current range, cached until set_gyro_range."""
+        if self._gyro_scale is None:
+            gyro_range = self.read_gyro_range(True)
+            scale = self.GYRO_SCALE_MODIFIERS.get(gyro_range)
+            if scale is None:
+                print("Unkown range - gyro_scale_modifier set to self.GYRO_SCALE_MODIFIER_250DEG")
+                scale = self.GYRO_SCALE_MODIFIER_250DEG
+            self._gyro_scale = scale
+        return self._gyro_scale
+
     # MPU-6050 Methods
     def get_temp(self):
         """Reads the temperature from the onboard temperature sensor of the MPU-6050.
@@ -119,11 +239,9 @@ class MPU6050():
         accel_range -- the range to set the accelerometer to. Using a
         pre-defined range is advised.
         """
-        # First change it to 0x00 to make sure we write the correct value later
-        self.bus.write_byte_data(self.address, self.ACCEL_CONFIG, 0x00)
-
-        # Write the new range to the ACCEL_CONFIG register
-        self.bus.write_byte_data(self.address, self.ACCEL_CONFIG, accel_range)
+        # Write the new range to the ACCEL_CONFIG register, self test bits cleared
+        self.regs.write(self.ACCEL_CONFIG, accel_range)
+        self._accel_scale = None
 
     def read_accel_range(self, raw = False):
         """Reads the range the accelerometer is set to.
@@ -132,8 +250,9 @@ class MPU6050():
         register
         If raw is False, it will return an integer: -1, 2, 4, 8 or 16. When it
         returns -1 something went wrong.
+        The register is only read from the bus once, later calls use its shadow.
         """
-        raw_data = self.bus.read_byte_data(self.address, self.ACCEL_CONFIG)
+        raw_data = self.regs.read(self.ACCEL_CONFIG)
 
         if raw is True:
             return raw_data
@@ -156,36 +275,14 @@ class MPU6050():
         If g is False, it will return the data in m/s^2
         Returns a dictionary with the measurement results.
         """
-        x = self.read_i2c_word(self.ACCEL_XOUT0)
-        y = self.read_i2c_word(self.ACCEL_YOUT0)
-        z = self.read_i2c_word(self.ACCEL_ZOUT0)
-
-        accel_scale_modifier = None
-        accel_range = self.read_accel_range(True)
-
-        if accel_range == self.ACCEL_RANGE_2G:
-            accel_scale_modifier = self.ACCEL_SCALE_MODIFIER_2G
-        elif accel_range == self.ACCEL_RANGE_4G:
-            accel_scale_modifier = self.ACCEL_SCALE_MODIFIER_4G
-        elif accel_range == self.ACCEL_RANGE_8G:
-            accel_scale_modifier = self.ACCEL_SCALE_MODIFIER_8G
-        elif accel_range == self.ACCEL_RANGE_16G:
-            accel_scale_modifier = self.ACCEL_SCALE_MODIFIER_16G
-        else:
-            print("Unkown range - accel_scale_modifier set to self.ACCEL_SCALE_MODIFIER_2G")
-            accel_scale_modifier = self.ACCEL_SCALE_MODIFIER_2G
-
-        x = x / accel_scale_modifier
-        y = y / accel_scale_modifier
-        z = z / accel_scale_modifier
+        x, y, z = self._read_vector(self.ACCEL_XOUT0)
+        return self._scale_accel(x, y, z, g)
 
-        if g is True:
-            return [x, y, z]
-        elif g is False:
-            x = x * self.GRAVITIY_MS2
-            y = y * self.GRAVITIY_MS2
-            z = z * self.GRAVITIY_MS2
-            return [x, y, z]
+    def _scale_accel(self, x, y, z, g):
+        scale = self._get_accel_scale()
+        if g is False:
+            scale = scale / self.GRAVITIY_MS2
+        return [x / scale, y / scale, z / scale]
 
     def set_gyro_range(self, gyro_range):
         """Sets the range of the gyroscope to range.
@@ -193,17 +290,14 @@ class MPU6050():
         gyro_range -- the range to set the gyroscope to. Using a pre-defined
         range is advised.
         """
-        # First change it to 0x00 to make sure we write the correct value later
-        self.bus.write_byte_data(self.address, self.GYRO_CONFIG, 0x00)
-
-        # Write the new range to the ACCEL_CONFIG register
-        self.bus.write_byte_data(self.address, self.GYRO_CONFIG, gyro_range)
+        # Write the new range to the GYRO_CONFIG register, self test bits cleared
+        self.regs.write(self.GYRO_CONFIG, gyro_range)
+        self._gyro_scale = None
 
     def set_filter_range(self, filter_range=FILTER_BW_256):
         """Sets the low-pass bandpass filter frequency"""
         # Keep the current EXT_SYNC_SET configuration in bits 3, 4, 5 in the MPU_CONFIG register
-        EXT_SYNC_SET = self.bus.read_byte_data(self.address, self.MPU_CONFIG) & 0b00111000
-        return self.bus.write_byte_data(self.address, self.MPU_CONFIG,  EXT_SYNC_SET | filter_range)
+        self.regs.update_bits(self.MPU_CONFIG, 0b11000111, filter_range)
 
 
     def read_gyro_range(self, raw = False):
@@ -213,8 +307,9 @@ class MPU6050():
         register.
         If raw is False, it will return 250, 500, 1000, 2000 or -1. If the
         returned value is equal to -1 something went wrong.
+        The register is only read from the bus once, later calls use its shadow.
         """
-        raw_data = self.bus.read_byte_data(self.address, self.GYRO_CONFIG)
+        raw_data = self.regs.read(self.GYRO_CONFIG)
 
         if raw is True:
             return raw_data
@@ -235,39 +330,226 @@ class MPU6050():
 
         Returns the read values in a dictionary.
         """
-        x = self.read_i2c_word(self.GYRO_XOUT0)
-        y = self.read_i2c_word(self.GYRO_YOUT0)
-        z = self.read_i2c_word(self.GYRO_ZOUT0)
-
-        gyro_scale_modifier = None
-        gyro_range = self.read_gyro_range(True)
-
-        if gyro_range == self.GYRO_RANGE_250DEG:
-            gyro_scale_modifier = self.GYRO_SCALE_MODIFIER_250DEG
-        elif gyro_range == self.GYRO_RANGE_500DEG:
-            gyro_scale_modifier = self.GYRO_SCALE_MODIFIER_500DEG
-        elif gyro_range == self.GYRO_RANGE_1000DEG:
-            gyro_scale_modifier = self.GYRO_SCALE_MODIFIER_1000DEG
-        elif gyro_range == self.GYRO_RANGE_2000DEG:
-            gyro_scale_modifier = self.GYRO_SCALE_MODIFIER_2000DEG
-        else:
-            print("Unkown range - gyro_scale_modifier set to self.GYRO_SCALE_MODIFIER_250DEG")
-            gyro_scale_modifier = self.GYRO_SCALE_MODIFIER_250DEG
-
-        x = x / gyro_scale_modifier
-        y = y / gyro_scale_modifier
-        z = z / gyro_scale_modifier
+        x, y, z = self._read_vector(self.GYRO_XOUT0)
+        scale = self._get_gyro_scale()
+        return [x / scale, y / scale, z / scale]
 
-        return [x, y, z]
+    def get_all_data(self, g = False):
+        """Reads and returns all the available data.
 
-    def get_all_data(self):
-        """Reads and returns all the available data."""
-        temp = self.get_temp()
-        accel = self.get_accel_data()
-        gyro = self.get_gyro_data()
+        Accel, temperature and gyro come from one burst read of the same sample.
+        If g is True, accel is in g, otherwise in m/s^2
+        Returns [accel, gyro, temp].
+        """
+        ax, ay, az, raw_temp, gx, gy, gz = self.read_raw_data()
+        accel = self._scale_accel(ax, ay, az, g)
+        scale = self._get_gyro_scale()
+        gyro = [gx / scale, gy / scale, gz / scale]
+        temp = (raw_temp / 340.0) + 36.53
 
         return [accel, gyro, temp]
 
+    # FIFO streaming
+    def start_fifo(self, sample_rate=1000, filter_range=FILTER_BW_188):
+        """Start filling the FIFO with accel and gyro samples.
+
+        sample_rate -- samples per second, 4 to 1000, rounded to what the
+        sample rate divider can do.
+        filter_range -- low pass filter, must not be FILTER_BW_256, which
+        switches the gyro to 8 kHz.
+        Returns the actual sample rate.
+        """
+        rate = self.set_sample_rate(sample_rate, filter_range)
+        self.regs.write(self.FIFO_EN, self.FIFO_EN_ACCEL_GYRO)
+        self.reset_fifo()
+        return rate
+
+    def set_sample_rate(self, sample_rate, filter_range=FILTER_BW_188):
+        """Set the output rate of the sensor registers, FIFO and data ready interrupt.
+
+        sample_rate -- samples per second, 4 to 1000, rounded to what the
+        sample rate divider can do.
+        filter_range -- low pass filter, must not be FILTER_BW_256, which
+        switches the gyro to 8 kHz.
+        Returns the actual sample rate.
+        """
+        divider = min(255, max(0, round(1000 / sample_rate) - 1))
+        self.set_filter_range(filter_range)
+        self.regs.write(self.SMPLRT_DIV, divider)
+        return 1000 / (1 + divider)
+
+    def reset_fifo(self):
+        """Empty the FIFO and keep it enabled."""
+        self.bus.write_byte_data(self.address, self.REG_USER_CTRL, self.USER_CTRL_FIFO_RESET)
+        self.bus.write_byte_data(self.address, self.REG_USER_CTRL, self.USER_CTRL_FIFO_EN)
+
+    def stop_fifo(self):
+        """Stop filling the FIFO."""
+        self.regs.write(self.FIFO_EN, 0x00)
+        self.bus.write_byte_data(self.address, self.REG_USER_CTRL, 0x00)
+
+    def read_fifo_count(self):
+        """Returns the number of bytes in the FIFO."""
+        high, low = self.bus.read_i2c_block_data(self.address, self.REG_FIFO_COUNTH, 2)
+        return high << 8 | low
+
+    def read_fifo(self, length):
+        """Read length bytes from the FIFO in one I2C transaction.
+
+        FIFO_R_W does not auto increment, so a long read drains the FIFO
+        instead of the registers after it. SMBus block reads stop at 32
+        bytes, this uses a plain I2C read of any length.
+        """
+        write = i2c_msg.write(self.address, [self.REG_FIFO_R_W])
+        read = i2c_msg.read(self.address, length)
+        self.bus.i2c_rdwr(write, read)
+        return bytes(read)
+
+    def stream_fifo(self, block_size=256, sample_rate=1000, filter_range=FILTER_BW_188, timeout=1.0):
+        """Stream accel and gyro samples from the FIFO in fixed size blocks.
+
+        A generator of (timestamps, accel, gyro) NumPy arrays of block_size
+        samples: time.monotonic() of each sample, accel in g and gyro in
+        deg/s as (block_size, 3) float32. The arrays are reused for the
+        next block, copy them to keep them. Timestamps count sample periods
+        back from the time the FIFO count was read.
+
+        The FIFO is drained in bursts of whole frames and the thread sleeps
+        while it fills. An overflow resets the FIFO and counts in
+        fifo_overflows. The FIFO is stopped when the generator is closed.
+        Raises TimeoutError if no sample arrives for timeout seconds.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("MPU6050 FIFO streaming needs numpy, install it with: pip3 install numpy") from None
+
+        frame = self.FIFO_FRAME_SIZE
+        full = self.FIFO_SIZE - self.FIFO_SIZE % frame
+        timestamps = np.empty(block_size, dtype=np.float64)
+        accel = np.empty((block_size, 3), dtype=np.float32)
+        gyro = np.empty((block_size, 3), dtype=np.float32)
+        rate = self.start_fifo(sample_rate, filter_range)
+        period = 1 / rate
+        # Leave margin, the FIFO holds full // frame samples
+        max_sleep = full // frame * period / 2
+        try:
+            filled = 0
+            last_data = time.monotonic()
+            while True:
+                count = self.read_fifo_count()
+                now = time.monotonic()
+                if count >= self.FIFO_SIZE:
+                    # Full FIFOs drop their oldest bytes and lose frame alignment
+                    self.fifo_overflows += 1
+                    self.reset_fifo()
+                    continue
+                frames = min(count // frame, block_size - filled)
+                if frames == 0:
+                    if now - last_data > timeout:
+                        raise TimeoutError(f"No MPU6050 FIFO data for {timeout}s")
+                    time.sleep(min((block_size - filled) * period, max_sleep))
+                    continue
+                last_data = now
+                data = np.frombuffer(self.read_fifo(frames * frame), dtype=">i2").reshape(frames, 6)
+                end = filled + frames
+                # The newest frame in the FIFO arrived around now
+                newest = count // frame - 1
+                timestamps[filled:end] = now - (newest - np.arange(frames)) * period
+                np.divide(data[:, :3], self._get_accel_scale(), out=accel[filled:end])
+                np.divide(data[:, 3:], self._get_gyro_scale(), out=gyro[filled:end])
+                filled = end
+                if filled == block_size:
+                    yield timestamps, accel, gyro
+                    filled = 0
+        finally:
+            self.stop_fifo()
+
+    # Data ready interrupt sampling
+    def enable_data_ready(self):
+        """Pulse the INT pin each time a new sample is in the data registers."""
+        self.regs.update_bits(self.REG_INT_PIN_CFG, self.INT_PIN_CFG_MASK, self.INT_PIN_CFG_PULSE)
+        self.regs.set_bits(self.INT_ENABLE, self.INT_DATA_RDY)
+
+    def disable_data_ready(self):
+        """Stop pulsing the INT pin for new samples."""
+        self.regs.clear_bits(self.INT_ENABLE, self.INT_DATA_RDY)
+
+    def start_sampling(self, int_pin, callback=None, sample_rate=100, filter_range=FILTER_BW_42, g=False):
+        """Sample once per data ready interrupt in a background thread.
+
+        int_pin -- GPIO pin number, or input fusion_hat.pin.Pin, wired to the MPU6050 INT pin.
+        A Pin passed in stays open after stop_sampling, only its event queue is stopped.
+        callback -- called from the thread with (timestamp_ns, accel, gyro, temp)
+        for every sample, timestamp_ns is the time of the interrupt edge.
+        sample_rate -- samples per second, see set_sample_rate.
+        filter_range -- low pass filter, see set_sample_rate.
+        g -- accel in g if True, otherwise in m/s^2.
+
+        The thread sleeps until the interrupt edge, then reads the sample
+        with one burst, so no sample is read twice. Pulses that queued up
+        behind a slow read or callback only leave the newest sample and are
+        counted in missed_samples. Returns the actual sample rate.
+        """
+        if self._sampler is not None:
+            raise RuntimeError("MPU6050 sampling already started")
+        self._own_int_pin = not isinstance(int_pin, Pin)
+        if self._own_int_pin:
+            int_pin = Pin(int_pin, mode=Pin.IN, pull=Pin.PULL_DOWN)
+        self._int_pin = int_pin
+        self._int_pin.start_events(Pin.IRQ_RISING, maxlen=64)
+        rate = self.set_sample_rate(sample_rate, filter_range)
+        self.enable_data_ready()
+        self.missed_samples = 0
+        self._sampling = True
+        self._sampler = threading.Thread(target=self._sample_loop, args=(callback, g),
+                                         name="mpu6050-sampler", daemon=True)
+        self._sampler.start()
+        return rate
+
+    def _sample_loop(self, callback, g):
+        scale_gyro = self._get_gyro_scale
+        while self._sampling:
+            events = self._int_pin.read_events(timeout=0.1)
+            if not events:
+                continue
+            self.missed_samples += len(events) - 1
+            ax, ay, az, raw_temp, gx, gy, gz = self.read_raw_data()
+            accel = self._scale_accel(ax, ay, az, g)
+            scale = scale_gyro()
+            gyro = [gx / scale, gy / scale, gz / scale]
+            temp = (raw_temp / 340.0) + 36.53
+            timestamp_ns = events[-1].timestamp_ns
+            with self._sample_cond:
+                self._sample = (timestamp_ns, accel, gyro, temp)
+                self._sample_cond.notify_all()
+            if callback is not None:
+                callback(timestamp_ns, accel, gyro, temp)
+
+    def wait_sample(self, timeout=None):
+        """Wait for the next sample of the sampling thread.
+
+        Returns (timestamp_ns, accel, gyro, temp), or None on timeout.
+        """
+        with self._sample_cond:
+            last = self._sample
+            if not self._sample_cond.wait_for(lambda: self._sample is not last, timeout):
+                return None
+            return self._sample
+
+    def stop_sampling(self):
+        """Stop the sampling thread and the data ready interrupt."""
+        if self._sampler is None:
+            return
+        self._sampling = False
+        self._sampler.join()
+        self._sampler = None
+        self.disable_data_ready()
+        self._int_pin.stop_events()
+        if self._own_int_pin:
+            self._int_pin.close()
+        self._int_pin = None
+
     def enable_bypass(self):
         """
         Enable MPU6050 bypass mode
@@ -279,11 +561,11 @@ class MPU6050():
         self.bus.write_byte_data(self.address, self.REG_USER_CTRL, 0x00)
         time.sleep(0.002)  
         # open I2C bypass mode, connect SDA/SCL to auxiliary I2C device
-        self.bus.write_byte_data(self.address, self.REG_INT_PIN_CFG, 0x02)
+        self.regs.write(self.REG_INT_PIN_CFG, 0x02)
         time.sleep(0.002) 
         
-        uc = self.bus.read_byte_data(self.address, self.REG_USER_CTRL)
-        ic = self.bus.read_byte_data(self.address, self.REG_INT_PIN_CFG)
+        uc = self.regs.read(self.REG_USER_CTRL, cached=False)
+        ic = self.regs.read(self.REG_INT_PIN_CFG, cached=False)
         print(f"Bypass enabled: USER_CTRL=0x{uc:02X}, INT_PIN_CFG=0x{ic:02X}")
         
         return [uc,ic]
@@ -1,5 +1,6 @@
 import spidev as SPI
 import time
+from .._register_map import RegisterMap
 
 class RC522():
     PCD_IDLE = 0x00               
@@ -91,10 +92,18 @@ class RC522():
     RFU3E = 0x3E   
     RFU3F = 0x3F      
 
+    # Configuration registers only changed by the driver, safe to shadow.
+    # Command, IRQ, FIFO, status and control registers change by themselves.
+    SHADOWED_REGISTERS = (ComIEnReg, DivlEnReg, ModeReg, TxModeReg, RxModeReg,
+                          TxControlReg, TxAutoReg, TxSelReg, RxSelReg, RxThresholdReg,
+                          DemodReg, RFCfgReg, TModeReg, TPrescalerReg, TReloadRegH, TReloadRegL)
+
     def __init__(self):
         self.spi = SPI.SpiDev()
         self.spi.open(0, 0)
         self.spi.max_speed_hz= 15600000
+        # MFRC522 can't write different registers in one SPI frame, so no block writes
+        self.regs = RegisterMap(self._read_reg, self._write_reg, shadowed=self.SHADOWED_REGISTERS)
         self.key = [0xff,0xff,0xff,0xff,0xff,0xff]
         self.ct = [0x0]*2
         self.sn = [0x0]*4
@@ -106,24 +115,40 @@ class RC522():
         self.PcdAntennaOn()
         self.M500PcdConfigISOType( 'A' )
 
-    def WriteRawRC(self, reg, Value):
+    def _write_reg(self, reg, Value):
         addr = (reg<<1) & 0x7e
         li = [addr, Value]
         self.spi.xfer2(li)
 
-    def ReadRawRC(self, reg):
+    def _read_reg(self, reg):
         addr = ((reg<<1) & 0xfe) | 0x80
         li = [addr, 0xFF]
         value = self.spi.xfer2(li)
         return value[1]
 
+    def WriteRawRC(self, reg, Value):
+        self.regs.write(reg, Value)
+
+    def ReadRawRC(self, reg):
+        # Shadowed configuration registers are served without SPI traffic
+        return self.regs.read(reg)
+
+    def WriteFIFO(self, data):
+        # All data bytes after one address byte go to the same register
+        if len(data) == 0:
+            return
+        self.spi.xfer2([(self.FIFODataReg<<1) & 0x7e] + list(data))
+
+    def ReadFIFO(self, n):
+        # Repeat the address byte to read n bytes in one frame
+        addr = ((self.FIFODataReg<<1) & 0xfe) | 0x80
+        return self.spi.xfer2([addr]*n + [0])[1:]
+
     def SetBitMask(self, reg, data):
-        tmp = self.ReadRawRC(reg)					
-        self.WriteRawRC(reg, tmp | data)
+        self.regs.set_bits(reg, data)
 
     def ClearBitMask(self, reg, data):
-        tmp = self.ReadRawRC(reg)					
-        self.WriteRawRC(reg, tmp & ~data)
+        self.regs.clear_bits(reg, data)
 
     def PcdAntennaOn(self):
         i = self.ReadRawRC(self.TxControlReg)
@@ -136,24 +161,30 @@ class RC522():
     def PcdReset(self):
         self.WriteRawRC(self.CommandReg, self.PCD_RESETPHASE)
         self.WriteRawRC(self.CommandReg, self.PCD_RESETPHASE)
+        # Soft reset restores every register to its reset value
+        self.regs.invalidate()
         # time.sleep(0.01)
-        self.WriteRawRC(self.ModeReg, 0x3D)
-        self.WriteRawRC(self.TReloadRegL, 30) 
-        self.WriteRawRC(self.TReloadRegH, 0)
-        self.WriteRawRC(self.TModeReg, 0x8D)
-        self.WriteRawRC(self.TPrescalerReg, 0x3E)
-        self.WriteRawRC(self.TxAutoReg, 0x40)
+        self.regs.write_many({
+            self.ModeReg: 0x3D,
+            self.TModeReg: 0x8D,
+            self.TPrescalerReg: 0x3E,
+            self.TReloadRegH: 0,
+            self.TReloadRegL: 30,
+            self.TxAutoReg: 0x40,
+        })
 
     def M500PcdConfigISOType(self, ty):
         if ty == 'A':
             self.ClearBitMask(self.Status2Reg, 0x08)
-            self.WriteRawRC(self.ModeReg, 0x3D)
-            self.WriteRawRC(self.RxSelReg, 0x86)
-            self.WriteRawRC(self.RFCfgReg, 0x7F) 
-            self.WriteRawRC(self.TReloadRegL, 30) 
-            self.WriteRawRC(self.TReloadRegH, 0)
-            self.WriteRawRC(self.TModeReg, 0x8D)
-            self.WriteRawRC(self.TPrescalerReg, 0x3E)
+            self.regs.write_many({
+                self.ModeReg: 0x3D,
+                self.RxSelReg: 0x86,
+                self.RFCfgReg: 0x7F,
+                self.TModeReg: 0x8D,
+                self.TPrescalerReg: 0x3E,
+                self.TReloadRegH: 0,
+                self.TReloadRegL: 30,
+            })
             time.sleep(1)
             self.PcdAntennaOn()
         else:
@@ -164,8 +195,7 @@ class RC522():
         self.ClearBitMask(self.DivIrqReg, 0x04)  
         self.WriteRawRC(self.CommandReg, self.PCD_IDLE)
         self.SetBitMask(self.FIFOLevelReg, 0x80)
-        for i in range(len(data)):
-            self.WriteRawRC(self.FIFODataReg, data[i])
+        self.WriteFIFO(data)
         self.WriteRawRC(self.CommandReg, self.PCD_CALCCRC)
         j = 0xff
         n = 0
@@ -199,8 +229,7 @@ class RC522():
         self.ClearBitMask(self.ComIrqReg, 0x80)		
         self.WriteRawRC(self.CommandReg, self.PCD_IDLE)	
         self.SetBitMask(self.FIFOLevelReg, 0x80)
-        for i in range(len(data)):
-            self.WriteRawRC(self.FIFODataReg, data[i])
+        self.WriteFIFO(data)
         self.WriteRawRC(self.CommandReg, com)
         if com == self.PCD_TRANSCEIVE:
             self.SetBitMask(self.BitFramingReg, 0x80)
@@ -236,10 +265,7 @@ class RC522():
                         n = 1
                     if n > 18:
                         n = 18
-                    data = []
-                    for i in range(n):
-                        data.append(self.ReadRawRC(self.FIFODataReg))
-                        # print(data[i])
+                    data = self.ReadFIFO(n)
             else:
                 status = 2
         self.SetBitMask(self.ControlReg, 0x80)
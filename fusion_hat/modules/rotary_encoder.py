@@ -1,21 +1,61 @@
+import time
 from ..pin import Pin
+from .._irq import IRQDispatcher
+
+# Quadrature transitions indexed by previous state << 2 | new state, state is A << 1 | B.
+# A leading B (00 -> 10 -> 11 -> 01) counts +1, None is both channels changing at once
+_TRANSITIONS = (
+    0, -1, +1, None,
+    +1, 0, None, -1,
+    -1, None, 0, +1,
+    None, +1, -1, 0,
+)
 
 class Rotary_Encoder:
-    def __init__(self, clk, dt, *, bounce_time=0.002, reverse=False):
+    def __init__(self, clk, dt, *, bounce_time=0.0, reverse=False, smoothing=0.3, steps_per_detent=2):
         """
         Initialize a rotary encoder using fusion_hat.Pin
 
+        Both channels are decoded on every edge (4x quadrature) with a
+        state transition table, so contact bounce cancels itself out and
+        needs no debounce time. Velocity and acceleration are estimated
+        from the edge timestamps.
+
+        The decoder relies on the direction of each edge and on edges of
+        both channels arriving in time order, which the gpiod backend
+        guarantees. RPi.GPIO reports no edge direction, it is read from the
+        pin level in the callback, so on fast rotation edges can be
+        misread and counted in errors: use the gpiod backend for those.
+
+        The decoder sees 4 transitions per quadrature cycle. steps() reports
+        them divided by steps_per_detent, 2 by default, which keeps the scale
+        of the previous decoder that counted only channel A edges.
+
         :param clk: GPIO pin number for channel A (CLK)
         :param dt:  GPIO pin number for channel B (DT)
-        :param bounce_time: Debounce time (seconds) for internal interrupt filtering
+        :param bounce_time: Debounce time (seconds) for internal interrupt filtering, best left 0
         :param reverse: True to reverse the counting direction
+        :param smoothing: Weight of the newest edge in the velocity estimate, 0-1
+        :param steps_per_detent: Transitions counted as one step, 1 for the raw 4x count
         """
+        # Private dispatcher, so other pins' callbacks can't delay or drop encoder edges
+        self._dispatcher = IRQDispatcher(workers=1)
         # Must use keyword arguments for mode and pull, otherwise setup() won't be called
-        self.pin_a = Pin(clk, mode=Pin.IN, pull=Pin.PULL_UP, bounce_time=bounce_time)
-        self.pin_b = Pin(dt,  mode=Pin.IN, pull=Pin.PULL_UP, bounce_time=bounce_time)
+        self.pin_a = Pin(clk, mode=Pin.IN, pull=Pin.PULL_UP, bounce_time=bounce_time, dispatcher=self._dispatcher)
+        self.pin_b = Pin(dt,  mode=Pin.IN, pull=Pin.PULL_UP, bounce_time=bounce_time, dispatcher=self._dispatcher)
 
         self.position = 0
         self.reverse = -1 if reverse else 1
+        self.steps_per_detent = steps_per_detent
+        self._count = 0
+        self.smoothing = smoothing
+        self.errors = 0
+        """Transitions where both channels changed at once, i.e. missed edges"""
+
+        self._state = self.pin_a.value() << 1 | self.pin_b.value()
+        self._last_ns = None
+        # (velocity, acceleration, last edge time), replaced as a whole so readers need no lock
+        self._motion = (0.0, 0.0, None)
 
         # External callback: triggered whenever a valid rotation occurs
         # Compatible with two signatures:
@@ -23,41 +63,64 @@ class Rotary_Encoder:
         #   when_rotated(direction, position)
         self.when_rotated = None
 
-        # Bind both rising and falling edges on channel A
-        self.pin_a.when_activated = self._a_rising
-        self.pin_a.when_deactivated = self._a_falling
+        # Bind both rising and falling edges on both channels. One dispatcher key for
+        # both, so their edges are decoded in one sequence, in the order they happened
+        self.pin_a._set_irq(self._a_edge, Pin.IRQ_RISING_FALLING, key=self)
+        self.pin_b._set_irq(self._b_edge, Pin.IRQ_RISING_FALLING, key=self)
 
     # --- Edge handlers ---
 
-    def _a_rising(self):
+    def _a_edge(self, event):
+        """
+        Called on each edge of channel A, with its EdgeEvent.
+        """
+        level = 2 if event.edge == Pin.IRQ_RISING.value else 0
+        self._decode(self._state & 0b01 | level, event.timestamp_ns)
+
+    def _b_edge(self, event):
+        """
+        Called on each edge of channel B, with its EdgeEvent.
+        """
+        level = 1 if event.edge == Pin.IRQ_RISING.value else 0
+        self._decode(self._state & 0b10 | level, event.timestamp_ns)
+
+    def _decode(self, state, timestamp_ns):
         """
-        Called on rising edge of channel A.
-        Read channel B to determine rotation direction.
-        Typical rule:
-            A↑ with B=0 -> CW (+1)
-            A↑ with B=1 -> CCW (-1)
+        Look up the transition to the new state and apply it.
         """
-        direction = +1 if self.pin_b.value() == 0 else -1
-        self._apply(direction)
+        direction = _TRANSITIONS[self._state << 2 | state]
+        self._state = state
+        if direction is None:
+            self.errors += 1
+        elif direction:
+            self._update_motion(direction * self.reverse, timestamp_ns)
+            self._apply(direction)
 
-    def _a_falling(self):
+    def _update_motion(self, direction, timestamp_ns):
         """
-        Called on falling edge of channel A.
-        Read channel B to determine rotation direction.
-        Typical rule:
-            A↓ with B=1 -> CW (+1)
-            A↓ with B=0 -> CCW (-1)
+        Update the velocity and acceleration estimates with one transition.
         """
-        direction = +1 if self.pin_b.value() == 1 else -1
-        self._apply(direction)
+        last_ns, self._last_ns = self._last_ns, timestamp_ns
+        if last_ns is None or timestamp_ns <= last_ns:
+            self._motion = (0.0, 0.0, timestamp_ns)
+            return
+        dt = (timestamp_ns - last_ns) / 1e9
+        velocity, acceleration, _ = self._motion
+        new_velocity = velocity + self.smoothing * (direction / dt - velocity)
+        new_acceleration = acceleration + self.smoothing * ((new_velocity - velocity) / dt - acceleration)
+        self._motion = (new_velocity, new_acceleration, timestamp_ns)
 
     def _apply(self, direction: int):
         """
-        Apply one step of rotation, considering direction and reverse flag.
-        Then invoke the external callback if set.
+        Apply one transition of rotation, considering direction and reverse flag.
+        Then invoke the external callback if set and the step count changed.
         """
         direction *= self.reverse
-        self.position += direction
+        self._count += direction
+        position = self._count // self.steps_per_detent
+        if position == self.position:
+            return
+        self.position = position
 
         if self.when_rotated:
             try:
@@ -71,25 +134,44 @@ class Rotary_Encoder:
 
     def steps(self):
         """
-        Return the current step count.
+        Return the current step count, 4 / steps_per_detent steps per quadrature cycle.
         """
         return self.position
 
+    def velocity(self):
+        """
+        Return the estimated velocity in steps per second.
+
+        Once the encoder stops, the estimate decays with the time since the
+        last edge instead of holding the last speed.
+        """
+        velocity, _, last_ns = self._motion
+        if last_ns is None or velocity == 0:
+            return 0.0
+        # Not moving faster than one transition since the last edge
+        bound = 1e9 / max(1, time.monotonic_ns() - last_ns)
+        if abs(velocity) > bound:
+            velocity = bound if velocity > 0 else -bound
+        return velocity / self.steps_per_detent
+
+    def acceleration(self):
+        """
+        Return the estimated acceleration in steps per second squared.
+        """
+        return self._motion[1] / self.steps_per_detent
+
     def reset(self):
         """
         Reset the encoder position to zero.
         """
         self.position = 0
+        self._count = 0
+        self.errors = 0
 
     def close(self):
         """
         Release interrupts and clean up GPIO resources.
         """
-        try:
-            self.pin_a.when_activated = None
-            self.pin_a.when_deactivated = None
-        except Exception:
-            pass
         try:
             self.pin_a.close()
         except Exception:
@@ -98,3 +180,4 @@ class Rotary_Encoder:
             self.pin_b.close()
         except Exception:
             pass
+        self._dispatcher.stop()
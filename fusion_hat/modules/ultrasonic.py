@@ -1,7 +1,136 @@
 import time
+import math
+import bisect
+from collections import deque
 from ..pin import Pin
 import threading
 
+class DistanceFilter():
+    """
+    Online filter for a stream of ultrasonic distances.
+
+    Each reading goes through three stages, in constant time and memory:
+
+    1. Median of the last ``window`` valid readings, drops single spurious echoes.
+    2. Gate, a median further from the estimate than the target could have
+       moved at ``max_speed`` is rejected. After ``max_rejects`` rejections
+       in a row the filter restarts from the median, the target really moved.
+    3. 1-D Kalman filter on the accepted medians.
+
+    Args:
+        window (int, optional): Median window size. Default is 5.
+        max_speed (float, optional): Fastest relative speed of a target in meters per second. Default is 2.0.
+        gate_margin (float, optional): Distance in centimeters always allowed on top of the
+            speed limit, covers sensor noise. Default is 5.0.
+        process_noise (float, optional): Kalman process noise in cm^2 per second. Default is 100.0.
+        measurement_noise (float, optional): Kalman measurement noise in cm^2. Default is 4.0.
+        max_rejects (int, optional): Rejections in a row before restarting. Default is 5.
+
+    Example:
+
+        >>> from fusion_hat.modules.ultrasonic import Ultrasonic, DistanceFilter
+        >>> us = Ultrasonic(Pin(17), Pin(4), distance_filter=DistanceFilter())
+        >>> us.start_thread()
+        >>> us.read_filtered()
+        (32.41, 0.93)
+    """
+    def __init__(self, window=5, max_speed=2.0, gate_margin=5.0,
+                 process_noise=100.0, measurement_noise=4.0, max_rejects=5):
+        self.window = window
+        self.max_speed = max_speed
+        self.gate_margin = gate_margin
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.max_rejects = max_rejects
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all readings.
+        """
+        self._recent = deque(maxlen=self.window)
+        self._sorted = []
+        self._rejects = 0
+        self._estimate = None
+        self._variance = 0.0
+        self._timestamp = None
+        self._predicted = None
+        self.value = -1
+        """Smoothed distance in centimeters, -1 before the first valid reading."""
+        self.confidence = 0.0
+        """Confidence of value from 0 to 1, drops with rejected or failed readings."""
+        self.accepted = 0
+        """Readings accepted by the gate."""
+        self.rejected = 0
+        """Readings rejected by the gate or failed."""
+
+    def _median(self, distance):
+        if len(self._recent) == self._recent.maxlen:
+            del self._sorted[bisect.bisect_left(self._sorted, self._recent[0])]
+        self._recent.append(distance)
+        bisect.insort(self._sorted, distance)
+        return self._sorted[len(self._sorted) // 2]
+
+    def update(self, distance, timestamp=None):
+        """
+        Add a reading.
+
+        Args:
+            distance (float): Distance in centimeters, a value <= 0 counts as a failed reading.
+            timestamp (float, optional): time.monotonic() of the reading. Default is now.
+
+        Returns:
+            tuple: (value, confidence)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            dt = 0.0 if self._timestamp is None else max(0.0, timestamp - self._timestamp)
+            if self._estimate is not None and timestamp > self._predicted:
+                # Predict, the target may have moved since the last prediction.
+                # Failed readings predict too, so the next one only adds its own interval
+                self._variance += self.process_noise * (timestamp - self._predicted)
+                self._predicted = timestamp
+
+            if distance <= 0:
+                self._reject()
+            else:
+                self._timestamp = timestamp
+                median = self._median(distance)
+                if self._estimate is None or self._rejects >= self.max_rejects:
+                    self._estimate = median
+                    self._variance = self.measurement_noise
+                    self._predicted = timestamp
+                    self._accept()
+                elif abs(median - self._estimate) > self.gate_margin + self.max_speed * 100 * dt:
+                    self._reject()
+                else:
+                    gain = self._variance / (self._variance + self.measurement_noise)
+                    self._estimate += gain * (median - self._estimate)
+                    self._variance *= 1 - gain
+                    self._accept()
+            if self._estimate is not None:
+                self.value = round(self._estimate, 2)
+            self._update_confidence()
+            return self.value, self.confidence
+
+    def _accept(self):
+        self.accepted += 1
+        self._rejects = 0
+
+    def _reject(self):
+        self.rejected += 1
+        self._rejects += 1
+
+    def _update_confidence(self):
+        if self._estimate is None:
+            self.confidence = 0.0
+            return
+        # Falls with the estimate's spread and with each rejection in a row
+        spread = self.measurement_noise / (self.measurement_noise + self._variance)
+        self.confidence = round(math.sqrt(spread) * (1 - self._rejects / (self.max_rejects + 1)), 2)
+
 class Ultrasonic():
     """
     Ultrasonic sensor module.
@@ -10,14 +139,25 @@ class Ultrasonic():
         trig (Pin): Trigger pin object.
         echo (Pin): Echo pin object.
         timeout (float, optional): Timeout duration in seconds. Default is 0.02.
+        mode (str, optional): Echo timing mode, Ultrasonic.POLL or Ultrasonic.EDGE.
+            Default is Ultrasonic.POLL.
+        distance_filter (DistanceFilter, optional): Filter for :meth:`read_filtered`.
+            Default is None, a DistanceFilter with default settings.
 
     Raises:
         TypeError: If trig or echo is not a Pin object.
+        ValueError: If mode is not POLL or EDGE.
     """
     SOUND_SPEED = 343.3 # ms
     """Sound speed in meters per second."""
 
-    def __init__(self, trig, echo, timeout=0.02):
+    POLL = "poll"
+    """Time the echo by polling the echo pin, keeps a CPU core busy while waiting."""
+    EDGE = "edge"
+    """Time the echo from its edge timestamps, sleeps while waiting. On the
+    gpiod backend the timestamps are taken by the kernel."""
+
+    def __init__(self, trig, echo, timeout=0.02, mode=POLL, distance_filter=None):
         """
         Initialize Ultrasonic sensor module.
 
@@ -27,18 +167,28 @@ class Ultrasonic():
         :type echo: fusion_hat.Pin
         :param timeout: Timeout duration in seconds. Default is 0.02.
         :type timeout: float
+        :param mode: Echo timing mode, Ultrasonic.POLL or Ultrasonic.EDGE. Default is Ultrasonic.POLL.
+        :type mode: str
+        :param distance_filter: Filter for read_filtered. Default is None, a DistanceFilter with default settings.
+        :type distance_filter: DistanceFilter
         """
         if not isinstance(trig, Pin):
             raise TypeError("trig must be fusion_hat.Pin object")
         if not isinstance(echo, Pin):
             raise TypeError("echo must be fusion_hat.Pin object")
+        if mode not in (self.POLL, self.EDGE):
+            raise ValueError(f"mode must be Ultrasonic.POLL or Ultrasonic.EDGE, not {mode!r}")
 
         self.timeout = timeout
+        self.mode = mode
+        self.filter = distance_filter if distance_filter is not None else DistanceFilter()
 
         trig.close()
         echo.close()
         self.trig = Pin(trig._pin_num)
         self.echo = Pin(echo._pin_num, mode=Pin.IN, pull=Pin.PULL_DOWN)
+        if mode == self.EDGE:
+            self.echo.start_events(Pin.IRQ_RISING_FALLING, maxlen=16)
 
         self.thread_read_interval = 0.02
         self.thread = None
@@ -53,12 +203,39 @@ class Ultrasonic():
             float: Distance in centimeters. Returns -1 if timeout occurs,
                 -2 if pulse start or end is 0, or any other error.
         """
+        if self.mode == self.EDGE:
+            return self._read_edge()
+        return self._read_poll()
+
+    def _pulse(self):
         self.trig.off()
         time.sleep(0.001)
         self.trig.on()
         time.sleep(0.00001)
         self.trig.off()
 
+    def _read_edge(self):
+        self.echo.clear_events()
+        self._pulse()
+        return self._echo_distance(time.monotonic() + self.timeout)
+
+    def _echo_distance(self, deadline):
+        rising = Pin.IRQ_RISING.value
+        pulse_start = None
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return -1
+            for event in self.echo.read_events(timeout=remaining):
+                if event.edge == rising:
+                    pulse_start = event.timestamp_ns
+                elif pulse_start is not None:
+                    during = (event.timestamp_ns - pulse_start) / 1e9
+                    return round(during * self.SOUND_SPEED / 2 * 100, 2)
+
+    def _read_poll(self):
+        self._pulse()
+
         pulse_end = 0
         pulse_start = 0
         timeout_start = time.time()
@@ -107,12 +284,27 @@ class Ultrasonic():
         else:
             return self.read_with_retry()
 
+    def read_filtered(self):
+        """
+        Read filtered distance value, see :class:`DistanceFilter`.
+
+        Returns:
+            tuple: (distance, confidence), distance in centimeters or -1 before
+                the first valid reading, confidence from 0 to 1. If the thread is
+                running, returns the filter's latest output, otherwise takes a reading.
+        """
+        if self.thread is not None and self.thread_started:
+            return self.filter.value, self.filter.confidence
+        else:
+            return self.filter.update(self.read_with_retry())
+
     def thread_read_loop(self):
         """
         Thread loop for reading distance value periodically.
         """
         while self.thread_started:
             self.thread_value = self.read_with_retry()
+            self.filter.update(self.thread_value)
             time.sleep(self.thread_read_interval)
 
     def start_thread(self, interval=0.01):
@@ -136,3 +328,192 @@ class Ultrasonic():
         if self.thread is not None:
             self.thread.join()
             self.thread = None
+
+    def close(self):
+        """
+        Stop the thread and release the pins.
+        """
+        self.stop_thread()
+        if self.mode == self.EDGE:
+            self.echo.stop_events()
+        self.trig.close()
+        self.echo.close()
+
+
+class UltrasonicArray():
+    """
+    Several ultrasonic sensors measured from one thread.
+
+    Sensors next to each other hear each other's pings, so the array fires
+    them in groups, one group at a time, with a guard interval after each
+    group for the echoes to die out. Each group's sensors are fired
+    together and timed from their echo edges (Ultrasonic.EDGE), so the
+    thread sleeps while waiting. Every scan publishes a timestamped
+    distance vector.
+
+    - UltrasonicArray.ROUND_ROBIN: one sensor per group.
+    - UltrasonicArray.INTERLEAVED: sensor i is fired with sensor i + n/2, for
+      sensors spread evenly around a chassis these face away from each other.
+
+    Args:
+        pairs (list): (trig, echo) Pin pairs, one per sensor.
+        schedule (str or list, optional): UltrasonicArray.ROUND_ROBIN, UltrasonicArray.INTERLEAVED,
+            or a list of groups of sensor indexes. Default is UltrasonicArray.ROUND_ROBIN.
+        guard (float, optional): Seconds to wait after each group. Default is 0.01.
+        timeout (float, optional): Echo timeout in seconds. Default is 0.02.
+
+    Example:
+
+        >>> from fusion_hat.modules.ultrasonic import UltrasonicArray
+        >>> array = UltrasonicArray([(Pin(17), Pin(4)), (Pin(27), Pin(22)),
+        ...                          (Pin(5), Pin(6)), (Pin(13), Pin(19))],
+        ...                         schedule=UltrasonicArray.INTERLEAVED)
+        >>> array.start_thread()
+        >>> array.wait_scan()
+        (1234.5678, [32.15, 120.4, -1, 18.02])
+    """
+    ROUND_ROBIN = "round_robin"
+    """Fire one sensor at a time."""
+    INTERLEAVED = "interleaved"
+    """Fire opposite sensors together."""
+
+    def __init__(self, pairs, schedule=ROUND_ROBIN, guard=0.01, timeout=0.02):
+        self.sensors = [Ultrasonic(trig, echo, timeout=timeout, mode=Ultrasonic.EDGE) for trig, echo in pairs]
+        self.timeout = timeout
+        self.guard = guard
+        self.groups = self._make_groups(schedule, len(self.sensors))
+
+        self.distances = [-1] * len(self.sensors)
+        """Last distance of each sensor in centimeters, -1 if it timed out."""
+        self.timestamp = None
+        """time.monotonic() of the end of the last scan."""
+        self.callback = None
+        """Called with (timestamp, distances) after each scan from the thread."""
+
+        self.thread = None
+        self.thread_started = False
+        self.thread_read_interval = 0
+        self._cond = threading.Condition()
+        self._scans = 0
+
+    @classmethod
+    def _make_groups(cls, schedule, n):
+        if schedule == cls.ROUND_ROBIN:
+            return [[i] for i in range(n)]
+        if schedule == cls.INTERLEAVED:
+            half = (n + 1) // 2
+            return [[i, i + half] if i + half < n else [i] for i in range(half)]
+        if isinstance(schedule, str):
+            raise ValueError(f"Unknown schedule {schedule!r}")
+        groups = [list(group) for group in schedule]
+        indexes = sorted(i for group in groups for i in group)
+        if indexes != list(range(n)):
+            raise ValueError(f"schedule must use every sensor index 0-{n - 1} once, got {groups}")
+        return groups
+
+    def _read_group(self, group):
+        sensors = [self.sensors[i] for i in group]
+        for sensor in sensors:
+            sensor.echo.clear_events()
+            sensor.trig.off()
+        time.sleep(0.001)
+        for sensor in sensors:
+            sensor.trig.on()
+            time.sleep(0.00001)
+            sensor.trig.off()
+        deadline = time.monotonic() + self.timeout
+        return [sensor._echo_distance(deadline) for sensor in sensors]
+
+    def scan(self):
+        """
+        Measure every sensor once, following the schedule.
+
+        Returns:
+            tuple: (timestamp, distances), time.monotonic() at the end of the
+                scan and the distance of each sensor in centimeters, -1 if it timed out.
+        """
+        distances = [-1] * len(self.sensors)
+        for group in self.groups:
+            for i, value in zip(group, self._read_group(group)):
+                distances[i] = value
+            time.sleep(self.guard)
+        timestamp = time.monotonic()
+        with self._cond:
+            self.distances = distances
+            self.timestamp = timestamp
+            self._scans += 1
+            self._cond.notify_all()
+        return timestamp, list(distances)
+
+    def read(self):
+        """
+        Read the distance vector.
+
+        Returns:
+            tuple: (timestamp, distances) of the last scan if the thread is
+                running, otherwise of a new scan.
+        """
+        if self.thread is not None and self.thread_started:
+            with self._cond:
+                return self.timestamp, list(self.distances)
+        return self.scan()
+
+    def wait_scan(self, timeout=None):
+        """
+        Wait for the thread to finish its next scan.
+
+        Args:
+            timeout (float, optional): Seconds to wait, None to wait forever. Default is None.
+
+        Returns:
+            tuple: (timestamp, distances), or None on timeout.
+        """
+        with self._cond:
+            scans = self._scans
+            if not self._cond.wait_for(lambda: self._scans != scans, timeout):
+                return None
+            return self.timestamp, list(self.distances)
+
+    def thread_read_loop(self):
+        """
+        Thread loop scanning the sensors.
+        """
+        while self.thread_started:
+            start = time.monotonic()
+            timestamp, distances = self.scan()
+            if self.callback is not None:
+                self.callback(timestamp, distances)
+            rest = self.thread_read_interval - (time.monotonic() - start)
+            if rest > 0:
+                time.sleep(rest)
+
+    def start_thread(self, interval=0):
+        """
+        Start the thread scanning the sensors.
+
+        Args:
+            interval (float, optional): Shortest time between scan starts in seconds,
+                0 to scan back to back. Default is 0.
+        """
+        if self.thread is None:
+            self.thread_started = True
+            self.thread_read_interval = interval
+            self.thread = threading.Thread(target=self.thread_read_loop, daemon=True)
+            self.thread.start()
+
+    def stop_thread(self):
+        """
+        Stop the thread scanning the sensors.
+        """
+        self.thread_started = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def close(self):
+        """
+        Stop the thread and release the pins.
+        """
+        self.stop_thread()
+        for sensor in self.sensors:
+            sensor.close()
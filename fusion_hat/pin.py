@@ -65,29 +65,66 @@ Example:
     pressed
     release
 
+    Use the GPIO character device instead of RPi.GPIO, see :mod:`fusion_hat._gpio`
+
+    >>> pin = Pin(17, mode=Pin.OUT, backend="gpiod")
+
+    Read or write several pins at once as a bitmask, bit 0 is the first pin
+
+    >>> from fusion_hat.pin import PinGroup
+    >>> port = PinGroup([17, 27, 22, 5], mode=Pin.OUT)
+    >>> port.value(0b0101) # 17 and 22 high, 27 and 5 low
+    5
+    >>> buttons = PinGroup([6, 13], mode=Pin.IN, pull=Pin.PULL_UP, active_state=Pin.ACTIVE_LOW)
+    >>> buttons.value() # button on 13 pressed
+    2
+
+    Capture timestamped edges, e.g. to measure a pulse width. On the gpiod
+    backend timestamps are taken by the kernel, RPi.GPIO falls back to
+    time.monotonic_ns() in its callback thread.
+
+    >>> echo = Pin(24, mode=Pin.IN)
+    >>> echo.start_events(Pin.IRQ_RISING_FALLING)
+    >>> rise, fall = echo.read_events(max_events=2, timeout=0.1)
+    >>> (fall.timestamp_ns - rise.timestamp_ns) / 1000 # microseconds
+    583.2
+    >>> echo.stop_events()
+
+    Debounce a button on its edge timestamps, see :mod:`fusion_hat._debounce`
+
+    >>> from fusion_hat._debounce import StateMachineFilter
+    >>> button.set_filter(StateMachineFilter(0.005))
+
 """
-from RPi import GPIO
-from typing import Callable
+import time
+import threading
+import functools
+from collections import deque
+from typing import Callable, Hashable
 from enum import Enum
 
 from ._base import _Base
+from . import _gpio
+from ._gpio import GPIOBackend, EdgeEvent, get_backend
+from ._irq import IRQDispatcher, get_dispatcher
+from ._debounce import EdgeFilter, get_timer
 
 class Mode(Enum):
     """ Pin direction """
     AUTO = None
     """Pin direction auto"""
-    IN = GPIO.IN
+    IN = _gpio.IN
     """Pin direction input"""
-    OUT = GPIO.OUT
+    OUT = _gpio.OUT
     """Pin direction output"""
 
 class Pull(Enum):
     """ Pin pull up/down """
-    UP = GPIO.PUD_UP
+    UP = _gpio.PUD_UP
     """Pin internal pull up"""
-    DOWN = GPIO.PUD_DOWN
+    DOWN = _gpio.PUD_DOWN
     """Pin internal pull down"""
-    NONE = GPIO.PUD_OFF
+    NONE = _gpio.PUD_OFF
     """Pin internal pull none"""
 
 class Active(Enum):
@@ -99,17 +136,18 @@ class Active(Enum):
 
 class Trigger(Enum):
     """ Pin interrupt """
-    FALLING = GPIO.FALLING
+    FALLING = _gpio.FALLING
     """Pin interrupt falling"""
-    RISING = GPIO.RISING
+    RISING = _gpio.RISING
     """Pin interrupt rising"""
-    BOTH = GPIO.BOTH
+    BOTH = _gpio.BOTH
     """Pin interrupt both rising and falling"""
 
 class Pin(_Base):
     """ Pin manipulation class
     
-    a pin wraping class of RPi.GPIO. you need to install rpi.lgpio instead of RPi.GPIO on Pi 5
+    a pin wraping class of a GPIO backend, RPi.GPIO or the GPIO character device(gpiod).
+    you need to install rpi.lgpio instead of RPi.GPIO on Pi 5, or use the gpiod backend
 
     Args:
         pin (int): pin number of Raspberry Pi
@@ -119,6 +157,10 @@ class Pin(_Base):
                         If True, when the hardware pin state is HIGH, the software pin is HIGH. 
                         If False, the input polarity is reversed. Defaults to Active.HIGH.
         bounce_time (float, optional): bounce time of pin interrupt in seconds. Defaults to 0.02.
+        backend (str, GPIOBackend, optional): GPIO backend, "rpi" or "gpiod". Defaults to None(default backend),
+                        see :func:`fusion_hat._gpio.get_backend`.
+        dispatcher (IRQDispatcher, optional): worker pool running the interrupt callbacks.
+                        Defaults to None(shared dispatcher), see :mod:`fusion_hat._irq`.
         *args: Additional arguments for :class:`fusion_hat._base._Base`
         **kwargs: Additional keyword arguments for :class:`fusion_hat._base._Base`
     """
@@ -156,14 +198,30 @@ class Pin(_Base):
             pull: Pull = Pull.NONE,
             active_state: Active = Active.HIGH,
             bounce_time: float = 0.02,
+            backend: [str, GPIOBackend] = None,
+            dispatcher: IRQDispatcher = None,
             **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
-        GPIO.setmode(GPIO.BCM)
+        self._backend = get_backend(backend)
+        self._dispatcher = dispatcher
         self._pin_num = pin
         self._value = 0
+        self._direction = None
         self._initialized = False
         self._irq_inited = False
+        self._irq_callback = None
+        self._irq_trigger = None
+        self._irq_coalesce = False
+        self._irq_key = self._pin_num
+        self._events = None
+        self._events_trigger = None
+        self._events_bounce_time = 0
+        self._events_cond = threading.Condition()
+        self._events_dropped = 0
+        self._edge_detect = None
+        self._filter = None
+        self._filter_deadline = None
         self._on_activated = None
         self._on_deactivated = None
         self.setup(mode, pull, active_state, bounce_time)
@@ -171,12 +229,18 @@ class Pin(_Base):
     def close(self) -> None:
         """ Close the pin """
         self.log.debug("Close pin %d", self._pin_num)
-        GPIO.cleanup(self._pin_num)
+        self._backend.cleanup(self._pin_num)
+        self._edge_detect = None
+        self._direction = None
+        self._bind_fast()
 
     def deinit(self) -> None:
         """Deinitialize the pin"""
         self.log.debug("Deinitialize pin %d", self._pin_num)
-        GPIO.cleanup(self._pin_num)
+        self._backend.cleanup(self._pin_num)
+        self._edge_detect = None
+        self._direction = None
+        self._bind_fast()
         
     def setup(self,
             mode: Mode = Mode.AUTO,
@@ -204,9 +268,31 @@ class Pin(_Base):
             self.deinit()
 
         if self._mode != Mode.AUTO:
-            GPIO.setup(self._pin_num, self._mode.value, pull_up_down=self._pull.value)
+            self._set_direction(self._mode)
         self._initialized = True
 
+    def _set_direction(self, direction: Mode, initial: int = None) -> None:
+        """ Configure the pin direction and rebind the fast paths """
+        self._backend.setup(self._pin_num, direction.value, self._pull.value, initial)
+        self._direction = direction
+        self._bind_fast()
+
+    def _bind_fast(self) -> None:
+        """ Bind fast_read/fast_write for the current direction, or fall back to raw() """
+        self.__dict__.pop("fast_read", None)
+        self.__dict__.pop("fast_write", None)
+        pin = self._pin_num
+        if self._direction == Mode.IN:
+            self.fast_read = functools.partial(self._backend.input, pin)
+        elif self._direction == Mode.OUT:
+            output = self._backend.output
+            def fast_write(value: [bool, int]) -> int:
+                value = 1 if value else 0
+                output(pin, value)
+                self._value = value
+                return value
+            self.fast_write = fast_write
+
     def __call__(self, value: [bool, int] = None) -> int:
         """ Set/get the pin value
 
@@ -232,23 +318,55 @@ class Pin(_Base):
         """
         if value == None:
             if self._mode == Mode.AUTO:
-                self.log.debug("Get pin %d raw value, mode is AUTO", self._pin_num)
-                GPIO.setup(self._pin_num, self.IN.value, pull_up_down=self._pull.value)
-                result = GPIO.input(self._pin_num)
+                if self._log_debug:
+                    self.log.debug("Get pin %d raw value, mode is AUTO", self._pin_num)
+                # Only reconfigure on an actual direction change
+                if self._direction != Mode.IN:
+                    self._set_direction(Mode.IN)
+                result = self._backend.input(self._pin_num)
             elif self._mode == Mode.IN:
-                result = GPIO.input(self._pin_num)
+                result = self._backend.input(self._pin_num)
             elif self._mode == Mode.OUT:
                 result = self._value
             return result
         else:
             if self._mode == Mode.IN:
                 raise ValueError("Input pin cannot set value")
-            elif self._mode == Mode.AUTO:
-                GPIO.setup(self._pin_num, self.OUT.value, pull_up_down=self._pull.value)
             self._value = 1 if bool(value) else 0
-            GPIO.output(self._pin_num, self._value)
+            if self._mode == Mode.AUTO and self._direction != Mode.OUT:
+                self._set_direction(Mode.OUT, self._value)
+            self._backend.output(self._pin_num, self._value)
             return self._value
 
+    def fast_read(self) -> int:
+        """ Read the raw pin level on a hot path, e.g. a polling loop
+
+        Same as :meth:`raw` without argument, but once the pin is an input
+        it is a direct backend call with no mode or active state branches.
+        Active state is not applied.
+
+        Returns:
+            int: pin level(0/1)
+        """
+        return self.raw()
+
+    def fast_write(self, value: [bool, int]) -> int:
+        """ Write the raw pin level on a hot path
+
+        Same as :meth:`raw` with a value, but once the pin is an output it
+        skips all mode and active state branches. Active state is not applied.
+
+        Args:
+            value (bool/int): pin level
+
+        Returns:
+            int: pin level(0/1)
+
+        Raises:
+            ValueError: if pin mode is IN
+        """
+        return self.raw(value)
+
     def value(self, value: [bool, int] = None) -> int:
         """ Set/get the pin value
 
@@ -305,17 +423,34 @@ class Pin(_Base):
         """
         return self.raw(0)
 
-    def irq(self, handler: Callable[[], None], trigger: Trigger = Trigger.BOTH) -> None:
+    def irq(self, handler: Callable[[int], None], trigger: Trigger = Trigger.BOTH, coalesce: bool = False) -> None:
         """ Set the pin interrupt
 
+        The handler runs on the dispatcher worker pool, not on the GPIO event
+        thread, so a slow handler does not delay the interrupts of other pins.
+        Handlers of the same pin still run one at a time, in order.
+
         Args:
-            handler (Callable[[], None]): interrupt handler callback function
+            handler (Callable[[int], None]): interrupt handler callback function, called with the pin number
             trigger (Trigger, optional): interrupt trigger(RISING, FALLING, RISING_FALLING). Defaults to Trigger.BOTH.
+            coalesce (bool, optional): on bursts, only run the handler for the newest queued edge. Defaults to False.
 
         Raises:
             ValueError: if trigger is not valid
         """
-        GPIO.add_event_detect(self._pin_num, trigger.value, handler, bouncetime=self._bounce_time*1000)
+        pin = self._pin_num
+        self._set_irq(lambda event: handler(pin), trigger, coalesce)
+
+    def _set_irq(self, callback: Callable[[EdgeEvent], None], trigger: Trigger, coalesce: bool = False,
+                 key: Hashable = None) -> None:
+        # Pins sharing a dispatcher key run their callbacks in one sequence, in edge order
+        if self._dispatcher is None:
+            self._dispatcher = get_dispatcher()
+        self._irq_callback = callback
+        self._irq_trigger = trigger
+        self._irq_coalesce = coalesce
+        self._irq_key = self._pin_num if key is None else key
+        self._update_edge_detect()
         self._irq_inited = True
 
     def init_irq(self) -> None:
@@ -324,8 +459,155 @@ class Pin(_Base):
         if self._irq_inited:
             return
         self.log.debug("Setting up IRQ for pin %d", self._pin_num)
-        GPIO.add_event_detect(self._pin_num, Trigger.BOTH.value, self.irq_handler, bouncetime=int(self._bounce_time*1000))
-        self._irq_inited = True
+        self._set_irq(self._on_edge, Trigger.BOTH)
+
+    def _update_edge_detect(self) -> None:
+        """ (Re)register the one edge listener of this pin, shared by irq and the event queue """
+        triggers = set()
+        if self._irq_callback is not None:
+            triggers.add(self._irq_trigger)
+        if self._events is not None:
+            triggers.add(self._events_trigger)
+        if not triggers:
+            edge_detect = None
+        elif self._filter is not None:
+            # The filter needs every raw edge, it does the debouncing itself
+            edge_detect = (Trigger.BOTH, 0)
+        else:
+            trigger = triggers.pop() if len(triggers) == 1 else Trigger.BOTH
+            bounce_time = self._bounce_time if self._irq_callback is not None else self._events_bounce_time
+            edge_detect = (trigger, int(bounce_time * 1000))
+        if edge_detect == self._edge_detect:
+            return
+        if self._edge_detect is not None:
+            self._backend.remove_event_detect(self._pin_num)
+        self._edge_detect = edge_detect
+        if edge_detect is not None:
+            self._backend.add_edge_events(self._pin_num, edge_detect[0].value, self._on_edges, edge_detect[1])
+
+    def _on_edges(self, events: list) -> None:
+        """ Edge listener, runs on the backend event thread """
+        edge_filter = self._filter
+        if edge_filter is not None:
+            events = edge_filter.feed(events)
+            self._schedule_filter(edge_filter)
+            if not events:
+                return
+        self._deliver(events)
+
+    def _schedule_filter(self, edge_filter: EdgeFilter) -> None:
+        deadline = edge_filter.deadline()
+        if deadline is not None and deadline != self._filter_deadline:
+            self._filter_deadline = deadline
+            get_timer().schedule(deadline, self._filter_expire)
+
+    def _filter_expire(self) -> None:
+        """ Filter deadline, runs on the filter timer thread """
+        edge_filter = self._filter
+        if edge_filter is None:
+            return
+        self._filter_deadline = None
+        events = edge_filter.expire(time.monotonic_ns())
+        self._schedule_filter(edge_filter)
+        if events:
+            self._deliver(events)
+
+    def _deliver(self, events: list) -> None:
+        """ Pass edges on to the event queue and the irq callback """
+        queue = self._events
+        if queue is not None:
+            trigger = self._events_trigger
+            queued = events
+            if trigger != Trigger.BOTH:
+                queued = [event for event in events if event.edge == trigger.value]
+            with self._events_cond:
+                overflow = len(queue) + len(queued) - queue.maxlen
+                if overflow > 0:
+                    self._events_dropped += overflow
+                queue.extend(queued)
+                self._events_cond.notify_all()
+        callback = self._irq_callback
+        if callback is not None:
+            trigger = self._irq_trigger
+            submit = self._dispatcher.submit
+            for event in events:
+                if trigger == Trigger.BOTH or event.edge == trigger.value:
+                    submit(self._irq_key, callback, event, self._irq_coalesce)
+
+    def set_filter(self, edge_filter: EdgeFilter = None) -> None:
+        """ Debounce the edges of this pin with a filter on their timestamps
+
+        While a filter is set, edge detection sees every raw edge and
+        bounce_time is not used. Interrupts and the event queue only get
+        the stable transitions the filter confirms. See :mod:`fusion_hat._debounce`.
+
+        Args:
+            edge_filter (EdgeFilter, optional): filter, None to remove it. Defaults to None.
+        """
+        if edge_filter is not None:
+            edge_filter.pin = self._pin_num
+            edge_filter.reset(self.raw())
+        self._filter = edge_filter
+        self._filter_deadline = None
+        self._update_edge_detect()
+
+    def start_events(self, trigger: Trigger = Trigger.BOTH, bounce_time: float = 0.0, maxlen: int = 1024) -> None:
+        """ Start queueing timestamped edges, read them with :meth:`read_events`
+
+        Args:
+            trigger (Trigger, optional): edges to queue(RISING, FALLING, RISING_FALLING). Defaults to Trigger.BOTH.
+            bounce_time (float, optional): bounce time in seconds, ignored while an irq is set. Defaults to 0.
+            maxlen (int, optional): queue size, the oldest edges are dropped when it is full. Defaults to 1024.
+        """
+        with self._events_cond:
+            self._events = deque(maxlen=maxlen)
+            self._events_trigger = trigger
+            self._events_bounce_time = bounce_time
+            self._events_dropped = 0
+        self._update_edge_detect()
+
+    def stop_events(self) -> None:
+        """ Stop queueing edges, queued ones are dropped """
+        with self._events_cond:
+            self._events = None
+            self._events_cond.notify_all()
+        self._update_edge_detect()
+
+    def read_events(self, max_events: int = None, timeout: float = 0.0) -> list:
+        """ Read queued edges in a batch
+
+        Args:
+            max_events (int, optional): most edges to return, None for all queued. Defaults to None.
+            timeout (float, optional): seconds to wait for the first edge, None to wait forever.
+                            Defaults to 0(don't wait).
+
+        Returns:
+            list: :class:`fusion_hat._gpio.EdgeEvent` list, oldest first, empty on timeout
+
+        Raises:
+            RuntimeError: if events are not started
+        """
+        with self._events_cond:
+            if self._events is None:
+                raise RuntimeError(f"Events of pin {self._pin_num} are not started, call start_events first")
+            if not self._events and timeout != 0:
+                self._events_cond.wait_for(lambda: self._events is None or self._events, timeout)
+            queue = self._events
+            if not queue:
+                return []
+            n = len(queue) if max_events is None else min(max_events, len(queue))
+            return [queue.popleft() for _ in range(n)]
+
+    def clear_events(self) -> None:
+        """ Drop queued edges """
+        with self._events_cond:
+            if self._events is not None:
+                self._events.clear()
+
+    @property
+    def events_dropped(self) -> int:
+        """ Edges dropped because the queue was full, since :meth:`start_events` """
+        return self._events_dropped
 
     def irq_handler(self, channel: int) -> None:
         """ Handle the pin interrupt
@@ -333,12 +615,21 @@ class Pin(_Base):
         Args:
             channel (int): pin number
         """
-        value = GPIO.input(channel)
-        if self._on_activated and self.value() == 1:
-            self.log.debug("Pin %d activated", self._pin_num)
+        self._activate(self.value())
+
+    def _on_edge(self, event: EdgeEvent) -> None:
+        """ Handle an edge of init_irq, its level comes from the edge, no pin read """
+        level = 1 if event.edge == _gpio.RISING else 0
+        self._activate(level if self._active_state == Active.HIGH else level ^ 1)
+
+    def _activate(self, value: int) -> None:
+        if self._on_activated and value == 1:
+            if self._log_debug:
+                self.log.debug("Pin %d activated", self._pin_num)
             self._on_activated()
-        elif self._on_deactivated and self.value() == 0:
-            self.log.debug("Pin %d deactivated", self._pin_num)
+        elif self._on_deactivated and value == 0:
+            if self._log_debug:
+                self.log.debug("Pin %d deactivated", self._pin_num)
             self._on_deactivated()
 
     @property
@@ -378,3 +669,136 @@ class Pin(_Base):
         """
         self.init_irq()
         self._on_deactivated = handler
+
+class PinGroup(_Base):
+    """ Several pins read or written together as a bitmask
+
+    Bit i of a mask is pins[i]. The pins are requested together, so on the
+    gpiod backend a whole group is read or written in one kernel call, and
+    RPi.GPIO writes it in one call. Active-low pins are inverted with a
+    single XOR on the mask.
+
+    Args:
+        pins (list): BCM pin numbers, the first one is bit 0
+        mode (Mode, optional): pin mode(IN/OUT), AUTO is not supported. Defaults to Mode.OUT.
+        pull (Pull, optional): pin pull (Pull.UP/Pull.DOWN/Pull.NONE). Defaults to Pull.NONE.
+        active_state (Active, list, optional): active state of all pins, or a list with one
+                        per pin. Defaults to Active.HIGH.
+        backend (str, GPIOBackend, optional): GPIO backend, "rpi" or "gpiod". Defaults to None(default backend).
+        *args: Additional arguments for :class:`fusion_hat._base._Base`
+        **kwargs: Additional keyword arguments for :class:`fusion_hat._base._Base`
+
+    Raises:
+        ValueError: if mode is AUTO
+    """
+
+    def __init__(self,
+            pins: list,
+            *args,
+            mode: Mode = Mode.OUT,
+            pull: Pull = Pull.NONE,
+            active_state: [Active, list] = Active.HIGH,
+            backend: [str, GPIOBackend] = None,
+            **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if mode == Mode.AUTO:
+            raise ValueError("PinGroup mode must be IN or OUT")
+        self._backend = get_backend(backend)
+        self._pins = tuple(pins)
+        self._mode = mode
+        self._pull = pull
+        if isinstance(active_state, Active):
+            active_state = [active_state] * len(self._pins)
+        self._invert = 0
+        for i, state in enumerate(active_state):
+            if state == Active.LOW:
+                self._invert |= 1 << i
+        self._bits = tuple(range(len(self._pins)))
+        self._all = (1 << len(self._pins)) - 1
+        self._value = 0
+        if self._log_debug:
+            self.log.debug("Setup pin group %s, mode %s, pull %s", self._pins, mode, pull)
+        self._backend.setup_group(self._pins, mode.value, pull.value)
+
+    @property
+    def pins(self) -> tuple:
+        """ BCM pin numbers of the group, the first one is bit 0 """
+        return self._pins
+
+    def __len__(self) -> int:
+        return len(self._pins)
+
+    def close(self) -> None:
+        """ Release the pins """
+        self._backend.cleanup_group(self._pins)
+
+    def raw(self, mask: int = None) -> int:
+        """ Set/get the raw pin levels as a bitmask
+
+        Args:
+            mask (int, optional): pin levels, leave it empty to get them. Defaults to None.
+
+        Returns:
+            int: pin levels
+
+        Raises:
+            ValueError: if setting the levels of an input group
+        """
+        if mask is None:
+            if self._mode == Mode.OUT:
+                return self._value
+            result = 0
+            for bit, level in zip(self._bits, self._backend.input_group(self._pins)):
+                result |= level << bit
+            return result
+        if self._mode == Mode.IN:
+            raise ValueError("Input pin group cannot set value")
+        mask &= self._all
+        self._backend.output_group(self._pins, [mask >> bit & 1 for bit in self._bits])
+        self._value = mask
+        return mask
+
+    def value(self, mask: int = None) -> int:
+        """ Set/get the pin values as a bitmask, active-low pins inverted
+
+        Args:
+            mask (int, optional): pin values, leave it empty to get them. Defaults to None.
+
+        Returns:
+            int: pin values
+
+        Raises:
+            ValueError: if setting the values of an input group
+        """
+        if mask is None:
+            return self.raw() ^ self._invert
+        return self.raw(mask ^ self._invert) ^ self._invert
+
+    def __call__(self, mask: int = None) -> int:
+        """ Set/get the pin values as a bitmask, same as :meth:`value` """
+        return self.value(mask)
+
+    def set_bits(self, mask: int) -> int:
+        """ Turn on the pins selected by mask, keep the others
+
+        Args:
+            mask (int): pins to turn on
+
+        Returns:
+            int: pin values
+        """
+        return self.value(self.value() | mask)
+
+    def clear_bits(self, mask: int) -> int:
+        """ Turn off the pins selected by mask, keep the others
+
+        Args:
+            mask (int): pins to turn off
+
+        Returns:
+            int: pin values
+        """
+        return self.value(self.value() & ~mask)
+
+Port = PinGroup
+"""Alias of :class:`PinGroup`"""
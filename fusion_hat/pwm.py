@@ -114,7 +114,8 @@ class PWM(_Base):
         Args:
             duty_cycle (int): duty cycle in ms
         """
-        self.log.debug(f"PWM channel {self.channel} duty cycle: {duty_cycle}")
+        if self._log_debug:
+            self.log.debug("PWM channel %d duty cycle: %d", self.channel, duty_cycle)
         with open(f"{self.PATH}/pwm{self.channel}/duty_cycle", "w") as f:
             f.write(str(duty_cycle))
 
@@ -152,7 +153,8 @@ class PWM(_Base):
         """
         if period == None:
             return self._period
-        self.log.debug(f"PWM channel {self.channel} period: {period}")
+        if self._log_debug:
+            self.log.debug("PWM channel %d period: %d", self.channel, period)
         self.write_period(period)
         self._period = period
         return self._period
@@ -167,7 +169,8 @@ class PWM(_Base):
         """
         if duty_cycle == None:
             return self._duty_cycle
-        self.log.debug(f"PWM channel {self.channel} duty cycle: {duty_cycle}")
+        if self._log_debug:
+            self.log.debug("PWM channel %d duty cycle: %d", self.channel, duty_cycle)
         self.write_duty_cycle(duty_cycle)
         self._duty_cycle = duty_cycle
         self._pulse_width_percent = round(self._duty_cycle / self._period * 100, 2)
@@ -195,7 +198,8 @@ class PWM(_Base):
         """
         if pulse_width_percent == None:
             return self._pulse_width_percent
-        self.log.debug(f"PWM channel {self.channel} pulse width percent: {pulse_width_percent}")
+        if self._log_debug:
+            self.log.debug("PWM channel %d pulse width percent: %s", self.channel, pulse_width_percent)
         duty_cycle = int(pulse_width_percent * self._period / 100)
         self.duty_cycle(duty_cycle)
         return self._pulse_width_percent
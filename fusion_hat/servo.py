@@ -96,5 +96,6 @@ class Servo(PWM):
         angle = constrain(angle, -90, 90)
         pulse_width = mapping(angle, -90, 90, self.MIN_PW, self.MAX_PW)
         pulse_width = int(pulse_width)
-        self.log.debug(f"Servo channel {self.channel} angle: {angle}, pulse_width: {pulse_width}")
+        if self._log_debug:
+            self.log.debug("Servo channel %d angle: %s, pulse_width: %d", self.channel, angle, pulse_width)
         self.pulse_width(pulse_width)
@@ -0,0 +1,162 @@
+""" Fake SMBus and GPIO backends, so the hardware-free logic runs anywhere
+
+The fake SMBus is installed with :func:`fusion_hat._i2c_bus.set_backend`,
+the fake GPIO backend becomes the default of :func:`fusion_hat._gpio.get_backend`.
+"""
+import ctypes
+import errno
+from collections import deque
+
+import pytest
+from smbus2.smbus2 import I2C_M_RD
+
+from fusion_hat import _gpio
+from fusion_hat._gpio import GPIOBackend, EdgeEvent
+from fusion_hat._i2c import I2C
+from fusion_hat._i2c_bus import set_backend
+
+BUS = 1
+
+class FakeSMBus:
+    """ smbus2.SMBus stand-in, every device is 256 registers with auto increment
+
+    Args:
+        devices (dict, optional): register files(bytearray) keyed by address
+    """
+    def __init__(self, devices: dict = None) -> None:
+        self.devices = devices if devices is not None else {}
+        self.calls = []
+        """(method, address) of every transaction"""
+        self.errors = deque()
+        """OSErrors raised by the next transactions, one each"""
+
+    def __call__(self, bus: int) -> 'FakeSMBus':
+        # Factory of set_backend, the shared handle reopens the same device state
+        return self
+
+    def add_device(self, address: int) -> bytearray:
+        regs = self.devices[address] = bytearray(256)
+        return regs
+
+    def _device(self, method: str, address: int) -> bytearray:
+        self.calls.append((method, address))
+        if self.errors:
+            raise self.errors.popleft()
+        regs = self.devices.get(address)
+        if regs is None:
+            raise OSError(errno.EREMOTEIO, "Remote I/O error")
+        return regs
+
+    def close(self) -> None:
+        pass
+
+    def write_quick(self, i2c_addr, force=None):
+        self._device("write_quick", i2c_addr)
+
+    def read_byte(self, i2c_addr, force=None):
+        return self._device("read_byte", i2c_addr)[0]
+
+    def write_byte(self, i2c_addr, value, force=None):
+        self._device("write_byte", i2c_addr)[0] = value
+
+    def read_byte_data(self, i2c_addr, register, force=None):
+        return self._device("read_byte_data", i2c_addr)[register]
+
+    def write_byte_data(self, i2c_addr, register, value, force=None):
+        self._device("write_byte_data", i2c_addr)[register] = value
+
+    def read_word_data(self, i2c_addr, register, force=None):
+        regs = self._device("read_word_data", i2c_addr)
+        return regs[register] | regs[register + 1] << 8
+
+    def write_word_data(self, i2c_addr, register, value, force=None):
+        regs = self._device("write_word_data", i2c_addr)
+        regs[register:register + 2] = value.to_bytes(2, "little")
+
+    def read_i2c_block_data(self, i2c_addr, register, length, force=None):
+        return list(self._device("read_i2c_block_data", i2c_addr)[register:register + length])
+
+    def write_i2c_block_data(self, i2c_addr, register, data, force=None):
+        self._device("write_i2c_block_data", i2c_addr)[register:register + len(data)] = bytes(data)
+
+    def i2c_rdwr(self, *i2c_msgs):
+        regs = self._device("i2c_rdwr", i2c_msgs[0].addr)
+        pointer = 0
+        for msg in i2c_msgs:
+            if msg.flags & I2C_M_RD:
+                ctypes.memmove(msg.buf, bytes(regs[pointer:pointer + msg.len]), msg.len)
+                pointer += msg.len
+            else:
+                data = ctypes.string_at(msg.buf, msg.len)
+                pointer = data[0]
+                regs[pointer:pointer + len(data) - 1] = data[1:]
+                pointer += len(data) - 1
+
+class FakeGPIO(GPIOBackend):
+    """ GPIO backend of plain dicts, edges are injected with :meth:`edge` """
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.levels = {}
+        self.directions = {}
+        self.listeners = {}
+        self.inputs = {}
+        """Callables computing the level of an input pin, e.g. a key matrix"""
+
+    def setup(self, pin, direction, pull=_gpio.PUD_OFF, initial=None):
+        self.directions[pin] = direction
+        if initial is not None:
+            self.levels[pin] = initial
+        else:
+            self.levels.setdefault(pin, 1 if pull == _gpio.PUD_UP else 0)
+
+    def input(self, pin):
+        func = self.inputs.get(pin)
+        return func() if func is not None else self.levels.get(pin, 0)
+
+    def output(self, pin, value):
+        self.levels[pin] = value
+
+    def cleanup(self, pin):
+        self.directions.pop(pin, None)
+        self.listeners.pop(pin, None)
+
+    def add_edge_events(self, pin, edge, callback, bouncetime=0):
+        self.listeners[pin] = (edge, callback)
+
+    def add_event_detect(self, pin, edge, callback, bouncetime=0):
+        self.add_edge_events(pin, edge, lambda events: [callback(event.pin) for event in events], bouncetime)
+
+    def remove_event_detect(self, pin):
+        self.listeners.pop(pin, None)
+
+    def edge(self, pin: int, level: int, timestamp_ns: int) -> None:
+        """ Drive an input pin to level, reporting the edge to its listener """
+        if self.levels.get(pin) == level:
+            return
+        self.levels[pin] = level
+        listener = self.listeners.get(pin)
+        if listener is None:
+            return
+        edge = _gpio.RISING if level else _gpio.FALLING
+        if listener[0] in (edge, _gpio.BOTH):
+            listener[1]([EdgeEvent(pin, edge, timestamp_ns)])
+
+@pytest.fixture
+def smbus():
+    """ Fake SMBus behind bus 1 """
+    fake = FakeSMBus()
+    set_backend(BUS, fake)
+    I2C.clear_scan_cache(BUS)
+    yield fake
+    set_backend(BUS, None)
+    I2C.clear_scan_cache(BUS)
+
+@pytest.fixture
+def gpio(monkeypatch):
+    """ Fake GPIO backend, used by pins created without a backend """
+    fake = FakeGPIO()
+    monkeypatch.setitem(_gpio.BACKENDS, FakeGPIO.name, FakeGPIO)
+    monkeypatch.setitem(_gpio._instances, FakeGPIO.name, fake)
+    monkeypatch.setattr(_gpio, "_default", FakeGPIO.name)
+    return fake
@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+pytest.importorskip("fusion_hat.modules")
+
+from fusion_hat.modules.ahrs import Madgwick, Mahony, quaternion_to_euler
+
+DT = 0.005
+GRAVITY = (0.0, 0.0, 1.0)
+# Magnetic north along x, dipping down
+FIELD = (0.3, 0.0, -0.4)
+
+def to_body(roll, pitch, yaw):
+    """ Rotate earth frame vectors into a sensor frame at roll, pitch, yaw (degrees, Z-Y-X) """
+    r, p, y = map(math.radians, (roll, pitch, yaw))
+    cr, sr, cp, sp, cy, sy = math.cos(r), math.sin(r), math.cos(p), math.sin(p), math.cos(y), math.sin(y)
+    # Sensor to earth rotation, sensor vectors are its transpose times earth vectors
+    matrix = [[cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+              [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+              [-sp, cp * sr, cp * cr]]
+    return lambda v: [sum(matrix[i][j] * v[i] for i in range(3)) for j in range(3)]
+
+def norm(q):
+    return math.sqrt(sum(x * x for x in q))
+
+FILTERS = [lambda: Madgwick(beta=1.0), lambda: Mahony(kp=5.0)]
+
+@pytest.mark.parametrize("make_filter", FILTERS, ids=["madgwick", "mahony"])
+def test_converges_to_orientation(make_filter):
+    rotate = to_body(10.0, -20.0, 30.0)
+    accel, mag = rotate(GRAVITY), rotate(FIELD)
+    orientation = make_filter()
+    for _ in range(3000):
+        orientation.update(0.0, 0.0, 0.0, *accel, *mag, dt=DT)
+    assert quaternion_to_euler(*orientation.quaternion()) == pytest.approx((10.0, -20.0, 30.0), abs=0.5)
+    assert norm(orientation.quaternion()) == pytest.approx(1.0)
+
+@pytest.mark.parametrize("make_filter", FILTERS, ids=["madgwick", "mahony"])
+def test_imu_only_finds_roll_and_pitch(make_filter):
+    accel = to_body(-15.0, 25.0, 0.0)(GRAVITY)
+    orientation = make_filter()
+    for _ in range(3000):
+        orientation.update_imu(0.0, 0.0, 0.0, *accel, dt=DT)
+    roll, pitch, _ = quaternion_to_euler(*orientation.quaternion())
+    assert (roll, pitch) == pytest.approx((-15.0, 25.0), abs=0.5)
+    # No field, update() fuses accel and gyro only
+    orientation.reset()
+    for _ in range(3000):
+        orientation.update(0.0, 0.0, 0.0, *accel, dt=DT)
+    roll, pitch, _ = quaternion_to_euler(*orientation.quaternion())
+    assert (roll, pitch) == pytest.approx((-15.0, 25.0), abs=0.5)
+
+@pytest.mark.parametrize("make_filter", [lambda: Madgwick(beta=0.0), lambda: Mahony(kp=0.0)],
+                         ids=["madgwick", "mahony"])
+def test_integrates_the_gyro(make_filter):
+    orientation = make_filter()
+    rate = math.radians(45.0)
+    for _ in range(200):
+        orientation.update(0.0, 0.0, rate, *GRAVITY, dt=DT)
+    assert quaternion_to_euler(*orientation.quaternion()) == pytest.approx((0.0, 0.0, 45.0), abs=0.1)
+    assert norm(orientation.quaternion()) == pytest.approx(1.0)
+
+def test_reset_to_identity():
+    orientation = Mahony(kp=1.0, ki=0.1)
+    for _ in range(100):
+        orientation.update(0.1, 0.2, 0.3, 0.0, 0.5, 0.8, dt=DT)
+    orientation.reset()
+    assert orientation.quaternion() == (1.0, 0.0, 0.0, 0.0)
+
+def test_quaternion_to_euler():
+    half = math.radians(90.0) / 2
+    assert quaternion_to_euler(math.cos(half), 0.0, 0.0, math.sin(half)) == pytest.approx((0.0, 0.0, 90.0))
+    assert quaternion_to_euler(math.cos(half), math.sin(half), 0.0, 0.0) == pytest.approx((90.0, 0.0, 0.0))
+    # Clamped at the pitch singularity
+    assert quaternion_to_euler(math.cos(half), 0.0, math.sin(half) * 1.0001, 0.0)[1] == pytest.approx(90.0)
@@ -0,0 +1,81 @@
+from fusion_hat._gpio import EdgeEvent, RISING, FALLING
+from fusion_hat._debounce import IntegratorFilter, StateMachineFilter
+
+PIN = 17
+MS = 1_000_000
+
+def edges(*pairs):
+    """ EdgeEvents from (level, time in ms) pairs """
+    return [EdgeEvent(PIN, RISING if level else FALLING, int(ms * MS)) for level, ms in pairs]
+
+def integrator(stable_time, level=0):
+    edge_filter = IntegratorFilter(stable_time, level)
+    edge_filter.pin = PIN
+    # Start the clock at 0 instead of now
+    edge_filter.last_ns = 0
+    return edge_filter
+
+def test_state_machine_reports_first_edge_at_once():
+    edge_filter = StateMachineFilter(0.005, level=1)
+    edge_filter.pin = PIN
+    assert edge_filter.feed(edges((0, 1))) == edges((0, 1))
+    assert edge_filter.level == 0
+
+def test_state_machine_ignores_chatter_and_reports_final_level():
+    edge_filter = StateMachineFilter(0.005, level=1)
+    edge_filter.pin = PIN
+    edge_filter.feed(edges((0, 1)))
+    assert edge_filter.feed(edges((1, 1.1), (0, 1.2), (1, 2))) == []
+    assert edge_filter.deadline() == 6 * MS
+    assert edge_filter.expire(5 * MS) == []
+    assert edge_filter.expire(6 * MS) == edges((1, 2))
+    assert edge_filter.level == 1
+    # Nothing pending once the raw level settled on the reported one
+    assert edge_filter.deadline() is None
+
+def test_state_machine_chatter_back_to_stable_level_is_silent():
+    edge_filter = StateMachineFilter(0.005, level=1)
+    edge_filter.pin = PIN
+    edge_filter.feed(edges((0, 1), (1, 1.5), (0, 2)))
+    assert edge_filter.deadline() is None
+    assert edge_filter.expire(10 * MS) == []
+    # Lockout over, the next edge is reported at once
+    assert edge_filter.feed(edges((1, 20))) == edges((1, 20))
+
+def test_state_machine_lockout_expires_on_next_edge():
+    edge_filter = StateMachineFilter(0.005, level=1)
+    edge_filter.pin = PIN
+    edge_filter.feed(edges((0, 1), (1, 2)))
+    # The pending rise is confirmed before the late fall is taken
+    assert edge_filter.feed(edges((0, 7))) == edges((1, 2))
+    assert edge_filter.expire(11 * MS) == edges((0, 7))
+
+def test_integrator_cancels_short_glitches():
+    edge_filter = integrator(0.001)
+    assert edge_filter.feed(edges((1, 10), (0, 10.5))) == []
+    assert edge_filter.deadline() is None
+    assert edge_filter.expire(20 * MS) == []
+    assert edge_filter.level == 0
+
+def test_integrator_reports_stable_level_late():
+    edge_filter = integrator(0.001)
+    assert edge_filter.feed(edges((1, 10), (0, 10.3), (1, 10.5))) == []
+    # 0.3 ms high, 0.2 ms low, needs 0.9 ms more
+    assert edge_filter.deadline() == int(11.4 * MS)
+    assert edge_filter.expire(11 * MS) == []
+    assert edge_filter.expire(12 * MS) == edges((1, 11.4))
+    assert edge_filter.level == 1
+    assert edge_filter.deadline() is None
+
+def test_integrator_confirms_on_next_edge():
+    edge_filter = integrator(0.001)
+    assert edge_filter.feed(edges((1, 10), (0, 12))) == edges((1, 11))
+    assert edge_filter.feed(edges((1, 14))) == edges((0, 13))
+
+def test_reset_restarts_from_level():
+    edge_filter = integrator(0.001)
+    edge_filter.reset(1)
+    edge_filter.last_ns = 0
+    assert edge_filter.level == 1
+    assert edge_filter.feed(edges((0, 10))) == []
+    assert edge_filter.expire(12 * MS) == edges((0, 11))
@@ -0,0 +1,131 @@
+import errno
+
+import pytest
+
+from fusion_hat import _i2c
+from fusion_hat._i2c import I2C, I2CError, I2CStats, RetryPolicy
+
+ADDRESS = 0x68
+
+def oserror(code):
+    return OSError(code, "injected")
+
+def failing(*codes, result=42):
+    """ Transaction failing with each errno in turn, then returning result """
+    pending = list(codes)
+    calls = []
+    def func():
+        calls.append(1)
+        if pending:
+            raise oserror(pending.pop(0))
+        return result
+    func.calls = calls
+    return func
+
+@pytest.mark.parametrize("code, attempts", [
+    (errno.EIO, 5),
+    (errno.EBUSY, 5),
+    (errno.EREMOTEIO, 3),
+    (errno.ENXIO, 1),
+    (errno.EINVAL, 1),
+])
+def test_retry_policy_max_attempts(code, attempts):
+    assert RetryPolicy().max_attempts(oserror(code)) == attempts
+
+def test_retry_policy_nack_attempts_capped_by_attempts():
+    assert RetryPolicy(attempts=2, nack_attempts=4).max_attempts(oserror(errno.EREMOTEIO)) == 2
+
+def test_retry_policy_delay_backoff():
+    policy = RetryPolicy(base_delay=0.001, max_delay=0.004, jitter=0)
+    assert [policy.delay(n) for n in (1, 2, 3, 4)] == [0.001, 0.002, 0.004, 0.004]
+    policy.jitter = 0.5
+    assert all(0.0005 <= policy.delay(1) <= 0.0015 for _ in range(100))
+
+def test_retry_policy_recovers_from_transient_errors():
+    stats = I2CStats()
+    func = failing(errno.EIO, errno.EAGAIN)
+    assert RetryPolicy(base_delay=0).run(func, "read", ADDRESS, stats) == 42
+    assert len(func.calls) == 3
+    assert (stats.calls, stats.attempts, stats.retries, stats.failures) == (1, 3, 2, 0)
+
+def test_retry_policy_does_not_retry_fatal_errors():
+    stats = I2CStats()
+    func = failing(errno.ENXIO)
+    with pytest.raises(I2CError) as info:
+        RetryPolicy(base_delay=0).run(func, "read", ADDRESS, stats)
+    assert len(func.calls) == 1
+    assert info.value.errno == errno.ENXIO
+    assert info.value.attempts == 1
+    assert stats.failures == 1 and stats.errors == {errno.ENXIO: 1}
+
+def test_retry_policy_gives_up_on_nack():
+    func = failing(*[errno.EREMOTEIO] * 10)
+    with pytest.raises(I2CError):
+        RetryPolicy(base_delay=0, nack_attempts=2).run(func, "read", ADDRESS)
+    assert len(func.calls) == 2
+
+def test_retry_policy_returns_false_without_raising():
+    func = failing(*[errno.EIO] * 10)
+    assert RetryPolicy(attempts=3, base_delay=0, raise_on_failure=False).run(func, "read", ADDRESS) is False
+    assert len(func.calls) == 3
+
+def test_i2c_transactions_retry_on_the_bus(smbus):
+    regs = smbus.add_device(ADDRESS)
+    i2c = I2C(address=ADDRESS, retry_policy=RetryPolicy(base_delay=0))
+    regs[0x75] = 0x68
+    smbus.errors.extend([oserror(errno.EIO), oserror(errno.EBUSY)])
+    assert i2c.read_byte_data(0x75) == 0x68
+    assert i2c.stats.as_dict()["retries"] == 2
+    i2c.write_byte_data(0x6B, 0x01)
+    assert regs[0x6B] == 0x01
+    i2c.close()
+
+def test_i2c_missing_device_raises(smbus):
+    i2c = I2C(address=0x50, retry_policy=RetryPolicy(base_delay=0, nack_attempts=2))
+    with pytest.raises(I2CError) as info:
+        i2c.read_byte_data(0x00)
+    assert info.value.errno == errno.EREMOTEIO
+    assert len(smbus.calls) == 2
+    i2c.close()
+
+def test_i2c_bursts(smbus):
+    regs = smbus.add_device(ADDRESS)
+    regs[0x3B:0x3B + 14] = bytes(range(1, 15))
+    i2c = I2C(address=ADDRESS)
+    assert i2c.read_burst(0x3B, 14) == bytearray(range(1, 15))
+    buf = bytearray(20)
+    assert i2c.read_burst(0x3B, 6, buf) is buf
+    assert buf[:6] == bytearray(range(1, 7)) and buf[6:] == bytearray(14)
+    i2c.write_burst(0x10, list(range(100)))
+    assert regs[0x10:0x10 + 100] == bytearray(range(100))
+    with pytest.raises(ValueError):
+        i2c.write_burst(0x00, bytes(I2C.RDWR_MAX_LEN))
+    with pytest.raises(ValueError):
+        i2c.read_burst(0x00, buf=bytes(4))
+    i2c.close()
+
+def test_scan_finds_devices(smbus):
+    smbus.add_device(0x17)
+    smbus.add_device(0x68)
+    assert I2C.scan() == [0x17, 0x68]
+    assert I2C.scan(quick=True) == [0x17, 0x68]
+    assert ("write_quick", 0x68) in smbus.calls
+    assert ("read_byte", 0x50) in smbus.calls
+
+def test_scan_is_not_cached_on_a_replaced_backend(smbus):
+    smbus.add_device(0x17)
+    assert I2C.scan(cached=True) == [0x17]
+    smbus.add_device(0x68)
+    assert I2C.scan(cached=True) == [0x17, 0x68]
+
+def test_scan_cache_keyed_on_probe_settings(smbus, monkeypatch):
+    # Pretend the fake is the real bus, so results are cached
+    monkeypatch.setattr(_i2c, "has_backend", lambda bus: False)
+    smbus.add_device(0x17)
+    assert I2C.scan(cached=True) == [0x17]
+    smbus.add_device(0x68)
+    assert I2C.scan(cached=True) == [0x17]
+    assert I2C.scan(quick=True, cached=True) == [0x17, 0x68]
+    assert I2C.scan(force=True, cached=True) == [0x17, 0x68]
+    I2C.clear_scan_cache(1)
+    assert I2C.scan(cached=True) == [0x17, 0x68]
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+
+from fusion_hat._i2c_bus import (BusWorker, LatencyHistogram, get_bus, set_backend,
+                                 PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+TIMEOUT = 5
+
+@pytest.fixture
+def worker():
+    worker = BusWorker(99)
+    yield worker
+    worker.stop()
+
+def block(worker):
+    """ Occupy the worker until the returned event is set """
+    started = threading.Event()
+    release = threading.Event()
+    def job():
+        started.set()
+        release.wait(TIMEOUT)
+    worker.submit(job)
+    assert started.wait(TIMEOUT)
+    return release
+
+def test_jobs_run_by_priority_then_deadline_then_order(worker):
+    order = []
+    release = block(worker)
+    futures = [
+        worker.submit(order.append, "low", priority=PRIORITY_LOW),
+        worker.submit(order.append, "normal 1"),
+        worker.submit(order.append, "normal 2"),
+        worker.submit(order.append, "normal deadline", deadline=TIMEOUT),
+        worker.submit(order.append, "high", priority=PRIORITY_HIGH),
+    ]
+    release.set()
+    for future in futures:
+        future.result(TIMEOUT)
+    assert order == ["high", "normal deadline", "normal 1", "normal 2", "low"]
+
+def test_job_missing_its_deadline_is_dropped(worker):
+    ran = []
+    release = block(worker)
+    future = worker.submit(ran.append, 1, deadline=0.001)
+    time.sleep(0.01)
+    release.set()
+    with pytest.raises(TimeoutError):
+        future.result(TIMEOUT)
+    assert ran == []
+    assert worker.histogram(PRIORITY_NORMAL).missed == 1
+
+def test_jobs_with_a_key_coalesce(worker):
+    calls = []
+    release = block(worker)
+    first = worker.submit(calls.append, "first", key="display")
+    second = worker.submit(calls.append, "second", key="display")
+    assert second is first
+    assert not worker.cancel(second)
+    release.set()
+    first.result(TIMEOUT)
+    assert calls == ["first"]
+    # Once it ran, the key queues a new job
+    worker.submit(calls.append, "third", key="display").result(TIMEOUT)
+    assert calls == ["first", "third"]
+
+def test_cancel_last_waiter_cancels_the_job(worker):
+    calls = []
+    release = block(worker)
+    future = worker.submit(calls.append, 1, key="k")
+    assert worker.cancel(future)
+    release.set()
+    worker.submit(calls.append, 2).result(TIMEOUT)
+    assert calls == [2]
+
+def test_generator_jobs_yield_the_bus_between_steps(worker):
+    order = []
+    def slow():
+        for step in range(3):
+            order.append(f"slow {step}")
+            if step == 0:
+                worker.submit(order.append, "urgent", priority=PRIORITY_HIGH)
+            yield
+        return "done"
+    assert worker.submit(slow, priority=PRIORITY_LOW).result(TIMEOUT) == "done"
+    assert order == ["slow 0", "urgent", "slow 1", "slow 2"]
+
+def test_generator_job_sleeps_off_the_bus(worker):
+    order = []
+    def waiting():
+        order.append("start")
+        yield 0.05
+        order.append("end")
+    future = worker.submit(waiting)
+    time.sleep(0.01)
+    worker.submit(order.append, "other").result(TIMEOUT)
+    future.result(TIMEOUT)
+    assert order == ["start", "other", "end"]
+
+def test_run_inline_from_the_bus_thread(worker):
+    def outer():
+        return worker.run(lambda: threading.current_thread().name)
+    assert worker.run(outer, timeout=TIMEOUT) == "i2c-99-worker"
+
+def test_job_errors_reach_the_future(worker):
+    def job():
+        raise OSError(5, "Input/output error")
+    with pytest.raises(OSError):
+        worker.submit(job).result(TIMEOUT)
+
+def test_latency_histogram():
+    hist = LatencyHistogram()
+    for latency in [0.00005] * 90 + [0.003] * 9 + [2.0]:
+        hist.record(latency)
+    assert hist.count == 100
+    assert hist.percentile(50) == 0.0001
+    assert hist.percentile(95) == 0.005
+    assert hist.percentile(100) == 2.0
+    assert hist.max == 2.0
+    assert hist.as_dict()["buckets"][float("inf")] == 1
+    hist.reset()
+    assert hist.count == 0 and hist.percentile(99) == 0.0
+
+def test_shared_bus_switches_backend(smbus):
+    smbus.add_device(0x17)[0x01] = 7
+    bus = get_bus(1)
+    assert bus.read_byte_data(0x17, 0x01) == 7
+    other = type(smbus)({0x17: bytearray(256)})
+    set_backend(1, other)
+    assert bus.read_byte_data(0x17, 0x01) == 0
+    assert other.calls == [("read_byte_data", 0x17)]
+    bus.close()
@@ -0,0 +1,66 @@
+import errno
+
+import pytest
+
+from fusion_hat import i2c_trace
+from fusion_hat._i2c import I2C, I2CError, RetryPolicy
+from fusion_hat.i2c_trace import (I2CRecorder, I2CReplay, TraceMismatchError, read_trace,
+                                  OP_READ_BYTE_DATA, OP_WRITE_BYTE_DATA, OP_I2C_RDWR)
+
+ADDRESS = 0x68
+MISSING = 0x50
+
+def session():
+    """ Transactions of a driver session, and what they returned """
+    i2c = I2C(address=ADDRESS)
+    missing = I2C(address=MISSING, retry_policy=RetryPolicy(base_delay=0, nack_attempts=2))
+    try:
+        i2c.write_byte_data(0x6B, 0x00)
+        who_am_i = i2c.read_byte_data(0x75)
+        data = bytes(i2c.read_burst(0x3B, 14))
+        with pytest.raises(I2CError) as info:
+            missing.read_byte_data(0x00)
+        return who_am_i, data, info.value.errno, I2C.scan(cached=True)
+    finally:
+        i2c.close()
+        missing.close()
+
+@pytest.fixture
+def recorded(smbus, monkeypatch, tmp_path):
+    # The recorder wraps the real SMBus class, record the fake instead
+    monkeypatch.setattr(i2c_trace, "SMBus", smbus)
+    device = smbus.add_device(ADDRESS)
+    device[0x75] = 0x68
+    device[0x3B:0x3B + 14] = bytes(range(14))
+    path = str(tmp_path / "session.trace")
+    with I2CRecorder(path) as recorder:
+        result = session()
+    return path, result, recorder.count
+
+def test_record_and_replay(recorded):
+    path, result, count = recorded
+    assert result == (0x68, bytes(range(14)), errno.EREMOTEIO, [ADDRESS])
+    records = read_trace(path)
+    assert len(records) == count
+    assert [record.op for record in records[:5]] == [
+        OP_WRITE_BYTE_DATA, OP_READ_BYTE_DATA, OP_I2C_RDWR, OP_READ_BYTE_DATA, OP_READ_BYTE_DATA]
+    assert [record.errno for record in records[3:5]] == [errno.EREMOTEIO] * 2
+    with I2CReplay(path) as replay:
+        assert session() == result
+        assert replay.remaining == 0
+
+def test_replay_detects_a_different_transaction(recorded):
+    path = recorded[0]
+    with I2CReplay(path):
+        i2c = I2C(address=ADDRESS)
+        with pytest.raises(TraceMismatchError):
+            i2c.write_byte_data(0x6B, 0x80)
+        i2c.close()
+
+def test_replay_detects_an_exhausted_trace(recorded):
+    path = recorded[0]
+    with I2CReplay(path, strict=False) as replay:
+        session()
+        assert replay.remaining == 0
+        with pytest.raises(TraceMismatchError):
+            session()
@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip("fusion_hat.modules")
+
+from fusion_hat.modules.keypad import Keypad
+
+ROWS = [18, 23, 24, 25]
+COLS = [10, 22, 27, 17]
+KEYS = ["1", "2", "3", "A",
+        "4", "5", "6", "B",
+        "7", "8", "9", "C",
+        "*", "0", "#", "D"]
+
+@pytest.fixture
+def pressed(gpio):
+    """ (row, col) of the pressed keys, read through a key matrix without diodes """
+    pressed = set()
+    def column(col):
+        # A driven row reaches the column through pressed keys, and through
+        # pressed keys of other rows sharing a column with it(ghosting)
+        def level():
+            reached = {row for row, pin in enumerate(ROWS) if gpio.levels.get(pin)}
+            cols = set()
+            while True:
+                cols = {c for r, c in pressed if r in reached}
+                more = {r for r, c in pressed if c in cols} - reached
+                if not more:
+                    break
+                reached |= more
+            return int(col in cols)
+        return level
+    for col, pin in enumerate(COLS):
+        gpio.inputs[pin] = column(col)
+    return pressed
+
+@pytest.fixture
+def keypad(gpio):
+    keypad = Keypad(ROWS, COLS, KEYS)
+    yield keypad
+    keypad.close()
+
+@pytest.mark.parametrize("rows, ghosted", [
+    ([0, 0, 0, 0], False),
+    ([0b0001, 0b0010, 0b0100, 0b1000], False),
+    ([0b0011, 0b0000, 0b0000, 0b0000], False),
+    ([0b0011, 0b0001, 0b0000, 0b0000], False),
+    ([0b0011, 0b0011, 0b0000, 0b0000], True),
+    ([0b0101, 0b0000, 0b1101, 0b0000], True),
+    ([0b0110, 0b1001, 0b0000, 0b0000], False),
+])
+def test_is_ghosted(rows, ghosted):
+    assert Keypad.is_ghosted(rows) == ghosted
+
+def test_read(keypad, pressed):
+    assert keypad.read() == []
+    pressed.update({(0, 0), (2, 3)})
+    assert keypad.read() == ["1", "C"]
+    assert keypad.rows.value() == 0
+
+def test_scan_sees_ghost_rectangle(keypad, pressed):
+    pressed.update({(0, 0), (0, 1), (1, 0)})
+    rows = keypad._scan_rows()
+    assert rows[:2] == [0b0011, 0b0011]
+    assert Keypad.is_ghosted(rows)
+
+def test_scan_thread_reports_presses_and_releases(keypad, pressed):
+    keypad.start_thread(scan_rate=500, debounce=0.004)
+    pressed.add((1, 1))
+    event = keypad.get_event(timeout=1)
+    assert (event.key, event.pressed) == ("5", True)
+    assert keypad.pressed() == ["5"]
+    pressed.clear()
+    event = keypad.get_event(timeout=1)
+    assert (event.key, event.pressed) == ("5", False)
+    keypad.stop_thread()
+    assert keypad.pressed() == []
+
+def test_scan_thread_skips_ghosted_scans(keypad, pressed):
+    pressed.update({(0, 0), (0, 1), (1, 0)})
+    keypad.start_thread(scan_rate=500, debounce=0.004)
+    assert keypad.get_event(timeout=0.1) is None
+    assert keypad.ghost_frames > 0
+    keypad.stop_thread()
@@ -0,0 +1,98 @@
+import pytest
+
+from fusion_hat import _gpio
+from fusion_hat._gpio import EdgeEvent
+from fusion_hat._irq import IRQDispatcher
+from fusion_hat.pin import Pin, PinGroup
+
+PIN = 17
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = IRQDispatcher(workers=1)
+    yield dispatcher
+    dispatcher.stop()
+
+def test_pin_reads_and_writes_the_backend(gpio):
+    out = Pin(PIN, mode=Pin.OUT)
+    out.on()
+    assert gpio.levels[PIN] == 1
+    out.fast_write(0)
+    assert gpio.levels[PIN] == 0 and out.value() == 0
+    button = Pin(27, mode=Pin.IN, pull=Pin.PULL_UP, active_state=Pin.ACTIVE_LOW)
+    assert button.fast_read() == 1 and button.value() == 0
+    gpio.levels[27] = 0
+    assert button.value() == 1
+
+def test_auto_pin_switches_direction(gpio):
+    pin = Pin(PIN)
+    pin.value(1)
+    assert gpio.directions[PIN] == _gpio.OUT
+    pin.value()
+    assert gpio.directions[PIN] == _gpio.IN
+
+def test_irq_runs_for_its_trigger_only(gpio, dispatcher):
+    pin = Pin(PIN, mode=Pin.IN, dispatcher=dispatcher)
+    calls = []
+    pin.irq(calls.append, Pin.IRQ_FALLING)
+    assert gpio.listeners[PIN][0] == _gpio.FALLING
+    for n in range(3):
+        gpio.edge(PIN, 1, n * 10)
+        gpio.edge(PIN, 0, n * 10 + 5)
+    dispatcher.stop()
+    assert calls == [PIN] * 3
+
+def test_irq_and_event_queue_keep_their_own_triggers(gpio, dispatcher):
+    pin = Pin(PIN, mode=Pin.IN, dispatcher=dispatcher)
+    falling = []
+    pin._set_irq(falling.append, Pin.IRQ_FALLING)
+    pin.start_events(Pin.IRQ_RISING)
+    # One listener for both users, seeing every edge
+    assert gpio.listeners[PIN][0] == _gpio.BOTH
+    gpio.edge(PIN, 1, 100)
+    gpio.edge(PIN, 0, 200)
+    gpio.edge(PIN, 1, 300)
+    dispatcher.stop()
+    assert pin.read_events() == [EdgeEvent(PIN, _gpio.RISING, 100), EdgeEvent(PIN, _gpio.RISING, 300)]
+    assert falling == [EdgeEvent(PIN, _gpio.FALLING, 200)]
+    pin.stop_events()
+    assert gpio.listeners[PIN][0] == _gpio.FALLING
+
+def test_event_queue(gpio):
+    pin = Pin(PIN, mode=Pin.IN)
+    with pytest.raises(RuntimeError):
+        pin.read_events()
+    pin.start_events(maxlen=4)
+    assert pin.read_events(timeout=0.01) == []
+    for n in range(6):
+        gpio.edge(PIN, (n + 1) % 2, n)
+    assert pin.events_dropped == 2
+    assert [event.timestamp_ns for event in pin.read_events(max_events=3)] == [2, 3, 4]
+    assert len(pin.read_events()) == 1
+    pin.stop_events()
+    assert PIN not in gpio.listeners
+
+def test_when_activated_uses_the_edge_level(gpio, dispatcher):
+    button = Pin(PIN, mode=Pin.IN, pull=Pin.PULL_UP, active_state=Pin.ACTIVE_LOW, dispatcher=dispatcher)
+    calls = []
+    button.when_activated = lambda: calls.append("press")
+    button.when_deactivated = lambda: calls.append("release")
+    gpio.edge(PIN, 0, 1)
+    gpio.edge(PIN, 1, 2)
+    dispatcher.stop()
+    assert calls == ["press", "release"]
+
+def test_pin_group(gpio):
+    rows = PinGroup([5, 6, 13], mode=Pin.OUT, active_state=[Pin.ACTIVE_HIGH, Pin.ACTIVE_LOW, Pin.ACTIVE_HIGH])
+    rows.value(0b001)
+    assert [gpio.levels[pin] for pin in rows.pins] == [1, 1, 0]
+    rows.set_bits(0b110)
+    assert [gpio.levels[pin] for pin in rows.pins] == [1, 0, 1]
+    assert rows.clear_bits(0b001) == 0b110
+    cols = PinGroup([19, 26], mode=Pin.IN, pull=Pin.PULL_DOWN)
+    gpio.levels[26] = 1
+    assert cols.value() == 0b10
+    with pytest.raises(ValueError):
+        cols.value(1)
+    cols.close()
+    assert 19 not in gpio.directions
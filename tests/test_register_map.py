@@ -0,0 +1,117 @@
+import pytest
+
+from fusion_hat._i2c import I2C
+from fusion_hat._register_map import RegisterMap, Field
+
+ADDRESS = 0x68
+CONFIG = 0x1A
+STATUS = 0x3A
+
+class Device:
+    """ Register file counting the transactions a RegisterMap makes """
+    def __init__(self):
+        self.regs = bytearray(256)
+        self.reads = []
+        self.writes = []
+        self.blocks = []
+
+    def read(self, reg):
+        self.reads.append(reg)
+        return self.regs[reg]
+
+    def write(self, reg, value):
+        self.writes.append((reg, value))
+        self.regs[reg] = value
+
+    def write_block(self, reg, values):
+        self.blocks.append((reg, list(values)))
+        self.regs[reg:reg + len(values)] = bytes(values)
+
+@pytest.fixture
+def device():
+    return Device()
+
+@pytest.fixture
+def regs(device):
+    return RegisterMap(device.read, device.write, device.write_block, shadowed=range(0x19, 0x1D), max_block=3)
+
+def test_shadowed_register_read_once(device, regs):
+    device.regs[CONFIG] = 0x03
+    assert regs.read(CONFIG) == 0x03
+    assert regs.read(CONFIG) == 0x03
+    assert device.reads == [CONFIG]
+    assert regs.is_valid(CONFIG)
+    assert regs.read(CONFIG, cached=False) == 0x03
+    assert device.reads == [CONFIG, CONFIG]
+
+def test_status_register_always_read(device, regs):
+    regs.read(STATUS)
+    regs.read(STATUS)
+    assert device.reads == [STATUS, STATUS]
+    assert not regs.is_valid(STATUS)
+
+def test_write_fills_the_shadow(device, regs):
+    regs.write(CONFIG, 0x105)
+    assert device.regs[CONFIG] == 0x05
+    assert regs.read(CONFIG) == 0x05
+    assert device.reads == []
+
+def test_update_bits_skips_unchanged_writes(device, regs):
+    regs.write(CONFIG, 0b1010)
+    assert regs.set_bits(CONFIG, 0b0010) == 0b1010
+    assert device.writes == [(CONFIG, 0b1010)]
+    assert regs.clear_bits(CONFIG, 0b1000) == 0b0010
+    assert device.writes[-1] == (CONFIG, 0b0010)
+    assert device.reads == []
+
+def test_update_bits_always_writes_unshadowed_registers(device, regs):
+    regs.update_bits(STATUS, 0x01, 0x00)
+    regs.update_bits(STATUS, 0x01, 0x00)
+    assert device.reads == [STATUS, STATUS]
+    assert device.writes == [(STATUS, 0), (STATUS, 0)]
+
+def test_fields(device, regs):
+    fs = Field(0x1C, shift=3, width=2)
+    assert fs.mask == 0b11000
+    device.regs[0x1C] = 0b111
+    assert regs.write_field(fs, 2) == 0b10111
+    assert regs.read_field(fs) == 2
+    assert device.reads == [0x1C]
+    assert regs.write_field(fs, 2) == 0b10111
+    assert len(device.writes) == 1
+
+def test_write_many_bursts_adjacent_registers(device, regs):
+    regs.write_many({0x1C: 4, 0x19: 1, 0x1A: 2, 0x1B: 3, 0x20: 5, 0x22: 6})
+    assert device.blocks == [(0x19, [1, 2, 3])]
+    assert device.writes == [(0x1C, 4), (0x20, 5), (0x22, 6)]
+    assert [regs.read(reg) for reg in range(0x19, 0x1D)] == [1, 2, 3, 4]
+    assert device.reads == []
+
+def test_write_many_without_block_writes(device):
+    regs = RegisterMap(device.read, device.write, shadowed=[0x19, 0x1A])
+    regs.write_many({0x19: 1, 0x1A: 2})
+    assert device.blocks == []
+    assert device.writes == [(0x19, 1), (0x1A, 2)]
+
+def test_invalidate(device, regs):
+    regs.write(0x19, 1)
+    regs.write(CONFIG, 2)
+    regs.invalidate(0x19)
+    assert not regs.is_valid(0x19) and regs.is_valid(CONFIG)
+    regs.invalidate()
+    assert not regs.is_valid(CONFIG)
+    regs.read(CONFIG)
+    assert device.reads == [CONFIG]
+
+def test_from_i2c_on_the_bus(smbus):
+    device = smbus.add_device(ADDRESS)
+    i2c = I2C(address=ADDRESS)
+    regs = RegisterMap.from_i2c(i2c, shadowed=range(0x19, 0x1D))
+    regs.write_many({0x19: 9, 0x1A: 3, 0x1B: 0x08, 0x1C: 0x10})
+    assert device[0x19:0x1D] == bytes([9, 3, 0x08, 0x10])
+    assert smbus.calls == [("i2c_rdwr", ADDRESS)]
+    regs.write_field(Field(0x1C, 3, 2), 3)
+    assert device[0x1C] == 0x18
+    assert smbus.calls[-1] == ("write_byte_data", ADDRESS)
+    assert ("read_byte_data", ADDRESS) not in smbus.calls
+    i2c.close()
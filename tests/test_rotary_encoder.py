@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+pytest.importorskip("fusion_hat.modules")
+
+from fusion_hat.modules.rotary_encoder import Rotary_Encoder, _TRANSITIONS
+
+CLK = 17
+DT = 18
+# One quadrature cycle from rest(both high), clockwise: A falls first
+CLOCKWISE = [(CLK, 0), (DT, 0), (CLK, 1), (DT, 1)]
+COUNTERCLOCKWISE = [(DT, 0), (CLK, 0), (DT, 1), (CLK, 1)]
+
+def turn(gpio, encoder, sequence, cycles=1, start_ns=0, period_ns=1_000_000):
+    """ Drive the channels through the sequence, then wait for the decoder """
+    t = start_ns
+    for _ in range(cycles):
+        for pin, level in sequence:
+            t += period_ns
+            gpio.edge(pin, level, t)
+    encoder._dispatcher.stop()
+    return t
+
+@pytest.fixture
+def encoder(gpio):
+    encoder = Rotary_Encoder(CLK, DT)
+    yield encoder
+    encoder.close()
+
+def test_transition_table():
+    gray = [0b00, 0b10, 0b11, 0b01]
+    for i, state in enumerate(gray):
+        forward = gray[(i + 1) % 4]
+        opposite = gray[(i + 2) % 4]
+        assert _TRANSITIONS[state << 2 | forward] == +1
+        assert _TRANSITIONS[forward << 2 | state] == -1
+        assert _TRANSITIONS[state << 2 | state] == 0
+        assert _TRANSITIONS[state << 2 | opposite] is None
+
+def test_starts_from_pin_levels(encoder):
+    assert encoder._state == 0b11
+    assert encoder.steps() == 0
+
+def test_counts_both_directions(gpio, encoder):
+    turn(gpio, encoder, CLOCKWISE, cycles=5)
+    assert encoder._count == 20
+    assert encoder.steps() == 10
+    assert encoder.errors == 0
+
+def test_counts_counterclockwise(gpio, encoder):
+    turn(gpio, encoder, COUNTERCLOCKWISE, cycles=3)
+    assert encoder.steps() == -6
+
+def test_bounce_cancels_out(gpio, encoder):
+    bouncy = [(CLK, 0), (CLK, 1), (CLK, 0), (DT, 0), (DT, 1), (DT, 0), (CLK, 1), (DT, 1)]
+    turn(gpio, encoder, bouncy, cycles=2)
+    assert encoder.steps() == 4
+    assert encoder.errors == 0
+
+def test_steps_per_detent_and_reverse(gpio):
+    encoder = Rotary_Encoder(CLK, DT, steps_per_detent=1, reverse=True)
+    try:
+        turn(gpio, encoder, CLOCKWISE, cycles=2)
+        assert encoder.steps() == -8
+    finally:
+        encoder.close()
+
+def test_when_rotated_fires_on_step_changes(gpio, encoder):
+    calls = []
+    encoder.when_rotated = lambda direction, position: calls.append((direction, position))
+    turn(gpio, encoder, CLOCKWISE, cycles=1)
+    assert calls == [(1, 1), (1, 2)]
+
+def test_when_rotated_without_arguments(gpio, encoder):
+    calls = []
+    encoder.when_rotated = lambda: calls.append(1)
+    turn(gpio, encoder, CLOCKWISE, cycles=2)
+    assert len(calls) == 4
+
+def test_double_change_counts_an_error(encoder):
+    encoder._decode(0b00, 1)
+    assert encoder.errors == 1
+    assert encoder.steps() == 0
+    encoder.reset()
+    assert encoder.errors == 0
+
+def test_velocity_follows_rotation(gpio, encoder):
+    start = time.monotonic_ns() - 10_000_000
+    turn(gpio, encoder, CLOCKWISE, cycles=2, start_ns=start, period_ns=1_000_000)
+    assert encoder.velocity() > 0
+    encoder.reset()
+    assert encoder.steps() == 0
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("fusion_hat.modules")
+
+from fusion_hat.modules.ultrasonic import DistanceFilter
+
+PERIOD = 0.05
+
+def feed(distance_filter, distances, start=0.0):
+    result = None
+    for i, distance in enumerate(distances):
+        result = distance_filter.update(distance, start + i * PERIOD)
+    return result
+
+def test_first_reading_sets_the_value():
+    distance_filter = DistanceFilter()
+    assert distance_filter.value == -1 and distance_filter.confidence == 0.0
+    value, confidence = distance_filter.update(42.0, 0.0)
+    assert value == 42.0
+    # Variance of a single reading is the measurement noise
+    assert confidence == 0.71
+
+def test_median_drops_single_echoes():
+    distance_filter = DistanceFilter()
+    value, _ = feed(distance_filter, [50.0, 50.5, 49.5, 250.0, 50.0, 3.0, 50.2])
+    assert value == pytest.approx(50.0, abs=0.5)
+    assert distance_filter.rejected == 0
+
+def test_gate_rejects_impossible_jumps_then_restarts():
+    distance_filter = DistanceFilter(window=1, max_rejects=3)
+    feed(distance_filter, [50.0] * 5)
+    # 10 m/s is faster than max_speed, rejected until the filter gives up on the estimate
+    value, confidence = feed(distance_filter, [100.0, 100.0, 100.0], start=0.25)
+    assert value == 50.0
+    assert distance_filter.rejected == 3
+    assert confidence < 0.5
+    value, confidence = distance_filter.update(100.0, 0.4)
+    assert value == 100.0
+    assert distance_filter.rejected == 3
+
+def test_gate_follows_a_moving_target():
+    distance_filter = DistanceFilter()
+    # 1 m/s, within max_speed
+    value, _ = feed(distance_filter, [50.0 + 5 * i for i in range(20)])
+    assert distance_filter.rejected == 0
+    assert 130.0 < value <= 145.0
+
+def test_failed_readings_lower_confidence():
+    distance_filter = DistanceFilter()
+    _, before = feed(distance_filter, [50.0] * 10)
+    value, after = feed(distance_filter, [-1, 0], start=0.5)
+    assert value == 50.0
+    assert after < before
+    assert distance_filter.rejected == 2
+
+def test_prediction_grows_variance_once_per_interval():
+    distance_filter = DistanceFilter(process_noise=100.0, measurement_noise=4.0)
+    distance_filter.update(50.0, 0.0)
+    distance_filter.update(-1, 1.0)
+    distance_filter.update(-1, 2.0)
+    assert distance_filter._variance == pytest.approx(4.0 + 100.0 * 2.0)
+    # A reading right after the failures adds no interval of its own, median of [50, 52] is 52
+    gain = 204.0 / (204.0 + 4.0)
+    value, _ = distance_filter.update(52.0, 2.0)
+    assert value == pytest.approx(50.0 + gain * 2.0, abs=0.01)
+
+def test_reset():
+    distance_filter = DistanceFilter()
+    feed(distance_filter, [50.0] * 3)
+    distance_filter.reset()
+    assert distance_filter.value == -1 and distance_filter.accepted == 0